@@ -0,0 +1,63 @@
+"""
+Benchmark de la calculadora de interés compuesto: barrido yield x crecimiento x horizonte.
+
+Compara `analysis.compound.sweep` (una simulación vectorizada sobre meses y escenarios) con el bucle
+Python mes a mes de cada combinación, como se haría con la fórmula de una hoja de cálculo.
+
+    python -m benchmarks.bench_compound [yields] [crecimientos]
+"""
+import sys
+import time
+
+import numpy as np
+
+from src.analysis.compound import MONTHS_PER_YEAR, CompoundInputs, sweep
+
+INPUTS = CompoundInputs(
+    initial=10_000, monthly=300, contribution_growth=2, years=25, dividend_yield=3, dividend_growth=6,
+    price_growth=6, dividend_tax=19, capital_gains_tax=19, drip=True,
+)
+
+
+def naive_sweep(inputs: CompoundInputs, yields, growths, horizons) -> np.ndarray:
+    """Valor final tras plusvalías de cada combinación con un bucle por mes (precio al ritmo del dividendo)."""
+    out = np.zeros((len(yields), len(growths), len(horizons)))
+    ends = {int(h) * MONTHS_PER_YEAR: k for k, h in enumerate(horizons)}
+    for i, y in enumerate(yields):
+        for j, g in enumerate(growths):
+            rate = (1 + g / 100) ** (1 / MONTHS_PER_YEAR) - 1
+            value = cost = inputs.initial
+            for month in range(1, max(ends) + 1):
+                dividend = value * y / 100 / MONTHS_PER_YEAR * (1 - inputs.dividend_tax / 100)
+                contribution = inputs.monthly * (1 + inputs.contribution_growth / 100) ** ((month - 1) // 12)
+                value = value * (1 + rate) + dividend + contribution
+                cost += dividend + contribution
+                if month in ends:
+                    gains = max(value - cost, 0.0)
+                    out[i, j, ends[month]] = value - gains * inputs.capital_gains_tax / 100
+    return out
+
+
+def main(n_yields: int = 15, n_growths: int = 16) -> None:
+    yields = np.linspace(1, 8, n_yields)
+    growths = np.linspace(0, 15, n_growths)
+    horizons = np.arange(5, 45, 5)
+    scenarios = n_yields * n_growths * len(horizons)
+    print(f"{n_yields} yields x {n_growths} crecimientos x {len(horizons)} horizontes = {scenarios} escenarios")
+
+    best = float("inf")
+    for _ in range(5):
+        t0 = time.perf_counter()
+        grid = sweep(INPUTS, yields, growths, horizons)
+        best = min(best, time.perf_counter() - t0)
+    t0 = time.perf_counter()
+    expected = naive_sweep(INPUTS, yields, growths, horizons)
+    t_naive = time.perf_counter() - t0
+    assert np.allclose(grid.value, expected)
+
+    print(f"  vectorizado : {best * 1000:8.1f} ms")
+    print(f"  bucle Python: {t_naive * 1000:8.1f} ms (x{t_naive / best:.0f})")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
@@ -0,0 +1,60 @@
+"""
+Benchmark de la reducción de puntos en los gráficos diarios largos (precio, drawdown, yield, Geraldine Weiss).
+
+Compara el JSON que viaja al navegador con la serie completa (20 años diarios) frente a la serie
+reducida al presupuesto de escritorio y de móvil, y el coste de la propia reducción.
+
+    python -m benchmarks.bench_downsample
+"""
+import time
+
+import plotly.io as pio
+
+from src import charts
+from src.analysis.dividend_analytics import compute_dividend_analytics
+from src.analysis.downsample import downsample, point_budget
+from src.analysis.price_summary import compute_price_summary
+
+from .bench_figure_cache import CURRENT_YEAR, synthetic_snapshot
+
+
+def daily_figures(prices, dividends, max_points: int | None) -> list[tuple]:
+    """(constructor, argumentos) de los cuatro gráficos diarios, reducidos a `max_points` si se indica."""
+    div = compute_dividend_analytics(prices, dividends, CURRENT_YEAR)
+    close, drawdown, yield_series = prices["Close"], compute_price_summary(prices).drawdown, div.yield_series
+    if max_points is not None:
+        close_gw = downsample(close, max_points)
+        close, yield_series = close_gw, downsample(yield_series, max_points)
+        drawdown = downsample(drawdown, max_points, method="minmax")
+    else:
+        close_gw = close
+    gw = div.gw
+    return [
+        (charts.price_history, close, "Precio de la acción (20 años, diario)"),
+        (charts.drawdown, drawdown),
+        (charts.dividend_yield, yield_series, div.avg_yield, div.max_yield, div.min_yield),
+        (charts.geraldine_weiss, close_gw, gw.band_x, gw.band_over, gw.band_under, 60.0, "SYN"),
+    ]
+
+
+def payload(figures: list[tuple]) -> int:
+    return sum(len(pio.to_json(builder(*args), validate=False)) for builder, *args in figures)
+
+
+def main() -> None:
+    _, prices, dividends, *_ = synthetic_snapshot()
+    full = payload(daily_figures(prices, dividends, None))
+    print(f"{len(prices)} puntos diarios por traza")
+    print(f"  serie completa : {full / 1024:8.0f} KB")
+    for label, width in (("escritorio", 1200), ("móvil", 400)):
+        budget = point_budget(width)
+        t0 = time.perf_counter()
+        figures = daily_figures(prices, dividends, budget)
+        t_build = time.perf_counter() - t0
+        size = payload(figures)
+        print(f"  {label:<10} ({budget:>4} pts): {size / 1024:8.0f} KB  (x{full / size:.1f} menos, "
+              f"análisis + reducción {t_build * 1000:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
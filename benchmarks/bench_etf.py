@@ -0,0 +1,82 @@
+"""
+Benchmark de la comparación de ETFs: solapamiento de posiciones y correlación de rentabilidades.
+
+Con N ETFs de cientos de posiciones sobre un universo de miles de valores, compara las matrices de
+`analysis.etf` frente a recorrer cada par en Python (intersección de diccionarios de pesos) y frente
+a `DataFrame.corr` por pares completos.
+
+    python -m benchmarks.bench_etf [etfs] [posiciones]
+"""
+import sys
+import time
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from src.analysis.etf import common_matrix, correlation_matrix, holdings_matrix, overlap_matrix
+
+
+def synthetic_etfs(n_etfs: int, n_holdings: int, universe: int = 3000, years: int = 10, seed: int = 0):
+    """Pesos por ETF (los primeros valores del universo aparecen más, como los grandes índices) y cierres diarios."""
+    rng = np.random.default_rng(seed)
+    symbols = np.array([f"S{i:04d}" for i in range(universe)])
+    popularity = 1 / np.arange(1, universe + 1)
+    holdings = {}
+    for i in range(n_etfs):
+        chosen = rng.choice(symbols, n_holdings, replace=False, p=popularity / popularity.sum())
+        holdings[f"ETF{i:02d}"] = pd.Series(rng.dirichlet(np.ones(n_holdings)), index=chosen)
+
+    idx = pd.bdate_range(end="2026-10-16", periods=years * 252, name="Date")
+    market = rng.normal(0.0003, 0.01, len(idx))
+    returns = market[:, None] * rng.uniform(0.5, 1.5, n_etfs) + rng.normal(0, 0.005, (len(idx), n_etfs))
+    closes = pd.DataFrame(100 * np.exp(np.cumsum(returns, axis=0)), index=idx, columns=list(holdings))
+    # ETFs lanzados a mitad del periodo: la correlación debe usar los días comunes de cada par
+    for col in closes.columns[::5]:
+        closes.loc[closes.index[: rng.integers(0, len(idx) // 2)], col] = np.nan
+    return holdings, closes
+
+
+def naive_overlap(holdings: dict[str, pd.Series]) -> pd.DataFrame:
+    """Solapamiento par a par con diccionarios de pesos, como se haría sin matrices."""
+    weights = {etf: h.to_dict() for etf, h in holdings.items()}
+    out = pd.DataFrame(100.0, index=list(holdings), columns=list(holdings))
+    for a, b in combinations(holdings, 2):
+        shared = weights[a].keys() & weights[b].keys()
+        out.loc[a, b] = out.loc[b, a] = sum(min(weights[a][s], weights[b][s]) for s in shared) * 100
+    return out
+
+
+def timed(fn, *args, repeat: int = 5):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main(n_etfs: int = 40, n_holdings: int = 500) -> None:
+    holdings, closes = synthetic_etfs(n_etfs, n_holdings)
+    print(f"{n_etfs} ETFs x {n_holdings} posiciones, {len(closes)} días")
+
+    def matrices():
+        weights = holdings_matrix(holdings)
+        return overlap_matrix(weights), common_matrix(weights)
+
+    t_fast, (overlap, common) = timed(matrices)
+    t_slow, expected = timed(naive_overlap, holdings, repeat=1)
+    assert np.allclose(overlap.to_numpy(), expected.to_numpy())
+    shared = int(np.triu(common.to_numpy(), 1).sum())
+    print(f"  solapamiento (matrices) : {t_fast * 1000:8.1f} ms ({shared} coincidencias entre pares)")
+    print(f"  solapamiento (por pares): {t_slow * 1000:8.1f} ms (x{t_slow / t_fast:.0f})")
+
+    t_fast, corr = timed(correlation_matrix, closes)
+    t_slow, expected = timed(lambda: closes.pct_change(fill_method=None).corr(min_periods=60))
+    assert np.allclose(corr.to_numpy(), expected.to_numpy(), equal_nan=True)
+    print(f"  correlación (matrices)  : {t_fast * 1000:8.1f} ms")
+    print(f"  correlación (pandas)    : {t_slow * 1000:8.1f} ms (x{t_slow / t_fast:.1f})")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
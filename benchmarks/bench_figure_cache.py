@@ -0,0 +1,136 @@
+"""
+Benchmark del rerun de la página de análisis: figuras construidas en cada rerun frente a la caché por huella.
+
+Construye las ~20 figuras de la página (con todas las secciones abiertas) sobre 20 años de precios
+diarios y estados sintéticos. "antes" replica lo que hacía cada rerun (construir el `go.Figure` y
+serializarlo como `st.plotly_chart`); "después" usa `services.figure_cache` ya caliente
+(huella de los datos + JSON guardado).
+
+    python -m benchmarks.bench_figure_cache [reruns]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+import plotly.tools
+
+from src import charts
+from src.analysis.dividend_analytics import compute_dividend_analytics
+from src.analysis.multiples import compute_multiples
+from src.analysis.price_summary import compute_price_summary
+from src.analysis.statements import compute_balance, compute_cashflow, compute_income
+from src.services.figure_cache import FigureCache
+
+CURRENT_YEAR = 2026
+
+
+def synthetic_snapshot(years: int = 20, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    idx = pd.bdate_range(end="2026-10-16", periods=years * 252, tz="America/New_York", name="Date")
+    prices = pd.DataFrame({"Close": 40 * np.exp(np.cumsum(rng.normal(0.0003, 0.012, len(idx))))}, index=idx)
+    div_idx = pd.date_range(idx[0], idx[-1], freq="QS-MAR", tz="America/New_York")
+    dividends = pd.Series(0.3 * 1.05 ** (div_idx.year - div_idx.year[0]).to_numpy(), index=div_idx)
+
+    year_idx = pd.Index(range(CURRENT_YEAR - 5, CURRENT_YEAR))
+    grow = 1.06 ** np.arange(len(year_idx))
+
+    def statement(**base):
+        return pd.DataFrame({k: v * grow for k, v in base.items()}, index=year_idx)
+
+    balance = statement(**{
+        "Total Assets": 9e10, "Current Assets": 3e10, "Total Liabilities Net Minority Interest": 6e10,
+        "Current Liabilities": 2e10, "Total Equity Gross Minority Interest": 3e10, "Total Debt": 4e10,
+        "Net Debt": 3e10, "Cash And Cash Equivalents": 1e10, "Ordinary Shares Number": 4.3e9,
+    })
+    income = statement(**{
+        "Total Revenue": 4e10, "Gross Profit": 2.4e10, "Operating Income": 1.2e10, "Net Income": 9e9,
+        "Basic EPS": 2.1, "Diluted EPS": 2.1, "EBITDA": 1.4e10,
+    })
+    cashflow = statement(**{
+        "Operating Cash Flow": 1.1e10, "Capital Expenditure": -1.8e9, "Free Cash Flow": 9.2e9,
+        "Cash Dividends Paid": -7.5e9, "Issuance Of Debt": 5e9, "Repayment Of Debt": -4e9,
+        "Repurchase Of Capital Stock": -2e9,
+    })
+    info = {"marketCap": 2.6e11}
+    return info, prices, dividends, balance, income, cashflow
+
+
+def page_figures(info, prices, dividends, balance, income, cashflow) -> list[tuple]:
+    """(constructor, argumentos) de cada gráfico de la página con todas las secciones abiertas."""
+    div = compute_dividend_analytics(prices, dividends, CURRENT_YEAR, cashflow=cashflow)
+    summary = compute_price_summary(prices)
+    mult = compute_multiples(info, prices, balance, income, cashflow)
+    bal = compute_balance(balance)
+    inc = compute_income(income, balance)
+    cf = compute_cashflow(cashflow)
+    blue, orange, pink = charts.PRIMARY_BLUE, charts.PRIMARY_ORANGE, charts.PRIMARY_PINK
+    gw = div.gw
+    return [
+        (charts.price_history, prices["Close"], "Precio de la acción (20 años, diario)"),
+        (charts.drawdown, summary.drawdown),
+        (charts.annual_dividends, div.annual, div.cagr_text),
+        (charts.dividend_sustainability, div.sustainability),
+        (charts.dividend_yield, div.yield_series, div.avg_yield, div.max_yield, div.min_yield),
+        (charts.geraldine_weiss, prices["Close"], gw.band_x, gw.band_over, gw.band_under, 60.0, "SYN"),
+        (charts.debt_vs_fcf, mult.debt),
+        (charts.per_history, mult.per),
+        (charts.ev_ebitda, mult.ev),
+        (charts.grouped_bars, bal.assets, [blue, orange], "Activos"),
+        (charts.grouped_bars, bal.liabilities, [blue, orange], "Pasivos"),
+        (charts.grouped_bars, bal.debt, [blue, pink], "Deuda"),
+        (charts.grouped_bars, bal.equity, [orange], "Patrimonio"),
+        (charts.balance_lines, bal.overview),
+        (charts.revenue, inc.revenue),
+        (charts.margins, inc.margins),
+        (charts.diluted_eps, inc.diluted_eps),
+        (charts.shares_outstanding, inc.shares),
+        (charts.operating_cash_flow, cf.operating),
+        (charts.simple_bars, cf.issuance, "Emisión de Deuda", blue, cf.issuance_trend),
+        (charts.simple_bars, cf.repayment, "Pago de Deuda", orange),
+        (charts.simple_bars, cf.repurchase, "Recompra de Acciones", pink),
+    ]
+
+
+def rerun_uncached(figures: list[tuple]) -> int:
+    """Lo que hacía cada rerun: construir la figura y serializarla como `st.plotly_chart`."""
+    total = 0
+    for builder, *args in figures:
+        figure = plotly.tools.return_figure_from_figure_or_data(builder(*args), validate_figure=True)
+        total += len(pio.to_json(figure, validate=False))
+    return total
+
+
+def rerun_cached(cache: FigureCache, figures: list[tuple]) -> int:
+    return sum(len(cache.spec(builder, *args)[1]) for builder, *args in figures)
+
+
+def main(reruns: int = 20) -> None:
+    figures = page_figures(*synthetic_snapshot())
+    cache = FigureCache()
+
+    t0 = time.perf_counter()
+    for _ in range(reruns):
+        payload = rerun_uncached(figures)
+    t_before = (time.perf_counter() - t0) / reruns
+
+    t0 = time.perf_counter()
+    rerun_cached(cache, figures)   # primer rerun: construye y guarda
+    t_first = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for _ in range(reruns):
+        assert rerun_cached(cache, figures) == payload
+    t_after = (time.perf_counter() - t0) / reruns
+
+    print(f"{len(figures)} figuras, {payload / 1024:.0f} KB de JSON por rerun, {reruns} reruns")
+    print(f"  sin caché          : {t_before * 1000:8.2f} ms/rerun")
+    print(f"  caché (1er rerun)  : {t_first * 1000:8.2f} ms")
+    print(f"  caché (siguientes) : {t_after * 1000:8.2f} ms/rerun")
+    print(f"  speed-up           : x{t_before / t_after:.1f}")
+    print(f"  {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
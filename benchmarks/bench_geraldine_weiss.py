@@ -0,0 +1,90 @@
+"""
+Benchmark del método Geraldine Weiss sobre 20 años de precios diarios para un lote de tickers.
+
+Compara el cálculo anterior de `render` (apply por fila + iterrows para las bandas) con el
+motor vectorizado de `src.analysis.geraldine_weiss`.
+
+    python -m benchmarks.bench_geraldine_weiss [n_tickers]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.analysis.dividends import annual_dividends, dividend_cagr
+from src.analysis.geraldine_weiss import geraldine_weiss_batch
+
+CURRENT_YEAR = 2026
+
+
+def synthetic_universe(n_tickers: int, years: int = 20, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    idx = pd.bdate_range(end="2026-10-16", periods=years * 252, tz="America/New_York", name="Date")
+    div_idx = pd.date_range(idx[0], idx[-1], freq="QS-MAR", tz="America/New_York")
+    prices, dividends = {}, {}
+    for i in range(n_tickers):
+        returns = rng.normal(0.0003, 0.012, len(idx))
+        prices[f"T{i:03d}"] = pd.DataFrame({"Close": 30 * np.exp(np.cumsum(returns))}, index=idx)
+        growth = (1 + rng.uniform(0, 0.08)) ** ((div_idx.year - div_idx.year[0]).to_numpy())
+        dividends[f"T{i:03d}"] = pd.Series(0.25 * growth, index=div_idx)
+    return prices, dividends
+
+
+def legacy_gw(daily: pd.DataFrame, dividends: pd.Series):
+    """Réplica del cálculo que hacía `render` antes del motor vectorizado."""
+    annual = annual_dividends(dividends, daily)
+    cagr, _ = dividend_cagr(annual)
+
+    def ajustar_dividendo(year):
+        if year == CURRENT_YEAR and cagr is not None and (year - 1) in annual.index:
+            return annual[year - 1] * (1 + cagr / 100)
+        return annual.get(year, None)
+
+    monthly = daily.resample("ME").last().reset_index()
+    monthly["Año"] = monthly["Date"].dt.year
+    monthly["Mes"] = monthly["Date"].dt.strftime("%B")
+    monthly["Dividendo Anual"] = monthly["Año"].apply(ajustar_dividendo)
+    monthly["Yield"] = monthly["Dividendo Anual"] / monthly["Close"]
+    y_min, y_max = monthly["Yield"].min(), monthly["Yield"].max()
+    bands = []
+    for year in sorted(monthly["Año"].unique()):
+        div = ajustar_dividendo(year)
+        if div is not None:
+            bands.append({"Año": year, "Sobre": div / y_min, "Infra": div / y_max})
+    df_annual = pd.DataFrame(bands)
+    x, y_over, y_under = [], [], []
+    for _, row in df_annual.iterrows():
+        year = int(row["Año"])
+        start = pd.to_datetime(f"{year}-01-01")
+        end = pd.to_datetime(f"{year + 1}-01-01") if year != df_annual["Año"].max() else daily.index[-1]
+        x.extend([start, end])
+        y_over.extend([row["Sobre"]] * 2)
+        y_under.extend([row["Infra"]] * 2)
+    return y_min, y_max, y_over, y_under
+
+
+def main(n_tickers: int = 100) -> None:
+    prices, dividends = synthetic_universe(n_tickers)
+
+    t0 = time.perf_counter()
+    legacy = {t: legacy_gw(prices[t], dividends[t]) for t in prices}
+    t_legacy = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    fast = geraldine_weiss_batch(prices, dividends, current_year=CURRENT_YEAR)
+    t_fast = time.perf_counter() - t0
+
+    for t in prices:
+        y_min, y_max, y_over, _ = legacy[t]
+        assert np.isclose(fast[t].yield_min, y_min) and np.isclose(fast[t].yield_max, y_max)
+        assert np.allclose(fast[t].band_over, y_over)
+
+    print(f"{n_tickers} tickers x {len(next(iter(prices.values())))} días")
+    print(f"  anterior    : {t_legacy:7.3f} s  ({t_legacy / n_tickers * 1000:6.2f} ms/ticker)")
+    print(f"  vectorizado : {t_fast:7.3f} s  ({t_fast / n_tickers * 1000:6.2f} ms/ticker)")
+    print(f"  speed-up    : x{t_legacy / t_fast:.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
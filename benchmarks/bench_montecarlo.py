@@ -0,0 +1,42 @@
+"""
+Benchmark de la proyección Monte Carlo: caminos por segundo en serie y con el pool de procesos.
+
+Usa 20 años de precios diarios sintéticos con dividendos trimestrales (ver `bench_figure_cache`) y
+una proyección a 5 años (60 meses por camino). El pool sólo compensa con varias CPUs y muchos
+caminos: arrancar los procesos ("spawn") cuesta alrededor de un segundo la primera vez.
+
+    python -m benchmarks.bench_montecarlo [caminos ...]
+"""
+import os
+import sys
+import time
+
+from src.analysis.dividends import annual_dividends, dividend_cagr
+from src.analysis.montecarlo import MC_MAX_WORKERS, monte_carlo, monte_carlo_inputs
+
+from .bench_figure_cache import synthetic_snapshot
+
+YEARS = 5
+
+
+def main(path_counts: list[int]) -> None:
+    _, prices, dividends, *_ = synthetic_snapshot()
+    annual = annual_dividends(dividends, prices)
+    cagr, _ = dividend_cagr(annual)
+    inputs = monte_carlo_inputs(prices, dividends, annual, float(annual.iloc[-2]), cagr)
+    print(f"{len(inputs.monthly_returns)} meses de historia, {YEARS} años de proyección, "
+          f"{MC_MAX_WORKERS} procesos ({os.cpu_count()} CPUs)")
+
+    monte_carlo(inputs, YEARS, max(path_counts), use_processes=True)   # arranque del pool fuera de la medida
+    for n_paths in path_counts:
+        for label, use_processes in (("serie", False), ("procesos", True)):
+            t0 = time.perf_counter()
+            result = monte_carlo(inputs, YEARS, n_paths, use_processes=use_processes)
+            elapsed = time.perf_counter() - t0
+            p5, p50, p95 = result.price_bands.iloc[-1][["P5", "P50", "P95"]]
+            print(f"  {n_paths:>9,} caminos · {label:<8}: {elapsed * 1000:8.0f} ms "
+                  f"({n_paths / elapsed:>12,.0f} caminos/s)  P5/P50/P95 {p5:.1f} / {p50:.1f} / {p95:.1f}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
@@ -0,0 +1,107 @@
+"""
+Benchmark de la rentabilidad de la cartera (TWR y XIRR) sobre 100 tickers, 20 años y 10 000 transacciones.
+
+Compara reconstruir todas las valoraciones diarias frente a añadir la barra nueva sobre las guardadas,
+y la XIRR vectorizada (Newton sobre los flujos agregados por día) frente a un bucle Python por
+transacción con bisección, como se calculaba a mano en una hoja de cálculo.
+
+    python -m benchmarks.bench_returns [transacciones]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.analysis.portfolio import ledger, market_data
+from src.analysis.returns import compute_returns, extend_valuations, merge_valuations, xirr
+
+
+def synthetic_portfolio(n_tx: int = 10_000, n_tickers: int = 100, years: int = 20, seed: int = 0):
+    """(mercado, libro) sintéticos: precios con dividendos trimestrales y compras/ventas repartidas."""
+    rng = np.random.default_rng(seed)
+    idx = pd.bdate_range(end="2026-10-16", periods=years * 252, tz="America/New_York", name="Date")
+    frames = {}
+    for i in range(n_tickers):
+        close = 50 * np.exp(np.cumsum(rng.normal(0.0003, 0.012, len(idx))))
+        dividends = np.zeros(len(idx))
+        dividends[63::63] = close[63::63] * 0.008
+        frames[f"T{i:03d}"] = pd.DataFrame(
+            {"Close": close, "Dividends": dividends, "Stock Splits": 0.0}, index=idx
+        )
+    market = market_data(frames)
+
+    days = idx.tz_localize(None)[rng.integers(0, len(idx) - 1, n_tx)]
+    tx = pd.DataFrame({
+        "id": np.arange(1, n_tx + 1),
+        "ticker": rng.choice(list(frames), n_tx),
+        "fecha": days.strftime("%Y-%m-%d"),
+        "tipo": np.where(rng.random(n_tx) < 0.05, "venta", "compra"),
+        "cantidad": rng.integers(1, 50, n_tx).astype(float),
+        "precio": 50.0,
+        "comision": 1.0,
+    }).sort_values(["fecha", "id"], ignore_index=True)
+    tx.loc[tx["tipo"] == "venta", "cantidad"] = 1.0
+    return market.since(pd.Timestamp(tx["fecha"].min())), tx
+
+
+def naive_xirr(tx: pd.DataFrame, final_value: float, end: pd.Timestamp) -> float:
+    """XIRR con un flujo por transacción y el VAN sumado en Python, resuelta por bisección."""
+    flows = [
+        ((pd.Timestamp(row.fecha), -(row.cantidad * row.precio + row.comision)) if row.tipo == "compra"
+         else (pd.Timestamp(row.fecha), row.cantidad * row.precio - row.comision))
+        for row in tx.itertuples()
+    ]
+    flows.append((end, final_value))
+    first = flows[0][0]
+
+    def npv(rate: float) -> float:
+        return sum(amount / (1 + rate) ** ((day - first).days / 365) for day, amount in flows)
+
+    low, high = -0.99, 10.0
+    for _ in range(100):
+        mid = (low + high) / 2
+        if np.sign(npv(mid)) == np.sign(npv(low)):
+            low = mid
+        else:
+            high = mid
+    return (low + high) / 2
+
+
+def timed(fn, *args, repeat: int = 3):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main(n_tx: int = 10_000) -> None:
+    market, tx = synthetic_portfolio(n_tx)
+    book = ledger(tx, market)
+    empty = pd.DataFrame()
+    print(f"{n_tx} transacciones, {market.close.shape[1]} tickers, {len(market.close)} días")
+
+    t_full, valuations = timed(extend_valuations, empty, book, market)
+    stored = valuations.iloc[:-1]
+    t_incr, rows = timed(extend_valuations, stored, book, market)
+    assert np.allclose(merge_valuations(stored, rows), valuations)
+    print(f"  valoraciones completas : {t_full * 1000:8.1f} ms ({len(valuations)} filas)")
+    print(f"  barra nueva (append)   : {t_incr * 1000:8.1f} ms ({len(rows)} filas, x{t_full / t_incr:.0f})")
+
+    t_returns, returns = timed(compute_returns, valuations)
+    print(f"  tabla TWR/XIRR         : {t_returns * 1000:8.1f} ms ({len(returns.table)} periodos)")
+
+    flows = valuations["dividendos"] - valuations["flujo"]
+    flows.iloc[-1] += valuations["valor"].iloc[-1]
+    days = (valuations.index - valuations.index[0]).days.to_numpy()
+    t_fast, fast = timed(xirr, flows.to_numpy(), days)
+    # El bucle ignora los dividendos cobrados: sólo se compara el tiempo
+    t_slow, _ = timed(naive_xirr, tx, float(valuations["valor"].iloc[-1]), valuations.index[-1], repeat=1)
+    print(f"  XIRR vectorizada       : {t_fast * 1000:8.2f} ms ({fast * 100:.2f} %)")
+    print(f"  XIRR bucle por fila    : {t_slow * 1000:8.1f} ms (x{t_slow / t_fast:.0f})")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
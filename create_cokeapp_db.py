@@ -1,9 +1,6 @@
-from pathlib import Path
-import sqlite3
-from datetime import datetime, timedelta
-
-# Ruta de la BD (coincide con DB_PATH en db.py)
-DB_PATH = Path(__file__).resolve().parent / "src" / "cokeapp.sqlite"
+# Aplica las migraciones (ver src/migrations.py) y carga los usuarios permitidos.
+# La app también migra sola al arrancar; este script sólo hace falta para sembrar usuarios.
+from src.db import DB_PATH, transaction
 
 # Lista de usuarios permitidos
 usuarios = [
@@ -22,28 +19,15 @@ usuarios = [
     # Agrega tantos usuarios como necesites...
 ]
 
-# Crea la tabla
-conn = sqlite3.connect(DB_PATH)
-cur = conn.cursor()
-cur.execute("""
-CREATE TABLE IF NOT EXISTS usuarios (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    email TEXT UNIQUE NOT NULL,
-    nombre TEXT,
-    tipo_plan TEXT DEFAULT 'free',
-    api_key TEXT,
-    fecha_expiracion TEXT,
-    fecha_registro TEXT DEFAULT CURRENT_TIMESTAMP
-);
-""")
-# Inserta cada usuario
-for u in usuarios:
-    cur.execute("""
-    INSERT OR IGNORE INTO usuarios
-    (email, nombre, tipo_plan, fecha_expiracion)
-    VALUES (?, ?, ?, ?)
-    """, (u["email"], u["nombre"], u["tipo_plan"], u["fecha_expiracion"]))
-conn.commit()
-conn.close()
+# Inserta cada usuario; si ya existe (p. ej. registrado con contraseña) sólo se actualizan sus datos de plan
+with transaction() as conn:
+    conn.executemany(
+        """
+        INSERT INTO usuarios (email, nombre, tipo_plan, fecha_expiracion)
+        VALUES (:email, :nombre, :tipo_plan, :fecha_expiracion)
+        ON CONFLICT (email) DO UPDATE
+        SET nombre = excluded.nombre, tipo_plan = excluded.tipo_plan, fecha_expiracion = excluded.fecha_expiracion
+        """,
+        usuarios,
+    )
 print(f"BD creada en {DB_PATH}")
-
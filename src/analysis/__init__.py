@@ -0,0 +1 @@
+"""Cálculos de análisis puros (sin Streamlit) sobre los datos de un ticker."""
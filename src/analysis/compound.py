@@ -0,0 +1,197 @@
+# src/analysis/compound.py
+"""
+Calculadora de interés compuesto con reinversión de dividendos (DRIP), mes a mes.
+
+El valor sigue la recurrencia lineal V(t+1) = a(t)·V(t) + c(t), donde a(t) junta la revalorización y el
+dividendo neto reinvertido y c(t) es la aportación del mes. Se resuelve de una vez con productos y
+sumas acumuladas sobre el eje de meses: V(t) = A(t)·(V0 + Σ c(s) / A(s+1)), con A(t) = a(0)···a(t-1).
+Los parámetros pueden ser arrays: cada eje extra es un escenario y un barrido de yields x crecimientos
+x horizontes sale de una sola llamada (ver `sweep`).
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+MONTHS_PER_YEAR = 12
+
+# Valores por defecto cuando el ticker no da yield o CAGR del dividendo
+DEFAULT_YIELD = 3.0
+DEFAULT_GROWTH = 5.0
+
+
+@dataclass(frozen=True)
+class CompoundInputs:
+    initial: float                 # capital inicial
+    monthly: float                 # aportación mensual
+    contribution_growth: float     # % anual en que sube la aportación (cada 12 meses)
+    years: int
+    dividend_yield: float          # % sobre el precio inicial
+    dividend_growth: float         # % anual del dividendo por acción (CAGR)
+    price_growth: float            # % anual del precio
+    dividend_tax: float = 0.0      # % retenido de cada dividendo
+    capital_gains_tax: float = 0.0 # % sobre la plusvalía al vender al final
+    drip: bool = True              # reinvertir los dividendos netos
+
+
+@dataclass(frozen=True)
+class CompoundProjection:
+    monthly: pd.DataFrame   # mes x [Aportado, Valor, Dividendo neto, Impuestos, Efectivo, Coste]
+    annual: pd.DataFrame    # año x [Aportado, Valor, Dividendos netos, Impuestos, Efectivo]
+    final_value: float      # valor + efectivo al final, antes de impuestos de plusvalías
+    net_value: float        # tras pagar las plusvalías
+    annual_income: float    # dividendos netos de los últimos 12 meses
+
+
+def _monthly_rate(annual_pct) -> np.ndarray:
+    return (1 + np.asarray(annual_pct, dtype=float) / 100) ** (1 / MONTHS_PER_YEAR) - 1
+
+
+def simulate(
+    initial,
+    monthly,
+    contribution_growth,
+    dividend_yield,
+    dividend_growth,
+    price_growth,
+    dividend_tax,
+    drip,
+    months: int,
+) -> dict[str, np.ndarray]:
+    """
+    Simulación vectorizada: los parámetros se difunden (broadcasting) entre sí y el resultado añade un
+    último eje de `months` + 1 meses (del 0 al final).
+
+    Dentro de cada mes el precio sube su tasa mensual, se cobra el dividendo del mes sobre el valor
+    al inicio (yield anual / 12, que cambia con la diferencia entre el crecimiento del dividendo y el
+    del precio) y al cierre se aporta. Devuelve valor, aportado, coste (aportado + dividendos
+    reinvertidos), efectivo (dividendos no reinvertidos), dividendo neto e impuestos por mes.
+    """
+    def param(x) -> np.ndarray:
+        return np.asarray(x, dtype=float)[..., None]
+
+    t = np.arange(months)
+    price_rate = param(_monthly_rate(price_growth))
+    dividend_rate = param(_monthly_rate(dividend_growth))
+    # Yield mensual sobre el valor: el dividendo por acción crece a su ritmo y el precio al suyo
+    monthly_yield = param(dividend_yield) / 100 / MONTHS_PER_YEAR * ((1 + dividend_rate) / (1 + price_rate)) ** t
+    keep = 1 - param(dividend_tax) / 100
+    reinvest = param(drip)
+
+    growth = 1 + price_rate + reinvest * monthly_yield * keep
+    contribution = param(monthly) * (1 + param(contribution_growth) / 100) ** (t // MONTHS_PER_YEAR)
+    contribution = np.broadcast_to(contribution, growth.shape)
+
+    def running(x: np.ndarray) -> np.ndarray:
+        """Suma acumulada con el mes 0 (antes de empezar) a cero."""
+        return np.concatenate([np.zeros(x.shape[:-1] + (1,)), np.cumsum(x, axis=-1)], axis=-1)
+
+    factor = np.concatenate([np.ones(growth.shape[:-1] + (1,)), np.cumprod(growth, axis=-1)], axis=-1)
+    value = factor * (param(initial) + running(contribution / factor[..., 1:]))
+
+    gross = value[..., :-1] * monthly_yield
+    net = gross * keep
+    invested = param(initial) + running(contribution)
+    return {
+        "value": value,
+        "invested": invested,
+        "cost": invested + running(net * reinvest),
+        "cash": running(net * (1 - reinvest)),
+        "net_dividend": net,
+        "tax": gross - net,
+    }
+
+
+def project(inputs: CompoundInputs) -> CompoundProjection:
+    """Proyección de un escenario, con las tablas mensual y anual."""
+    months = inputs.years * MONTHS_PER_YEAR
+    sim = simulate(
+        inputs.initial, inputs.monthly, inputs.contribution_growth, inputs.dividend_yield, inputs.dividend_growth,
+        inputs.price_growth, inputs.dividend_tax, inputs.drip, months,
+    )
+    # Fila m = cierre del mes m (la 0 es el punto de partida); el dividendo del mes se cobra a su cierre
+    monthly = pd.DataFrame(
+        {
+            "Aportado": sim["invested"],
+            "Valor": sim["value"],
+            "Dividendo neto": np.insert(sim["net_dividend"], 0, 0.0),
+            "Impuestos": np.insert(sim["tax"], 0, 0.0),
+            "Efectivo": sim["cash"],
+            "Coste": sim["cost"],
+        },
+        index=pd.RangeIndex(months + 1, name="Mes"),
+    )
+    year = (np.arange(1, months + 1) - 1) // MONTHS_PER_YEAR + 1
+    flows = monthly[["Dividendo neto", "Impuestos"]].iloc[1:].groupby(year).sum()
+    annual = monthly[["Aportado", "Valor", "Efectivo"]].iloc[MONTHS_PER_YEAR::MONTHS_PER_YEAR].set_axis(flows.index)
+    annual = annual.join(flows.rename(columns={"Dividendo neto": "Dividendos netos"})).rename_axis("Año")
+
+    last = monthly.iloc[-1]
+    final_value = last["Valor"] + last["Efectivo"]
+    gains = max(last["Valor"] - last["Coste"], 0.0)
+    return CompoundProjection(
+        monthly=monthly,
+        annual=annual[["Aportado", "Valor", "Dividendos netos", "Impuestos", "Efectivo"]],
+        final_value=float(final_value),
+        net_value=float(final_value - gains * inputs.capital_gains_tax / 100),
+        annual_income=float(sim["net_dividend"][-MONTHS_PER_YEAR:].sum()),
+    )
+
+
+# ─── Barridos de parámetros ───────────────────────────────────
+@dataclass(frozen=True)
+class CompoundSweep:
+    yields: np.ndarray        # % (eje 0)
+    growths: np.ndarray       # % (eje 1)
+    horizons: np.ndarray      # años (eje 2)
+    value: np.ndarray         # valor final tras plusvalías, (yields, growths, horizons)
+    income: np.ndarray        # dividendos netos de los últimos 12 meses, mismas dimensiones
+
+    def table(self, metric: str, horizon: int) -> pd.DataFrame:
+        """Corte yields x crecimientos de `metric` ("value" o "income") al horizonte `horizon` (años)."""
+        k = int(np.flatnonzero(self.horizons == horizon)[0])
+        return pd.DataFrame(
+            getattr(self, metric)[:, :, k],
+            index=pd.Index(self.yields, name="Yield (%)"),
+            columns=pd.Index(self.growths, name="Crecimiento (%)"),
+        )
+
+
+def sweep(
+    inputs: CompoundInputs,
+    yields: np.ndarray,
+    growths: np.ndarray,
+    horizons: np.ndarray,
+    price_follows_dividend: bool = True,
+) -> CompoundSweep:
+    """
+    Todas las combinaciones yield x crecimiento del dividendo x horizonte en una sola simulación.
+
+    Se simula una vez hasta el horizonte más largo y cada horizonte es un corte del eje de meses. Con
+    `price_follows_dividend` el precio crece al mismo ritmo que el dividendo (yield constante); si no,
+    al `price_growth` de `inputs`.
+    """
+    yields = np.asarray(yields, dtype=float)
+    growths = np.asarray(growths, dtype=float)
+    horizons = np.asarray(horizons, dtype=int)
+    months = int(horizons.max()) * MONTHS_PER_YEAR
+    y, g = yields[:, None], growths[None, :]
+    sim = simulate(
+        inputs.initial, inputs.monthly, inputs.contribution_growth, y, g,
+        g if price_follows_dividend else inputs.price_growth, inputs.dividend_tax, inputs.drip, months,
+    )
+
+    ends = horizons * MONTHS_PER_YEAR
+    value = sim["value"][..., ends] + sim["cash"][..., ends]
+    gains = np.maximum(sim["value"][..., ends] - sim["cost"][..., ends], 0.0)
+    # Dividendos netos de los 12 meses previos a cada horizonte, con una suma acumulada
+    net = sim["net_dividend"]
+    paid = np.concatenate([np.zeros(net.shape[:-1] + (1,)), np.cumsum(net, axis=-1)], axis=-1)
+    income = paid[..., ends] - paid[..., ends - MONTHS_PER_YEAR]
+    return CompoundSweep(
+        yields=yields,
+        growths=growths,
+        horizons=horizons,
+        value=value - gains * inputs.capital_gains_tax / 100,
+        income=income,
+    )
@@ -0,0 +1,70 @@
+# src/analysis/dividend_analytics.py
+from dataclasses import dataclass
+
+import pandas as pd
+
+from .dividends import annual_dividends, dividend_cagr, dividend_sustainability
+from .geraldine_weiss import GeraldineWeiss, gw_from_annual
+
+
+@dataclass(frozen=True)
+class DividendAnalytics:
+    """Todo el análisis de dividendos de un (ticker, período); lo leen la cabecera, la pestaña y la valoración."""
+
+    annual: pd.Series            # dividendo anual por año, dentro de la ventana de precios
+    cagr: float | None           # % anual entre el primer año y el último año completo
+    cagr_years: tuple[int, int] | None
+    yield_series: pd.Series      # yield diario (%) hasta el último año completo
+    avg_yield: float | None
+    max_yield: float | None
+    min_yield: float | None
+    gw: GeraldineWeiss | None
+    sustainability: pd.DataFrame | None = None   # FCF vs dividendos pagados (ver `dividend_sustainability`)
+
+    @property
+    def cagr_text(self) -> str:
+        if self.cagr is None:
+            return "📌 CAGR no disponible (datos insuf.)"
+        first, last = self.cagr_years
+        return f"📌 CAGR {self.cagr:.2f}% anual ({first}–{last})"
+
+
+def compute_dividend_analytics(
+    daily_prices: pd.DataFrame,
+    dividends: pd.Series,
+    current_year: int | None = None,
+    cashflow: pd.DataFrame | None = None,
+) -> DividendAnalytics:
+    """
+    Calcula una sola vez dividendos anuales, CAGR, serie de yield y bandas Geraldine Weiss.
+
+    Todos los bloques usan el mismo filtro de años: los cubiertos por el historial de precios.
+    Con `cashflow` también se calcula la sostenibilidad (FCF payout).
+    """
+    current_year = current_year or pd.Timestamp.today().year
+    annual = annual_dividends(dividends, daily_prices)
+    cagr, cagr_years = dividend_cagr(annual)
+    sustainability = dividend_sustainability(cashflow) if cashflow is not None else None
+
+    if annual.empty:
+        return DividendAnalytics(
+            annual, cagr, cagr_years, pd.Series(dtype=float), None, None, None, None, sustainability
+        )
+
+    close = daily_prices["Close"]
+    dividend_by_day = pd.Series(close.index.year.map(annual.to_dict()), index=close.index, dtype=float)
+    yield_series = (dividend_by_day / close * 100).rename("Yield (%)")
+    if len(annual) > 1:
+        yield_series = yield_series[yield_series.index.year <= annual.index[-2]]
+
+    return DividendAnalytics(
+        annual=annual,
+        cagr=cagr,
+        cagr_years=cagr_years,
+        yield_series=yield_series,
+        avg_yield=yield_series.mean(),
+        max_yield=yield_series.max(),
+        min_yield=yield_series.min(),
+        gw=gw_from_annual(close, annual, cagr, current_year),
+        sustainability=sustainability,
+    )
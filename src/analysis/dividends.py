@@ -0,0 +1,47 @@
+# src/analysis/dividends.py
+"""Operaciones básicas sobre la serie de dividendos de un ticker."""
+import pandas as pd
+
+
+def annual_dividends(dividends: pd.Series, prices: pd.DataFrame) -> pd.Series:
+    """Suma los dividendos por año y los limita a los años cubiertos por `prices`."""
+    if dividends.empty or prices.empty:
+        return pd.Series(dtype=float)
+    annual = dividends.resample("YE").sum().astype(float).dropna()
+    annual.index = annual.index.year
+    start_year, end_year = prices.index[[0, -1]].year
+    return annual.loc[start_year:end_year]
+
+
+def dividend_cagr(annual: pd.Series) -> tuple[float | None, tuple[int, int] | None]:
+    """CAGR (%) entre el primer año y el penúltimo (el último suele estar incompleto)."""
+    if len(annual) < 3:
+        return None, None
+    first, penultimate = annual.iloc[[0, -2]]
+    n_years = annual.index[-2] - annual.index[0]
+    if first <= 0 or n_years <= 0:
+        return None, None
+    return ((penultimate / first) ** (1 / n_years) - 1) * 100, (annual.index[0], annual.index[-2])
+
+
+def adjusted_annual_dividends(annual: pd.Series, cagr: float | None, current_year: int) -> pd.Series:
+    """Proyecta el año en curso con el CAGR sobre el año anterior; el resto de años queda igual."""
+    adjusted = annual.copy()
+    if cagr is not None and (current_year - 1) in annual.index:
+        adjusted.loc[current_year] = annual.loc[current_year - 1] * (1 + cagr / 100)
+    return adjusted
+
+
+def dividend_sustainability(cashflow: pd.DataFrame) -> pd.DataFrame | None:
+    """
+    FCF, dividendos pagados (en positivo) y FCF payout (%) por año.
+
+    None si el cash-flow no trae "Free Cash Flow" o "Cash Dividends Paid".
+    """
+    if "Free Cash Flow" not in cashflow or "Cash Dividends Paid" not in cashflow:
+        return None
+    fcf = pd.to_numeric(cashflow["Free Cash Flow"], errors="coerce")
+    dividends_paid = pd.to_numeric(cashflow["Cash Dividends Paid"], errors="coerce")
+    df = pd.DataFrame({"FCF": fcf, "Dividendos Pagados": dividends_paid.abs()}).dropna()
+    df["FCF Payout (%)"] = df["Dividendos Pagados"] / df["FCF"] * 100
+    return df
@@ -0,0 +1,93 @@
+# src/analysis/downsample.py
+"""
+Reducción de puntos de series largas antes de dibujarlas.
+
+Un gráfico no puede mostrar más puntos que píxeles: 20 años de precios diarios son ~5.000 puntos
+por traza que viajan al navegador en cada rerun. Aquí se eligen los puntos que conservan la forma
+de la serie:
+
+- `lttb`: Largest-Triangle-Three-Buckets (Steinarsson, 2013); conserva picos y forma visual.
+- `minmax`: mínimo y máximo de cada tramo; conserva exactamente los extremos (drawdown).
+"""
+import numpy as np
+import pandas as pd
+
+# Puntos por píxel de ancho: con 2 la línea es indistinguible de la serie completa
+POINTS_PER_PIXEL = 2
+
+
+def point_budget(width_px: int, points_per_pixel: float = POINTS_PER_PIXEL) -> int:
+    """Máximo de puntos por traza para un gráfico de `width_px` píxeles de ancho."""
+    return max(int(width_px * points_per_pixel), 100)
+
+
+def _as_float(index: pd.Index) -> np.ndarray:
+    if isinstance(index, pd.DatetimeIndex):
+        return index.asi8.astype(float)
+    return np.asarray(index, dtype=float)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Posiciones de los `n_out` puntos elegidos por LTTB (incluye siempre el primero y el último).
+
+    Los promedios de cada tramo se calculan de una vez con `np.add.reduceat`; el bucle sólo recorre
+    los tramos (n_out), no los puntos, y dentro de cada uno el área se calcula vectorizada.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # Tramos interiores: n - 2 puntos repartidos en n_out - 2 tramos
+    edges = np.floor(np.linspace(1, n - 1, n_out - 1)).astype(int)
+    starts, ends = edges[:-1], edges[1:]
+    counts = ends - starts
+    avg_x = np.add.reduceat(x[1:-1], starts - 1) / counts
+    avg_y = np.add.reduceat(y[1:-1], starts - 1) / counts
+    # El "siguiente" del último tramo es el último punto
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    chosen = np.empty(n_out, dtype=int)
+    chosen[0], chosen[-1] = 0, n - 1
+    a = 0
+    for i, (start, end) in enumerate(zip(starts, ends)):
+        bx, by = x[start:end], y[start:end]
+        area = np.abs((x[a] - next_x[i]) * (by - y[a]) - (x[a] - bx) * (next_y[i] - y[a]))
+        a = start + int(np.argmax(area))
+        chosen[i + 1] = a
+    return chosen
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """Posiciones del primer punto, el último y el mínimo y máximo de cada tramo, en orden (vectorizado)."""
+    n = len(y)
+    n_buckets = (n_out - 2) // 2
+    if n_out >= n or n_buckets < 1:
+        return np.arange(n)
+    edges = np.linspace(0, n, n_buckets + 1).astype(int)
+    bucket = np.repeat(np.arange(n_buckets), np.diff(edges))
+    # Orden por (tramo, valor): el primero de cada tramo es su mínimo y el último su máximo
+    order = np.lexsort((y, bucket))
+    lo = order[edges[:-1]]
+    hi = order[edges[1:] - 1]
+    return np.unique(np.concatenate([lo, hi, [0, n - 1]]))
+
+
+def downsample(serie: pd.Series, max_points: int, method: str = "lttb") -> pd.Series:
+    """
+    `serie` reducida a como mucho `max_points` puntos (sin NaN), conservando el índice original.
+
+    Las series que ya caben en el presupuesto se devuelven tal cual (salvo los NaN).
+    """
+    serie = serie.dropna()
+    if len(serie) <= max_points:
+        return serie
+    y = serie.to_numpy(dtype=float)
+    if method == "minmax":
+        idx = minmax_indices(y, max_points)
+    elif method == "lttb":
+        idx = lttb_indices(_as_float(serie.index), y, max_points)
+    else:
+        raise ValueError(f"Método de reducción desconocido: {method}")
+    return serie.iloc[idx]
@@ -0,0 +1,156 @@
+# src/analysis/etf.py
+"""
+Comparación de ETFs: comisiones, sectores, solapamiento de posiciones y correlación de rentabilidades.
+
+Todo se calcula con matrices sobre la unión de posiciones (ETF x valor), así una lista de decenas de
+ETFs con cientos de posiciones cada uno se resuelve en milisegundos:
+- Solapamiento ponderado: Σ min(peso en A, peso en B) sobre las posiciones de cada fila.
+- Posiciones en común: producto de la matriz de pertenencia por su traspuesta.
+- Correlación: pares completos (cada par usa los días en que cotizan ambos) con cinco productos de matrices.
+"""
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+# Mínimo de rentabilidades diarias comunes para dar la correlación de un par
+MIN_COMMON_DAYS = 60
+
+SUMMARY_COLUMNS = ["Categoría", "Gestora", "Comisión (%)", "Posiciones", "Peso listado (%)", "Sector principal"]
+
+
+@dataclass(frozen=True)
+class EtfAnalysis:
+    summary: pd.DataFrame       # ETF x SUMMARY_COLUMNS
+    sectors: pd.DataFrame       # ETF x sector, en %
+    weights: pd.DataFrame       # ETF x valor, en tanto por uno (0 si el ETF no lo tiene)
+    overlap: pd.DataFrame       # ETF x ETF, solapamiento ponderado en %
+    common: pd.DataFrame        # ETF x ETF, número de posiciones en común
+    correlation: pd.DataFrame   # ETF x ETF, correlación de rentabilidades diarias
+    names: dict[str, str]       # símbolo -> nombre de la posición
+    failed: tuple[str, ...]     # tickers sin datos de fondo (no son fondos o falló la descarga)
+
+
+# ─── Posiciones ───────────────────────────────────────────────
+def holdings_matrix(holdings: dict[str, pd.Series]) -> pd.DataFrame:
+    """Matriz ETF x valor con los pesos de cada posición, construida de una vez desde los índices."""
+    etfs = list(holdings)
+    symbols = pd.Index(sorted(set().union(*(h.index for h in holdings.values()))) if holdings else [])
+    matrix = np.zeros((len(etfs), len(symbols)))
+    for row, h in enumerate(holdings.values()):
+        matrix[row, symbols.get_indexer(h.index)] = h.to_numpy(dtype=float)
+    return pd.DataFrame(matrix, index=etfs, columns=symbols)
+
+
+def overlap_matrix(weights: pd.DataFrame) -> pd.DataFrame:
+    """
+    Solapamiento ponderado en % entre cada par: la parte de la cartera que comparten.
+
+    Cada fila sólo recorre las columnas donde su ETF tiene posición, así el coste es
+    (posiciones totales x número de ETFs) y no (ETFs² x unión de valores).
+    """
+    w = weights.to_numpy()
+    overlap = np.zeros((len(w), len(w)))
+    for i, row in enumerate(w):
+        held = np.flatnonzero(row)
+        overlap[i] = np.minimum(row[held], w[:, held]).sum(axis=1)
+    return pd.DataFrame(overlap * 100, index=weights.index, columns=weights.index)
+
+
+def common_matrix(weights: pd.DataFrame) -> pd.DataFrame:
+    """Número de posiciones en común entre cada par (pertenencia x pertenencia traspuesta)."""
+    held = (weights.to_numpy() > 0).astype(float)
+    return pd.DataFrame((held @ held.T).astype(int), index=weights.index, columns=weights.index)
+
+
+def shared_holdings(weights: pd.DataFrame, a: str, b: str, names: dict[str, str]) -> pd.DataFrame:
+    """Posiciones comunes de dos ETFs con su peso en cada uno y el peso compartido, de mayor a menor."""
+    pair = weights.loc[[a, b]].T
+    pair = pair[(pair[a] > 0) & (pair[b] > 0)] * 100
+    pair["Compartido"] = pair.min(axis=1)
+    pair.insert(0, "Nombre", pair.index.map(lambda s: names.get(s, "")))
+    return pair.sort_values("Compartido", ascending=False)
+
+
+# ─── Correlación ──────────────────────────────────────────────
+def close_matrix(frames: dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Cierres ajustados (rentabilidad total) de cada ETF por día natural, sin rellenar huecos: los
+    ETFs de bolsas con otra zona horaria o festivos caen en el mismo día y cada par usa sus días comunes.
+    """
+    closes = {}
+    for etf, df in frames.items():
+        if df.empty or "Close" not in df:
+            continue
+        index = df.index.tz_localize(None) if df.index.tz is not None else df.index
+        close = df["Close"].set_axis(index.normalize())
+        closes[etf] = close[~close.index.duplicated(keep="last")]
+    return pd.DataFrame(closes).sort_index().rename_axis("Date")
+
+
+def correlation_matrix(closes: pd.DataFrame, min_periods: int = MIN_COMMON_DAYS) -> pd.DataFrame:
+    """
+    Correlación de rentabilidades diarias por pares completos.
+
+    Con X las rentabilidades (0 donde falta el dato) y M la máscara de datos válidos, las sumas de
+    cada par sobre sus días comunes salen de productos de matrices: n = MᵀM, Σx = XᵀM, Σx² = (X²)ᵀM,
+    Σxy = XᵀX. Un ETF reciente no recorta la ventana de los demás, como pasaría al alinear todos.
+    """
+    returns = closes.pct_change(fill_method=None).iloc[1:]
+    valid = returns.notna().to_numpy(dtype=float)
+    x = returns.fillna(0.0).to_numpy()
+    n = valid.T @ valid
+    sx = x.T @ valid             # sx[i, j] = Σ x_i en los días comunes de (i, j)
+    sxx = (x * x).T @ valid
+    sxy = x.T @ x
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sxy - sx * sx.T / n
+        var = sxx - sx * sx / n
+        corr = cov / np.sqrt(var * var.T)
+    corr[n < min_periods] = np.nan
+    corr = np.clip(corr, -1.0, 1.0)
+    return pd.DataFrame(corr, index=closes.columns, columns=closes.columns)
+
+
+# ─── Resumen ──────────────────────────────────────────────────
+def _summary(funds: dict[str, dict[str, Any]], sectors: pd.DataFrame) -> pd.DataFrame:
+    rows = {}
+    for etf, fund in funds.items():
+        expense = fund["expense_ratio"]
+        top_sector = sectors.loc[etf].idxmax() if etf in sectors.index and sectors.loc[etf].gt(0).any() else None
+        rows[etf] = {
+            "Categoría": fund["category"],
+            "Gestora": fund["family"],
+            "Comisión (%)": None if expense is None else expense * 100,
+            "Posiciones": len(fund["holdings"]),
+            "Peso listado (%)": fund["holdings"].sum() * 100,
+            "Sector principal": top_sector,
+        }
+    return pd.DataFrame.from_dict(rows, orient="index", columns=SUMMARY_COLUMNS)
+
+
+def compute_etf_analysis(funds: dict[str, dict[str, Any] | None | Exception], closes: pd.DataFrame) -> EtfAnalysis:
+    """
+    Análisis de una lista de ETFs a partir de sus datos de fondo (ver `yf_client.fund_data`) y de sus
+    cierres diarios (una columna por ETF). Los que no son fondos o cuya descarga falló van a `failed`.
+    """
+    ok = {etf: fund for etf, fund in funds.items() if isinstance(fund, dict)}
+    failed = tuple(etf for etf in funds if etf not in ok)
+
+    sectors = pd.DataFrame({etf: fund["sectors"] for etf, fund in ok.items()}).T.fillna(0.0) * 100
+    weights = holdings_matrix({etf: fund["holdings"] for etf, fund in ok.items()})
+    names: dict[str, str] = {}
+    for fund in ok.values():
+        names.update(fund["holding_names"])
+
+    return EtfAnalysis(
+        summary=_summary(ok, sectors),
+        sectors=sectors,
+        weights=weights,
+        overlap=overlap_matrix(weights),
+        common=common_matrix(weights),
+        correlation=correlation_matrix(closes),
+        names=names,
+        failed=failed,
+    )
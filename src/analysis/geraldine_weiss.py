@@ -0,0 +1,128 @@
+# src/analysis/geraldine_weiss.py
+"""
+Método Geraldine Weiss vectorizado.
+
+Todo se calcula con operaciones sobre arrays (sin apply/iterrows), de modo que puede
+ejecutarse sobre un universo de tickers completo (ver `geraldine_weiss_batch`).
+"""
+import calendar
+from dataclasses import dataclass
+from typing import Mapping
+
+import numpy as np
+import pandas as pd
+
+from .dividends import adjusted_annual_dividends, annual_dividends, dividend_cagr
+
+_MONTH_NAMES = np.array(calendar.month_name)
+
+
+@dataclass(frozen=True)
+class GeraldineWeiss:
+    """Resultado del método Geraldine Weiss sobre datos mensuales."""
+
+    table: pd.DataFrame          # por mes: Año, Mes, Precio, Dividendo Anual, Yield y precios de banda
+    yield_max: float
+    yield_min: float
+    last_dividend: float         # dividendo anual (ajustado) del último año
+    band_x: np.ndarray           # fechas de la línea escalonada (inicio/fin de cada año)
+    band_over: np.ndarray        # precio sobrevalorado en cada punto de band_x
+    band_under: np.ndarray       # precio infravalorado en cada punto de band_x
+
+    @property
+    def overvalued_price(self) -> float:
+        return self.last_dividend / self.yield_min
+
+    @property
+    def undervalued_price(self) -> float:
+        return self.last_dividend / self.yield_max
+
+
+def _lookup(keys: np.ndarray, table_keys: np.ndarray, table_values: np.ndarray) -> np.ndarray:
+    """Busca cada clave en una tabla ordenada; NaN donde no existe."""
+    if table_keys.size == 0:
+        return np.full(keys.shape, np.nan)
+    pos = np.clip(np.searchsorted(table_keys, keys), 0, table_keys.size - 1)
+    return np.where(table_keys[pos] == keys, table_values[pos], np.nan)
+
+
+def gw_from_annual(
+    close: pd.Series, annual: pd.Series, cagr: float | None, current_year: int
+) -> GeraldineWeiss | None:
+    """
+    Núcleo vectorizado: último cierre de cada mes, yield con el dividendo anual (proyectado para
+    el año en curso) y bandas a partir del yield mínimo y máximo del período.
+    """
+    close = close.dropna()
+    if annual.empty or close.empty:
+        return None
+    adjusted = adjusted_annual_dividends(annual, cagr, current_year).sort_index()
+
+    # Último cierre de cada mes (el índice ya viene ordenado)
+    years = close.index.year.to_numpy()
+    months = close.index.month.to_numpy()
+    month_key = years * 12 + months
+    last_in_month = np.flatnonzero(np.append(month_key[1:] != month_key[:-1], True))
+    m_year = years[last_in_month]
+    m_price = close.to_numpy(dtype=float)[last_in_month]
+
+    m_div = _lookup(m_year, adjusted.index.to_numpy(), adjusted.to_numpy(dtype=float))
+    m_yield = m_div / m_price
+    if np.isnan(m_yield).all():
+        return None
+    yield_min = np.nanmin(m_yield)
+    yield_max = np.nanmax(m_yield)
+
+    table = pd.DataFrame({
+        "Año": m_year,
+        "Mes": _MONTH_NAMES[months[last_in_month]],
+        "Precio": m_price,
+        "Dividendo Anual": m_div,
+        "Yield": m_yield,
+        "Precio Sobrevalorado": m_div / yield_min,
+        "Precio Infravalorado": m_div / yield_max,
+    })
+
+    # Línea escalonada: cada año con dividendo va del 1-ene al 1-ene siguiente (el último, hasta el último cierre)
+    band_years = np.unique(m_year)
+    band_div = _lookup(band_years, adjusted.index.to_numpy(), adjusted.to_numpy(dtype=float))
+    band_years, band_div = band_years[~np.isnan(band_div)], band_div[~np.isnan(band_div)]
+    starts = (band_years - 1970).astype("datetime64[Y]").astype("datetime64[ns]")
+    next_starts = (band_years + 1 - 1970).astype("datetime64[Y]").astype("datetime64[ns]")
+    last_date = close.index[-1].tz_localize(None) if close.index.tz is not None else close.index[-1]
+    ends = np.append(next_starts[:-1], last_date.to_datetime64().astype("datetime64[ns]"))
+
+    last_year = m_year.max()
+    last_dividend = m_div[m_year == last_year][-1]
+    return GeraldineWeiss(
+        table=table,
+        yield_max=yield_max,
+        yield_min=yield_min,
+        last_dividend=last_dividend,
+        band_x=np.column_stack([starts, ends]).ravel(),
+        band_over=np.repeat(band_div / yield_min, 2),
+        band_under=np.repeat(band_div / yield_max, 2),
+    )
+
+
+def geraldine_weiss(
+    daily_prices: pd.DataFrame, dividends: pd.Series, current_year: int | None = None
+) -> GeraldineWeiss | None:
+    """Geraldine Weiss a partir de precios diarios y dividendos crudos de un ticker."""
+    current_year = current_year or pd.Timestamp.today().year
+    annual = annual_dividends(dividends, daily_prices)
+    cagr, _ = dividend_cagr(annual)
+    return gw_from_annual(daily_prices["Close"], annual, cagr, current_year)
+
+
+def geraldine_weiss_batch(
+    prices: Mapping[str, pd.DataFrame],
+    dividends: Mapping[str, pd.Series],
+    current_year: int | None = None,
+) -> dict[str, GeraldineWeiss | None]:
+    """Aplica Geraldine Weiss a un universo de tickers; los que no tienen datos quedan en None."""
+    current_year = current_year or pd.Timestamp.today().year
+    return {
+        ticker: geraldine_weiss(df, dividends.get(ticker, pd.Series(dtype=float)), current_year)
+        for ticker, df in prices.items()
+    }
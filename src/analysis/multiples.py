@@ -0,0 +1,81 @@
+# src/analysis/multiples.py
+"""Valoración por múltiplos: deuda neta frente a FCF, PER histórico y EV/EBITDA por año."""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+def first_column(df: pd.DataFrame, candidates: list[str]) -> pd.Series | None:
+    """Primera columna de `candidates` que exista en `df` (Yahoo cambia el nombre según el ticker)."""
+    found = next((c for c in candidates if c in df.columns), None)
+    return df[found] if found is not None else None
+
+
+def net_debt(balance_sheet: pd.DataFrame) -> pd.Series | None:
+    """Deuda total (o de largo plazo) menos caja, por año; None si falta alguna de las dos."""
+    total_debt = first_column(balance_sheet, ["Total Debt", "Long Term Debt"])
+    cash = first_column(balance_sheet, ["Cash And Cash Equivalents", "Cash"])
+    if total_debt is None or cash is None:
+        return None
+    return total_debt - cash
+
+
+def _frame(columns: dict[str, pd.Series | None]) -> pd.DataFrame:
+    """DataFrame con las series disponibles (las None se omiten), sin infinitos ni años vacíos."""
+    available = {name: serie for name, serie in columns.items() if serie is not None}
+    if not available:
+        return pd.DataFrame()
+    return pd.DataFrame(available).replace([np.inf, -np.inf], np.nan).dropna(how="all")
+
+
+@dataclass(frozen=True)
+class MultiplesAnalysis:
+    """Series anuales del bloque "Valoración por Múltiplos"."""
+
+    debt: pd.DataFrame               # FCF, Deuda Neta y Deuda Neta/FCF (las que haya)
+    per: pd.DataFrame | None         # EPS, Precio (cierre anual) y PER; None sin "Basic EPS"
+    ev: pd.DataFrame                 # EBITDA, EV y EV/EBITDA (las que haya)
+    current_ev_ebitda: float | None  # último EV/EBITDA disponible
+
+
+def compute_multiples(
+    info: dict,
+    prices: pd.DataFrame,
+    balance_sheet: pd.DataFrame,
+    income: pd.DataFrame,
+    cashflow: pd.DataFrame,
+) -> MultiplesAnalysis:
+    """Calcula deuda/FCF, PER y EV/EBITDA de todos los años a partir de los estados del snapshot."""
+    # ─── Deuda neta vs FCF ──────────────────────────────────────
+    deuda_neta = net_debt(balance_sheet)
+    debt = _frame({"FCF": cashflow.get("Free Cash Flow"), "Deuda Neta": deuda_neta})
+    if {"FCF", "Deuda Neta"} <= set(debt.columns):
+        debt["Deuda Neta/FCF"] = debt["Deuda Neta"] / debt["FCF"]
+        debt = debt.replace([np.inf, -np.inf], np.nan).dropna()
+
+    # ─── PER histórico (último cierre de cada año) ──────────────
+    per = None
+    if "Basic EPS" in income.columns and not prices.empty:
+        price_yearly = pd.to_numeric(prices["Close"].resample("YE").last(), errors="coerce")
+        price_yearly.index = price_yearly.index.year
+        per = pd.DataFrame({"EPS": income["Basic EPS"], "Precio": price_yearly}).dropna()
+        per["PER"] = per["Precio"] / per["EPS"]
+        per = per.replace([np.inf, -np.inf], np.nan).dropna()
+
+    # ─── EV = capitalización + deuda neta ───────────────────────
+    ebitda = income.get("EBITDA")
+    market_cap = pd.to_numeric(info.get("marketCap"), errors="coerce")
+    if ebitda is not None and deuda_neta is not None and pd.notna(market_cap):
+        enterprise_value = market_cap + deuda_neta
+        ev = _frame({"EBITDA": ebitda, "EV": enterprise_value, "EV/EBITDA": enterprise_value / ebitda})
+    else:
+        ev = _frame({"EBITDA": ebitda})
+    ev_ebitda = ev["EV/EBITDA"].dropna() if "EV/EBITDA" in ev.columns else pd.Series(dtype=float)
+
+    return MultiplesAnalysis(
+        debt=debt,
+        per=per,
+        ev=ev,
+        current_ev_ebitda=float(ev_ebitda.iloc[-1]) if not ev_ebitda.empty else None,
+    )
@@ -0,0 +1,324 @@
+# src/analysis/pipeline.py
+"""Puntos de entrada cacheados: cargan el snapshot de un ticker y ejecutan el análisis una sola vez."""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable
+
+import pandas as pd
+
+from ..services import price_store
+from ..services.cache import cache_data
+from ..services.portfolio_store import read_transactions, read_valuations, save_valuations
+from ..services.snapshot import SNAPSHOT_TTL, load_snapshot, normalize_statement
+from ..services.swr import SWR
+from ..services.yf_client import daily_history, fetch_datasets, fetch_funds, history_batch, history_resiliente
+from .dividend_analytics import DividendAnalytics, compute_dividend_analytics
+from .downsample import downsample
+from .etf import EtfAnalysis, close_matrix, compute_etf_analysis
+from .montecarlo import MonteCarloResult, monte_carlo, monte_carlo_inputs
+from .multiples import MultiplesAnalysis, compute_multiples
+from .portfolio import Market, PortfolioAnalysis, compute_portfolio, market_data, update_portfolio
+from .price_summary import PriceSummary, compute_price_summary
+from .ratios import compute_ratios
+from .returns import PortfolioReturns, compute_returns, extend_valuations, market_key, merge_valuations
+from .statements import (
+    BalanceAnalysis,
+    CashFlowAnalysis,
+    IncomeAnalysis,
+    compute_balance,
+    compute_cashflow,
+    compute_income,
+)
+from .valuation import HeaderMetrics, header_metrics
+
+logger = logging.getLogger(__name__)
+
+# Tickers que el screener analiza a la vez
+SCREENER_MAX_WORKERS = 4
+# Lo único que el screener pide por ticker además del historial (info y balance: 2 peticiones)
+SCREENER_DATASETS = ("info", "balance_sheet")
+# Resultados del screener que se conservan en memoria, por (tickers, período)
+SCREENER_CACHE_SIZE = 8
+
+# Carteras cuyo último análisis se conserva en memoria para actualizarlo de forma incremental
+PORTFOLIO_CACHE_SIZE = int(os.getenv("PORTFOLIO_CACHE_SIZE", "32"))
+
+
+@cache_data(show_spinner=False, ttl=SNAPSHOT_TTL)
+def dividend_analytics(ticker: str, period: str) -> DividendAnalytics:
+    """Análisis de dividendos de un (ticker, período), compartido por todas las secciones de la página."""
+    snap = load_snapshot(ticker, period)
+    return compute_dividend_analytics(snap.daily_prices, snap.dividends, cashflow=snap.cashflow)
+
+
+@cache_data(show_spinner=False, ttl=SNAPSHOT_TTL)
+def ticker_metrics(ticker: str, period: str) -> HeaderMetrics:
+    """Métricas de cabecera de un ticker; las mismas que muestra la página de análisis."""
+    snap = load_snapshot(ticker, period)
+    return header_metrics(snap.info, snap.balance_sheet, snap.daily_prices, dividend_analytics(ticker, period))
+
+
+# ─── Secciones de la página de análisis ──────────────────────
+# Las que usan el historial en la frecuencia elegida se cachean por (ticker, período, intervalo);
+# las que sólo leen los estados anuales o el diario, por (ticker, período).
+
+
+@cache_data(show_spinner=False, ttl=SNAPSHOT_TTL)
+def price_summary(ticker: str, period: str, interval: str = "1d") -> PriceSummary:
+    """Rentabilidad y drawdown del historial en la frecuencia elegida."""
+    return compute_price_summary(load_snapshot(ticker, period, interval).prices)
+
+
+@cache_data(show_spinner=False, ttl=SNAPSHOT_TTL)
+def price_chart_series(
+    ticker: str, period: str, interval: str, max_points: int, start: str | None = None, end: str | None = None
+) -> tuple[pd.Series, pd.Series]:
+    """
+    Cierre y drawdown entre `start` y `end` (fechas ISO, incluidas), reducidos a `max_points` para dibujar.
+
+    El cierre usa LTTB y el drawdown mín/máx, para no perder ningún suelo; un rango más corto
+    devuelve más detalle con el mismo presupuesto de puntos.
+    """
+    close = load_snapshot(ticker, period, interval).prices["Close"].loc[start:end]
+    drawdown = price_summary(ticker, period, interval).drawdown.loc[start:end]
+    return downsample(close, max_points), downsample(drawdown, max_points, method="minmax")
+
+
+@cache_data(show_spinner=False, ttl=SNAPSHOT_TTL)
+def dividend_chart_series(ticker: str, period: str, max_points: int) -> tuple[pd.Series, pd.Series]:
+    """Yield diario y cierre diario (gráfico Geraldine Weiss) reducidos con LTTB a `max_points`."""
+    yield_series = dividend_analytics(ticker, period).yield_series
+    close = load_snapshot(ticker, period).daily_prices["Close"]
+    return downsample(yield_series, max_points), downsample(close, max_points)
+
+
+@cache_data(show_spinner=False, ttl=SNAPSHOT_TTL)
+def multiples_analysis(ticker: str, period: str, interval: str = "1d") -> MultiplesAnalysis:
+    snap = load_snapshot(ticker, period, interval)
+    return compute_multiples(snap.info, snap.prices, snap.balance_sheet, snap.income, snap.cashflow)
+
+
+@cache_data(show_spinner=False, ttl=SNAPSHOT_TTL)
+def balance_analysis(ticker: str, period: str) -> BalanceAnalysis:
+    return compute_balance(load_snapshot(ticker, period).balance_sheet)
+
+
+@cache_data(show_spinner=False, ttl=SNAPSHOT_TTL)
+def income_analysis(ticker: str, period: str) -> IncomeAnalysis:
+    snap = load_snapshot(ticker, period)
+    return compute_income(snap.income, snap.balance_sheet)
+
+
+@cache_data(show_spinner=False, ttl=SNAPSHOT_TTL)
+def cashflow_analysis(ticker: str, period: str) -> CashFlowAnalysis:
+    return compute_cashflow(load_snapshot(ticker, period).cashflow)
+
+
+@cache_data(show_spinner=False, ttl=SNAPSHOT_TTL)
+def ticker_ratios(ticker: str, period: str) -> pd.DataFrame:
+    """Ratios de todos los años, con el último cierre diario de cada año como precio."""
+    snap = load_snapshot(ticker, period)
+    year_end_price = snap.daily_prices["Close"].resample("YE").last()
+    year_end_price.index = year_end_price.index.year
+    return compute_ratios(snap.balance_sheet, snap.income, year_end_price).round(2)
+
+
+@cache_data(show_spinner=False, ttl=SNAPSHOT_TTL)
+def monte_carlo_projection(ticker: str, period: str, years: int, n_paths: int) -> MonteCarloResult | None:
+    """Bandas Monte Carlo de precio y dividendo desde el historial diario del snapshot; None sin historia suficiente."""
+    snap = load_snapshot(ticker, period)
+    div = dividend_analytics(ticker, period)
+    inputs = monte_carlo_inputs(
+        snap.daily_prices, snap.dividends, div.annual, ticker_metrics(ticker, period).dividend, div.cagr
+    )
+    return monte_carlo(inputs, years, n_paths) if inputs is not None else None
+
+
+ANALYSES = (
+    dividend_analytics,
+    ticker_metrics,
+    price_summary,
+    price_chart_series,
+    dividend_chart_series,
+    multiples_analysis,
+    balance_analysis,
+    income_analysis,
+    cashflow_analysis,
+    ticker_ratios,
+    monte_carlo_projection,
+)
+
+
+def clear_analysis() -> None:
+    """Vacía la caché de todos los análisis (botón "Refrescar caché")."""
+    for fn in ANALYSES:
+        fn.clear()
+    portfolio_market.clear()
+    etf_analysis.clear()
+    with _SCREENS_LOCK:
+        _SCREENS.clear()
+    with _PORTFOLIOS_LOCK:
+        _PORTFOLIOS.clear()
+
+
+# ─── Cartera ──────────────────────────────────────────────────
+@cache_data(show_spinner=False, ttl=SWR.policies["history"].fresh)
+def portfolio_market(tickers: tuple[str, ...]) -> Market:
+    """
+    Historial diario de todos los tickers de una cartera.
+
+    Los que nunca se descargaron se piden juntos (ver `history_batch`); el resto sale de la caché por
+    ticker de `history_resiliente`, así añadir un ticker nuevo no vuelve a leer los demás del disco.
+    """
+    missing = sorted(set(tickers) - price_store.stored_tickers(list(tickers), "1d"))
+    if missing:
+        history_batch(missing, period=price_store.STORE_PERIOD)
+    return market_data({t: history_resiliente(t, period=price_store.STORE_PERIOD, interval="1d") for t in tickers})
+
+
+def _portfolio_inputs(portfolio_id: int) -> tuple[pd.DataFrame, Market] | None:
+    """Libro de la cartera y su mercado desde la primera transacción (None si no tiene transacciones)."""
+    transactions = read_transactions(portfolio_id)
+    if transactions.empty:
+        return None
+    market = portfolio_market(tuple(sorted(transactions["ticker"].unique())))
+    return transactions, market.since(pd.Timestamp(transactions["fecha"].min()))
+
+
+_PORTFOLIOS: OrderedDict[int, PortfolioAnalysis] = OrderedDict()
+_PORTFOLIOS_LOCK = threading.Lock()
+
+
+def portfolio_analysis(portfolio_id: int) -> PortfolioAnalysis | None:
+    """
+    Análisis de una cartera (None si no tiene transacciones), actualizado de forma incremental.
+
+    Se conserva el último análisis de cada cartera (LRU de PORTFOLIO_CACHE_SIZE); si desde entonces
+    sólo se añadieron transacciones o barras nuevas, se recalcula desde la primera fecha afectada.
+    """
+    inputs = _portfolio_inputs(portfolio_id)
+    if inputs is None:
+        with _PORTFOLIOS_LOCK:
+            _PORTFOLIOS.pop(portfolio_id, None)
+        return None
+    transactions, market = inputs
+
+    with _PORTFOLIOS_LOCK:
+        previous = _PORTFOLIOS.get(portfolio_id)
+    if previous is None:
+        analysis = compute_portfolio(transactions, market)
+    else:
+        analysis = update_portfolio(previous, transactions, market)
+
+    with _PORTFOLIOS_LOCK:
+        _PORTFOLIOS[portfolio_id] = analysis
+        _PORTFOLIOS.move_to_end(portfolio_id)
+        while len(_PORTFOLIOS) > PORTFOLIO_CACHE_SIZE:
+            _PORTFOLIOS.popitem(last=False)
+    return analysis
+
+
+def portfolio_returns(portfolio_id: int) -> PortfolioReturns | None:
+    """
+    TWR y XIRR de una cartera a partir de sus valoraciones diarias guardadas en disco.
+
+    Sólo se calculan (y se guardan) las filas desde la última valoración guardada; las escrituras en
+    el libro ya descartaron las posteriores a la fecha que cambió (ver `portfolio_store`).
+    """
+    # El libro ya colocado en el calendario sale del análisis en memoria (mismo mercado)
+    analysis = portfolio_analysis(portfolio_id)
+    if analysis is None or analysis.value.empty:
+        return None
+    market = analysis.market
+    key = market_key(market)
+    stored = read_valuations(portfolio_id, key)
+    rows = extend_valuations(stored, analysis.ledger, market)
+    from_scratch = rows.index[0] == market.close.index[0]
+    save_valuations(portfolio_id, rows, key, replace_all=from_scratch)
+    return compute_returns(rows if from_scratch else merge_valuations(stored, rows))
+
+
+# ─── ETFs ─────────────────────────────────────────────────────
+@cache_data(show_spinner=False, ttl=SWR.policies["history"].fresh)
+def etf_analysis(tickers: tuple[str, ...], period: str) -> EtfAnalysis:
+    """
+    Comparación de una lista de ETFs: datos de fondo desde la caché persistente (ver `fund_data`) y
+    precios con descargas agrupadas. Cambiar la selección sólo descarga los ETFs nuevos.
+    """
+    funds = fetch_funds(list(tickers))
+    try:
+        prices = history_batch(list(tickers), period=period)
+    except Exception as e:
+        logger.warning("Descarga agrupada de ETFs fallida (%s); se sigue ticker a ticker", e)
+        prices = {t: history_resiliente(t, period=period, interval="1d") for t in tickers}
+    return compute_etf_analysis(funds, close_matrix(prices))
+
+
+# ─── Screener ─────────────────────────────────────────────────
+_SCREENS: OrderedDict[tuple[tuple[str, ...], str], tuple[float, pd.DataFrame]] = OrderedDict()
+_SCREENS_LOCK = threading.Lock()
+
+
+def _screener_metrics(ticker: str, period: str) -> HeaderMetrics:
+    """
+    Las mismas métricas que `ticker_metrics`, sin cachés de Streamlit (corre en hilos sin sesión) y sin
+    los estados que no usa ninguna columna: cuenta de resultados y flujo de caja no se descargan.
+    """
+    daily, dividends = daily_history(ticker, period)
+    data = fetch_datasets(ticker, SCREENER_DATASETS)
+    return header_metrics(
+        data["info"], normalize_statement(data["balance_sheet"]), daily, compute_dividend_analytics(daily, dividends)
+    )
+
+
+def run_screener(
+    tickers: list[str],
+    period: str,
+    on_progress: Callable[[int, int, str], None] | None = None,
+    max_workers: int = SCREENER_MAX_WORKERS,
+) -> pd.DataFrame:
+    """
+    Calcula las métricas de cabecera de muchos tickers en paralelo.
+
+    Los precios de todo el universo se piden en descargas agrupadas; por ticker sólo se piden el info y el
+    balance (SCREENER_DATASETS). La tabla se guarda entera (LRU de SCREENER_CACHE_SIZE, SNAPSHOT_TTL) y
+    repetir el mismo análisis no vuelve a calcular nada.
+    `on_progress(hechos, total, ticker)` se llama desde el hilo que invoca la función, así que
+    puede actualizar widgets de Streamlit. Los tickers que fallan quedan con su error en la columna "error".
+    """
+    key = (tuple(tickers), period)
+    with _SCREENS_LOCK:
+        cached = _SCREENS.get(key)
+        if cached is not None and time.time() - cached[0] <= SNAPSHOT_TTL:
+            _SCREENS.move_to_end(key)
+            return cached[1]
+
+    # Precios de todo el universo en descargas agrupadas; después cada ticker los lee del almacén en disco
+    try:
+        history_batch(tickers, period=period)
+    except Exception as e:
+        logger.warning("Descarga agrupada fallida (%s); se sigue ticker a ticker", e)
+
+    rows: dict[str, dict] = {}
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="screener") as pool:
+        futures = {pool.submit(_screener_metrics, t, period): t for t in tickers}
+        for done, fut in enumerate(as_completed(futures), start=1):
+            ticker = futures[fut]
+            try:
+                rows[ticker] = {**fut.result().as_dict(), "error": None}
+            except Exception as e:
+                rows[ticker] = {"error": str(e)}
+            if on_progress:
+                on_progress(done, len(tickers), ticker)
+    table = pd.DataFrame.from_dict(rows, orient="index").reindex(tickers)
+
+    with _SCREENS_LOCK:
+        _SCREENS[key] = (time.time(), table)
+        _SCREENS.move_to_end(key)
+        while len(_SCREENS) > SCREENER_CACHE_SIZE:
+            _SCREENS.popitem(last=False)
+    return table
@@ -0,0 +1,404 @@
+# src/analysis/portfolio.py
+"""
+Seguimiento de cartera: valor, rentabilidad, dividendos, drawdown y posiciones a partir del libro
+de transacciones y del historial diario de todos sus tickers.
+
+Las series se calculan como matrices fecha x ticker (acciones, cierres, dividendos por acción) con
+operaciones vectorizadas. `update_portfolio` reutiliza un análisis anterior y sólo recalcula desde
+la primera fecha afectada (una transacción nueva o la última barra), no toda la historia.
+"""
+from dataclasses import dataclass
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+TRANSACTION_TYPES = ("compra", "venta", "dividendo")
+TRANSACTION_COLUMNS = ["id", "ticker", "fecha", "tipo", "cantidad", "precio", "comision"]
+
+# Acciones por debajo de esto se consideran posición cerrada (restos de coma flotante)
+_SHARES_EPS = 1e-9
+
+
+# ─── Datos de mercado ─────────────────────────────────────────
+@dataclass(frozen=True)
+class Market:
+    """Historial diario de los tickers de una cartera en un calendario común (fechas sin hora)."""
+
+    close: pd.DataFrame       # cierre real de cada día (sin el ajuste por dividendos de Yahoo), fecha x ticker
+    dividends: pd.DataFrame   # dividendo por acción en su fecha ex, fecha x ticker
+    splits: pd.DataFrame      # ratio del split en su fecha (0 = sin split), fecha x ticker
+
+    @cached_property
+    def split_events(self) -> pd.Series:
+        """Ratio de cada split, indexado por (fecha, ticker)."""
+        values = self.splits.to_numpy()
+        rows, cols = np.nonzero(values > 0)
+        index = pd.MultiIndex.from_arrays([self.splits.index[rows], self.splits.columns[cols]])
+        return pd.Series(values[rows, cols], index=index)
+
+    def since(self, day: pd.Timestamp) -> "Market":
+        """El mismo mercado desde `day`: el calendario de una cartera empieza en su primera transacción."""
+        return Market(self.close.loc[day:], self.dividends.loc[day:], self.splits.loc[day:])
+
+
+def unadjusted_close(close: pd.Series, dividends: pd.Series) -> pd.Series:
+    """
+    Deshace el ajuste por dividendos de Yahoo (`auto_adjust`) para valorar con el precio real de cada día.
+
+    Yahoo multiplica los cierres anteriores a cada fecha ex por (1 - D / cierre previo real); los
+    factores se reconstruyen desde el dividendo más reciente hacia atrás (un paso por dividendo).
+    """
+    divs = dividends[dividends > 0]
+    if divs.empty:
+        return close
+    values = close.to_numpy(dtype=float)
+    pos = close.index.searchsorted(divs.index)
+    amounts = divs.to_numpy(dtype=float)
+    mult = np.ones(len(divs))
+    later = 1.0
+    for i in range(len(divs) - 1, -1, -1):
+        if 0 < pos[i] <= len(values) and values[pos[i] - 1] > 0:
+            raw_prev = values[pos[i] - 1] / later + amounts[i]
+            mult[i] = 1 - amounts[i] / raw_prev
+            later *= mult[i]
+    # Factor de cada fecha: producto de los multiplicadores de las fechas ex posteriores
+    tail = np.append(np.cumprod(mult[::-1])[::-1], 1.0)
+    return close / tail[divs.index.searchsorted(close.index, side="right")]
+
+
+def _calendar_day(index: pd.DatetimeIndex) -> pd.DatetimeIndex:
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.normalize()
+
+
+def market_data(frames: dict[str, pd.DataFrame]) -> Market:
+    """Une los historiales (ver `yf_client.history_batch`) en matrices sobre la unión de sus calendarios."""
+    close, dividends, splits = {}, {}, {}
+    for ticker, df in frames.items():
+        if df.empty or "Close" not in df:
+            continue
+        df = df.set_axis(_calendar_day(df.index))
+        df = df[~df.index.duplicated(keep="last")]
+        divs = df["Dividends"].fillna(0.0) if "Dividends" in df else pd.Series(0.0, index=df.index)
+        close[ticker] = unadjusted_close(df["Close"], divs)
+        dividends[ticker] = divs
+        splits[ticker] = df["Stock Splits"].fillna(0.0) if "Stock Splits" in df else pd.Series(0.0, index=df.index)
+    if not close:
+        empty = pd.DataFrame(index=pd.DatetimeIndex([], name="Date"), dtype=float)
+        return Market(empty, empty, empty)
+    close_df = pd.DataFrame(close).sort_index().ffill()
+    close_df.index.name = "Date"
+    return Market(
+        close=close_df,
+        dividends=pd.DataFrame(dividends).reindex(close_df.index).fillna(0.0),
+        splits=pd.DataFrame(splits).reindex(close_df.index).fillna(0.0),
+    )
+
+
+def _split_factor_after(splits: pd.Series, dates: pd.DatetimeIndex) -> np.ndarray:
+    """Acciones de hoy por cada acción de `dates`: producto de los splits estrictamente posteriores."""
+    tail = np.append(np.cumprod(splits.to_numpy()[::-1])[::-1], 1.0)
+    return tail[splits.index.searchsorted(dates, side="right")]
+
+
+# ─── Libro de transacciones ───────────────────────────────────
+def _row_hashes(transactions: pd.DataFrame) -> np.ndarray:
+    return pd.util.hash_pandas_object(transactions[TRANSACTION_COLUMNS], index=False).to_numpy()
+
+
+def ledger(transactions: pd.DataFrame, market: Market) -> pd.DataFrame:
+    """
+    Transacciones ordenadas y llevadas al calendario del mercado.
+
+    - `dia`: fecha de la transacción sin hora.
+    - `fila`: posición de `dia` en el calendario (o del siguiente día con cotización).
+    - `acciones`: variación de acciones en unidades actuales (los precios de Yahoo ya vienen ajustados por splits).
+    - `flujo`: dinero aportado a la cartera (compras con comisión, ventas en negativo).
+    - `cobro`: dividendo registrado a mano (cantidad x precio - comisión).
+    - `huella`: hash de la fila original, para saber qué transacciones son nuevas en `update_portfolio`.
+    """
+    tx = transactions.sort_values(["fecha", "id"]).reset_index(drop=True)
+    tx["huella"] = _row_hashes(tx)
+    dates = _calendar_day(pd.DatetimeIndex(pd.to_datetime(tx["fecha"], format="ISO8601")))
+    tx["dia"] = dates
+    _place(tx, market)
+
+    # Sólo los tickers con algún split necesitan factor (pocos en una cartera)
+    factor = np.ones(len(tx))
+    events = market.split_events
+    for ticker, splits in events.groupby(level=1):
+        pos = np.flatnonzero(tx["ticker"].to_numpy() == ticker)
+        if len(pos):
+            factor[pos] = _split_factor_after(splits.droplevel(1), dates[pos])
+    sign = tx["tipo"].map({"compra": 1.0, "venta": -1.0, "dividendo": 0.0}).to_numpy()
+    amount = (tx["cantidad"] * tx["precio"]).to_numpy()
+    fee = tx["comision"].to_numpy()
+    tx["acciones"] = sign * tx["cantidad"].to_numpy() * factor
+    tx["flujo"] = np.where(sign > 0, amount + fee, np.where(sign < 0, -(amount - fee), 0.0))
+    tx["cobro"] = np.where(sign == 0, amount - fee, 0.0)
+    return tx
+
+
+def _place(tx: pd.DataFrame, market: Market) -> None:
+    """Sitúa cada transacción en el calendario de `market` (columnas `fila` y `en_mercado`)."""
+    rows = market.close.index.searchsorted(tx["dia"])
+    tx["fila"] = np.minimum(rows, max(len(market.close) - 1, 0))
+    tx["en_mercado"] = tx["ticker"].isin(market.close.columns)
+
+
+# ─── Análisis ─────────────────────────────────────────────────
+@dataclass(frozen=True)
+class PortfolioAnalysis:
+    ledger: pd.DataFrame         # libro con el que se calculó (ver `ledger`), para detectar qué cambió
+    market: Market
+    holdings: pd.DataFrame       # acciones en cartera al cierre, fecha x ticker
+    value: pd.Series             # valor de mercado al cierre
+    invested: pd.Series          # aportado neto acumulado (compras - ventas)
+    income: pd.DataFrame         # dividendos cobrados, fecha x ticker
+    growth: pd.Series            # rentabilidad encadenada, base 1 (sin el efecto de aportaciones y retiradas)
+    drawdown: pd.Series          # % bajo el máximo previo de `growth`
+    positions: pd.DataFrame      # resumen por ticker (ver `positions_table`)
+    missing: tuple[str, ...]     # tickers sin historial de precios (no se valoran)
+
+    @property
+    def dividends(self) -> pd.Series:
+        """Dividendos cobrados por fecha (toda la cartera)."""
+        return self.income.sum(axis=1)
+
+
+def _by_row(tx: pd.DataFrame, column: str, rows: pd.RangeIndex, tickers: pd.Index) -> pd.DataFrame:
+    """Suma de `column` por (fila, ticker) como matriz densa sobre `rows` x `tickers`."""
+    grouped = tx.groupby(["fila", "ticker"])[column].sum().unstack(fill_value=0.0)
+    return grouped.reindex(index=rows, columns=tickers, fill_value=0.0)
+
+
+def series_from(
+    tx: pd.DataFrame,
+    market: Market,
+    start: int,
+    holdings0: pd.Series,
+    value0: float,
+    invested0: float,
+    growth0: float,
+    peak0: float,
+) -> tuple[pd.DataFrame, pd.Series, pd.Series, pd.DataFrame, pd.Series, pd.Series]:
+    """
+    Series de la cartera desde la fila `start` partiendo del estado al cierre de la fila anterior.
+
+    La rentabilidad diaria trata las aportaciones como hechas al inicio del día:
+    r = (valor + dividendos) / (valor previo + aportado) - 1, así comprar o vender no cambia la rentabilidad.
+    """
+    dates = market.close.index[start:]
+    rows = pd.RangeIndex(start, len(market.close))
+    tickers = market.close.columns
+    recorded_tickers = tickers.isin(tx.loc[tx["tipo"] == "dividendo", "ticker"].unique())
+    tx = tx[(tx["fila"] >= start) & tx["en_mercado"]]
+
+    delta = _by_row(tx, "acciones", rows, tickers)
+    shares = delta.to_numpy().cumsum(axis=0) + holdings0.reindex(tickers, fill_value=0.0).to_numpy()
+    shares[np.abs(shares) < _SHARES_EPS] = 0.0
+    close = market.close.iloc[start:].to_numpy()
+    value = np.nansum(shares * close, axis=1)
+
+    # Dividendos: acciones al cierre anterior a la fecha ex x dividendo por acción, salvo en los
+    # tickers con cobros registrados a mano, que sustituyen a la estimación
+    held_before = np.vstack([holdings0.reindex(tickers, fill_value=0.0).to_numpy(), shares[:-1]])
+    estimated = held_before * market.dividends.iloc[start:].to_numpy()
+    estimated[:, recorded_tickers] = 0.0
+    income = estimated + _by_row(tx, "cobro", rows, tickers).to_numpy()
+
+    flows = tx.groupby("fila")["flujo"].sum().reindex(rows, fill_value=0.0).to_numpy()
+    prev_value = np.append(value0, value[:-1])
+    base = prev_value + flows
+    with np.errstate(divide="ignore", invalid="ignore"):
+        daily = np.where(base > 0, (value + income.sum(axis=1)) / base - 1, 0.0)
+    growth = growth0 * np.cumprod(1 + daily)
+    peak = np.maximum(peak0, np.maximum.accumulate(growth))
+
+    return (
+        pd.DataFrame(shares, index=dates, columns=tickers),
+        pd.Series(value, index=dates, name="Valor"),
+        pd.Series(invested0 + flows.cumsum(), index=dates, name="Aportado neto"),
+        pd.DataFrame(income, index=dates, columns=tickers),
+        pd.Series(growth, index=dates, name="Rentabilidad acumulada"),
+        pd.Series((growth / peak - 1) * 100, index=dates, name="Drawdown (%)"),
+    )
+
+
+_STATE_COLUMNS = ["Acciones", "Coste", "Realizado"]
+
+
+def holdings_before(tx: pd.DataFrame, row: int) -> pd.Series:
+    """Acciones por ticker al cierre de la fila anterior a `row`, sumando el libro (sin recorrer fechas)."""
+    before = tx[(tx["fila"] < row) & tx["en_mercado"]]
+    return before.groupby("ticker")["acciones"].sum()
+
+
+def positions_table(
+    tx: pd.DataFrame, market: Market, income: pd.DataFrame, previous: pd.DataFrame | None = None
+) -> pd.DataFrame:
+    """
+    Posición actual por ticker con coste medio ponderado.
+
+    Columnas: Acciones, Coste medio, Coste, Precio, Valor, Peso (%), Plusvalía, Plusvalía (%),
+    Realizado (ventas frente a su coste medio) y Dividendos cobrados. Con `previous` (posiciones
+    calculadas con las transacciones anteriores a todas las de `tx`) sólo se recorre `tx`.
+    """
+    # Un solo recorrido del libro (ya en orden de fecha) con el estado de cada ticker
+    state: dict[str, list[float]] = {}
+    if previous is not None:
+        state = dict(zip(previous.index, previous[_STATE_COLUMNS].to_numpy().tolist()))
+    amounts = (tx["cantidad"] * tx["precio"]).tolist()
+    for ticker, tipo, qty, amount, fee in zip(tx["ticker"].tolist(), tx["tipo"].tolist(), tx["acciones"].tolist(),
+                                              amounts, tx["comision"].tolist()):
+        position = state.setdefault(ticker, [0.0, 0.0, 0.0])   # acciones, coste, realizado
+        if tipo == "compra":
+            position[0] += qty
+            position[1] += amount + fee
+        elif tipo == "venta" and position[0] > _SHARES_EPS:
+            sold = min(-qty, position[0])
+            sold_cost = position[1] * sold / position[0]
+            position[2] += amount - fee - sold_cost
+            position[0] -= sold
+            position[1] -= sold_cost
+            if position[0] < _SHARES_EPS:
+                position[0] = position[1] = 0.0
+
+    table = pd.DataFrame.from_dict(state, orient="index", columns=_STATE_COLUMNS).sort_index()
+    last_close = market.close.iloc[-1] if not market.close.empty else pd.Series(dtype=float)
+    table["Precio"] = last_close.reindex(table.index)
+    table["Coste medio"] = (table["Coste"] / table["Acciones"]).where(table["Acciones"] > 0)
+    table["Valor"] = table["Acciones"] * table["Precio"]
+    total = table["Valor"].sum()
+    table["Peso (%)"] = table["Valor"] / total * 100 if total > 0 else np.nan
+    table["Plusvalía"] = table["Valor"] - table["Coste"]
+    table["Plusvalía (%)"] = (table["Plusvalía"] / table["Coste"] * 100).where(table["Coste"] > 0)
+    table["Dividendos"] = income.sum().reindex(table.index, fill_value=0.0)
+    columns = ["Acciones", "Coste medio", "Coste", "Precio", "Valor", "Peso (%)", "Plusvalía", "Plusvalía (%)",
+               "Realizado", "Dividendos"]
+    return table[columns].sort_values("Valor", ascending=False)
+
+
+def _analysis(market: Market, tx: pd.DataFrame, series: tuple, positions: pd.DataFrame) -> PortfolioAnalysis:
+    holdings, value, invested, income, growth, drawdown = series
+    missing = tuple(sorted(set(tx["ticker"]) - set(market.close.columns)))
+    return PortfolioAnalysis(
+        ledger=tx,
+        market=market,
+        holdings=holdings,
+        value=value,
+        invested=invested,
+        income=income,
+        growth=growth,
+        drawdown=drawdown,
+        positions=positions,
+        missing=missing,
+    )
+
+
+def compute_portfolio(transactions: pd.DataFrame, market: Market) -> PortfolioAnalysis:
+    """Análisis completo de la cartera desde su primera cotización."""
+    tx = ledger(transactions[TRANSACTION_COLUMNS], market)
+    series = series_from(tx, market, 0, pd.Series(dtype=float), 0.0, 0.0, 1.0, 1.0)
+    return _analysis(market, tx, series, positions_table(tx, market, series[3]))
+
+
+def _changes(
+    previous: PortfolioAnalysis, transactions: pd.DataFrame, market: Market
+) -> tuple[int | None, pd.DataFrame]:
+    """
+    (primera fila del calendario de `market` que hay que recalcular, transacciones añadidas).
+
+    La fila es None si nada cambió y 0 (todo) si se borró o editó una transacción, si un ticker pasa
+    a tener cobros de dividendos registrados, si apareció un split o si el calendario cambió antes de
+    lo ya calculado; en otro caso, la fecha de la transacción nueva más antigua o la última barra ya
+    calculada (que pudo ser parcial).
+    """
+    old_hashes, new_hashes = previous.ledger["huella"].to_numpy(), _row_hashes(transactions)
+    if not np.isin(old_hashes, new_hashes).all() or len(np.unique(old_hashes)) != len(old_hashes):
+        return 0, transactions
+    added = transactions[~np.isin(new_hashes, old_hashes)]
+
+    old = previous.ledger
+    recorded = set(old.loc[old["tipo"] == "dividendo", "ticker"])
+    if not set(added.loc[added["tipo"] == "dividendo", "ticker"]) <= recorded:
+        return 0, added
+    if not market.split_events.equals(previous.market.split_events):
+        return 0, added
+
+    old_dates, new_dates = previous.market.close.index, market.close.index
+    candidates = []
+    if not added.empty:
+        first_added = _calendar_day(pd.DatetimeIndex(pd.to_datetime(added["fecha"], format="ISO8601"))).min()
+        candidates.append(int(new_dates.searchsorted(first_added)))
+    last_old = old_dates[-1] if len(old_dates) else None
+    if last_old is not None and (
+        new_dates[-1] != last_old
+        or not market.close.loc[last_old].equals(previous.market.close.loc[last_old].reindex(market.close.columns))
+    ):
+        candidates.append(int(new_dates.searchsorted(last_old)))
+    if not candidates:
+        return None, added
+    start = min(candidates)
+    if start == 0 or not new_dates[:start].equals(old_dates[:start]):
+        return 0, added
+    return start, added
+
+
+def _stack(kept: pd.DataFrame, tail: pd.DataFrame) -> pd.DataFrame:
+    """Filas ya calculadas + filas nuevas, con las columnas (tickers) de `tail`."""
+    if not kept.columns.equals(tail.columns):
+        kept = kept.reindex(columns=tail.columns, fill_value=0.0)
+    return pd.DataFrame(
+        np.vstack([kept.to_numpy(), tail.to_numpy()]), index=kept.index.append(tail.index), columns=tail.columns
+    )
+
+
+def update_portfolio(previous: PortfolioAnalysis, transactions: pd.DataFrame, market: Market) -> PortfolioAnalysis:
+    """
+    Análisis con el libro y los precios nuevos reutilizando `previous` hasta la primera fecha afectada.
+
+    Añadir una compra de hoy o una barra nueva recalcula una fila por ticker en lugar de años de
+    historia; del libro sólo se procesan las transacciones nuevas.
+    """
+    start, added = _changes(previous, transactions, market)
+    if start is None:
+        return previous
+    if start == 0:
+        return compute_portfolio(transactions, market)
+
+    new_tx = ledger(added[TRANSACTION_COLUMNS], market)
+    tx = pd.concat([previous.ledger, new_tx], ignore_index=True).sort_values(["fecha", "id"], ignore_index=True)
+    _place(tx, market)
+
+    kept = slice(None, start)
+    before = start - 1
+    holdings, value, invested, income, growth, drawdown = series_from(
+        tx,
+        market,
+        start,
+        previous.holdings.iloc[before],
+        float(previous.value.iloc[before]),
+        float(previous.invested.iloc[before]),
+        float(previous.growth.iloc[before]),
+        max(1.0, float(previous.growth.iloc[kept].max())),
+    )
+    series = (
+        _stack(previous.holdings.iloc[kept], holdings),
+        pd.concat([previous.value.iloc[kept], value]),
+        pd.concat([previous.invested.iloc[kept], invested]),
+        _stack(previous.income.iloc[kept], income),
+        pd.concat([previous.growth.iloc[kept], growth]),
+        pd.concat([previous.drawdown.iloc[kept], drawdown]),
+    )
+    # Posiciones: si todo lo nuevo es posterior al libro anterior, basta con seguir desde su estado
+    appended = previous.ledger.empty or new_tx.empty or (
+        (new_tx["fecha"].min(), new_tx["id"].min()) > (previous.ledger["fecha"].iloc[-1], previous.ledger["id"].max())
+    )
+    if appended:
+        positions = positions_table(new_tx, market, series[3], previous.positions)
+    else:
+        positions = positions_table(tx, market, series[3])
+    return _analysis(market, tx, series, positions)
@@ -0,0 +1,25 @@
+# src/analysis/price_summary.py
+"""Rentabilidad y drawdown del historial de precios que muestra la cabecera."""
+from dataclasses import dataclass
+
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class PriceSummary:
+    total_return: float | None    # % entre el primer y el último cierre
+    annual_return: float | None   # % anualizado
+    drawdown: pd.Series           # % bajo el máximo previo, por fecha
+
+
+def compute_price_summary(prices: pd.DataFrame) -> PriceSummary:
+    close = prices["Close"].dropna() if not prices.empty else pd.Series(dtype=float)
+    if close.empty:
+        return PriceSummary(None, None, pd.Series(dtype=float))
+    growth = close.iloc[-1] / close.iloc[0]
+    years_span = (close.index[-1] - close.index[0]).days / 365.25
+    return PriceSummary(
+        total_return=(growth - 1) * 100,
+        annual_return=(growth ** (1 / years_span) - 1) * 100 if years_span > 0 else None,
+        drawdown=((close / close.cummax() - 1) * 100).rename("Drawdown (%)"),
+    )
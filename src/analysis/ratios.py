@@ -0,0 +1,109 @@
+# src/analysis/ratios.py
+"""
+Ratios financieros ("Análisis Razonado") para todos los años en una sola pasada.
+
+Los estados vienen de `TickerSnapshot` (años x partidas, numéricos). Cada partida se resuelve
+con una lista de alias porque Yahoo no siempre usa el mismo nombre de columna.
+"""
+import numpy as np
+import pandas as pd
+
+BALANCE_ALIASES = {
+    "total_assets": ["Total Assets"],
+    "total_liabilities": ["Total Liabilities Net Minority Interest"],
+    "total_equity": ["Total Equity Gross Minority Interest", "Total Equity"],
+    "current_assets": ["Current Assets", "Total Current Assets"],
+    "current_liabilities": ["Current Liabilities", "Total Current Liabilities"],
+    "cash": ["Cash And Cash Equivalents", "Cash"],
+    "receivables": ["Net Receivables", "Accounts Receivable", "Accounts Receivables"],
+    "inventory": ["Inventory", "Total Inventory"],
+    "payables": ["Accounts Payable", "Account Payables"],
+    "total_debt": ["Total Debt", "Long Term Debt"],
+    "shares": ["Ordinary Shares Number"],
+}
+
+INCOME_ALIASES = {
+    "revenue": ["Total Revenue", "Revenue"],
+    "cost_of_revenue": ["Cost Of Revenue", "Cost of Revenue", "Cost Of Goods Sold"],
+    "net_income": ["Net Income"],
+}
+
+# Grupos que la tabla usa para colorear cada ratio; el resto se muestra como "Otros"
+RATIO_GROUPS = {
+    "liquidez": ["Razón Corriente", "Razón Ácida", "Capital de trabajo"],
+    "endeudamiento": ["Deuda/Patrimonio", "Deuda/Activos"],
+    "gestion": ["Rotación de inventarios", "Rotación de activos", "Duración Ctas por Cobrar", "Duración Ctas por Pagar"],
+    "rentabilidad": ["ROA (%)", "ROE (%)", "ROIC (%)"],
+}
+
+
+def resolve_columns(df: pd.DataFrame, aliases: dict[str, list[str]]) -> pd.DataFrame:
+    """
+    Devuelve un DataFrame con un nombre canónico por partida.
+
+    Para cada partida se usa la primera columna de la lista de alias que exista en `df`;
+    si no existe ninguna, la columna queda en NaN.
+    """
+    resolved = {}
+    for name, candidates in aliases.items():
+        found = next((c for c in candidates if c in df.columns), None)
+        resolved[name] = df[found] if found is not None else pd.Series(np.nan, index=df.index)
+    return pd.DataFrame(resolved, index=df.index, dtype=float)
+
+
+def safe_div(a: pd.Series, b: pd.Series) -> pd.Series:
+    """División elemento a elemento; NaN si falta algún dato o el divisor es 0."""
+    return a / b.where(b != 0)
+
+
+def compute_ratios(
+    balance_sheet: pd.DataFrame, income: pd.DataFrame, year_end_price: pd.Series | None = None
+) -> pd.DataFrame:
+    """
+    Calcula todos los ratios para todos los años comunes al balance y al estado de resultados.
+
+    `year_end_price` es el último cierre de cada año, indexado por año. Devuelve un DataFrame
+    con un año por fila (índice "Año") y un ratio por columna.
+    """
+    years = balance_sheet.index.intersection(income.index).sort_values()
+    bs = resolve_columns(balance_sheet.loc[years], BALANCE_ALIASES)
+    inc = resolve_columns(income.loc[years], INCOME_ALIASES)
+    price = (
+        year_end_price.reindex(years).astype(float)
+        if year_end_price is not None
+        else pd.Series(np.nan, index=years)
+    )
+
+    equity, assets, liabilities = bs["total_equity"], bs["total_assets"], bs["total_liabilities"]
+    revenue, cost, net_income = inc["revenue"], inc["cost_of_revenue"], inc["net_income"]
+    cash = bs["cash"].fillna(0)
+    invested_capital = bs["total_debt"] + equity - cash
+
+    ratios = pd.DataFrame(
+        {
+            # Liquidez
+            "Razón Corriente": safe_div(bs["current_assets"], bs["current_liabilities"]),
+            "Razón Ácida": safe_div(cash + bs["receivables"].fillna(0), bs["current_liabilities"]),
+            "Capital de trabajo": bs["current_assets"] - bs["current_liabilities"],
+            # Endeudamiento
+            "Deuda/Patrimonio": safe_div(liabilities, equity),
+            "Deuda/Activos": safe_div(liabilities, assets),
+            # Gestión
+            "Rotación de inventarios": safe_div(cost, bs["inventory"]),
+            "Rotación de activos": safe_div(revenue, assets),
+            "Duración Ctas por Cobrar": safe_div(bs["receivables"], revenue) * 365,
+            "Duración Ctas por Pagar": safe_div(bs["payables"], cost) * 365,
+            # Rentabilidad
+            "ROA (%)": safe_div(net_income, assets) * 100,
+            "ROE (%)": safe_div(net_income, equity) * 100,
+            "ROIC (%)": safe_div(net_income, invested_capital) * 100,
+            # Otros
+            "Margen de utilidad (%)": safe_div(net_income, revenue) * 100,
+            "Apalancamiento (x)": safe_div(assets, equity),
+            "Valor libro ajustado": safe_div(equity, bs["shares"]),
+            "Valor bolsa/libro": safe_div(price, safe_div(assets - liabilities, bs["shares"])),
+        },
+        index=years,
+    )
+    ratios.index.name = "Año"
+    return ratios.replace([np.inf, -np.inf], np.nan)
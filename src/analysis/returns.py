@@ -0,0 +1,188 @@
+# src/analysis/returns.py
+"""
+Rentabilidad de una cartera ponderada por tiempo (TWR) y por dinero (XIRR).
+
+Ambas salen de las valoraciones diarias de la cartera (valor, aportado, flujo, dividendos e índice
+encadenado), que se guardan en disco y sólo crecen: `extend_valuations` calcula las filas desde la
+última guardada, así una barra nueva añade una fila en lugar de reconstruir años de historia.
+"""
+import hashlib
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .portfolio import Market, holdings_before, series_from
+
+VALUATION_COLUMNS = ["valor", "aportado", "flujo", "dividendos", "indice"]
+
+# Periodos de la tabla de rentabilidades: etiqueta -> años hacia atrás (None = desde el inicio, 0 = año en curso)
+PERIODS = {"Desde el inicio": None, "Año en curso": 0, "1 año": 1, "3 años": 3, "5 años": 5, "10 años": 10}
+
+
+# ─── Valoraciones diarias ─────────────────────────────────────
+def extend_valuations(stored: pd.DataFrame, tx: pd.DataFrame, market: Market) -> pd.DataFrame:
+    """
+    Filas de valoración que faltan en `stored` para llegar al final de `market`.
+
+    Se recalcula también la última fila guardada (pudo ser una barra a medias). El estado de
+    partida sale de la fila anterior y de las acciones del libro hasta esa fecha. Si `stored` no
+    encaja con el calendario de `market` (cambió el primer día o los días de cotización), se
+    devuelven todas las filas.
+    """
+    dates = market.close.index
+    start = len(stored) - 1
+    if start < 1 or len(dates) <= start or not dates[:len(stored)].equals(stored.index):
+        start = 0
+    if start == 0:
+        holdings0, value0, invested0, growth0, peak0 = pd.Series(dtype=float), 0.0, 0.0, 1.0, 1.0
+    else:
+        prev = stored.iloc[start - 1]
+        holdings0 = holdings_before(tx, start)
+        value0, invested0, growth0 = prev["valor"], prev["aportado"], prev["indice"]
+        peak0 = max(1.0, float(stored["indice"].iloc[:start].max()))
+
+    _, value, invested, income, growth, _ = series_from(tx, market, start, holdings0, value0, invested0, growth0, peak0)
+    return pd.DataFrame(
+        {
+            "valor": value,
+            "aportado": invested,
+            "flujo": np.diff(invested.to_numpy(), prepend=invested0),
+            "dividendos": income.sum(axis=1),
+            "indice": growth,
+        },
+        index=dates[start:],
+    ).rename_axis("Date")
+
+
+def merge_valuations(stored: pd.DataFrame, rows: pd.DataFrame) -> pd.DataFrame:
+    """`stored` con `rows` encima (las fechas repetidas se quedan con la fila nueva)."""
+    if rows.empty:
+        return stored
+    return pd.concat([stored[stored.index < rows.index[0]], rows])
+
+
+def market_key(market: Market) -> str:
+    """Huella de lo que del mercado invalida valoraciones ya guardadas (los splits cambian las cantidades)."""
+    events = market.split_events
+    h = hashlib.blake2b(digest_size=16)
+    h.update(pd.util.hash_pandas_object(events, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+# ─── TWR ──────────────────────────────────────────────────────
+def _period_start(dates: pd.DatetimeIndex, years: int | None) -> int:
+    """Posición de la última valoración anterior al periodo (base del periodo)."""
+    if years is None:
+        return 0
+    end = dates[-1]
+    cutoff = pd.Timestamp(year=end.year, month=1, day=1) if years == 0 else end - pd.DateOffset(years=years)
+    return max(int(dates.searchsorted(cutoff)) - 1, 0)
+
+
+def twr(valuations: pd.DataFrame, years: int | None = None) -> tuple[float, float | None]:
+    """
+    (TWR del periodo, TWR anualizada) en %; la anualizada sólo para periodos de más de un año.
+
+    El índice encadenado neutraliza aportaciones y retiradas, así la TWR mide la gestión y no el
+    momento de los aportes.
+    """
+    index = valuations["indice"].to_numpy()
+    dates = valuations.index
+    base = _period_start(dates, years)
+    growth = index[-1] / index[base] if years is not None else index[-1]
+    days = (dates[-1] - dates[base]).days
+    annual = (growth ** (365.25 / days) - 1) * 100 if days > 365 else None
+    return (growth - 1) * 100, annual
+
+
+# ─── XIRR ─────────────────────────────────────────────────────
+def xirr(
+    amounts: np.ndarray, days: np.ndarray, guess: float = 0.1, tol: float = 1e-10, max_iter: int = 50
+) -> float | None:
+    """
+    Tasa anual r con Σ a_i · (1 + r)^(-d_i / 365) = 0, donde `days` cuenta los días desde el primer flujo.
+
+    Newton con el VAN y su derivada calculados vectorizados sobre todos los flujos en cada paso
+    (convergencia cuadrática: pocas iteraciones); si no converge se recurre a bisección. None si
+    todos los flujos tienen el mismo signo (no hay tasa).
+    """
+    amounts = np.asarray(amounts, dtype=float)
+    t = np.asarray(days, dtype=float) / 365.0
+    if not (amounts > 0).any() or not (amounts < 0).any():
+        return None
+
+    def npv_and_slope(rate: float) -> tuple[float, float]:
+        discount = (1.0 + rate) ** -t
+        flows = amounts * discount
+        return flows.sum(), -(t * flows).sum() / (1.0 + rate)
+
+    rate = guess
+    for _ in range(max_iter):
+        npv, slope = npv_and_slope(rate)
+        if not np.isfinite(npv) or slope == 0 or not np.isfinite(slope):
+            break
+        new_rate = rate - npv / slope
+        if new_rate <= -1.0:
+            new_rate = (rate - 1.0) / 2   # sin salir del dominio (r > -1)
+        if abs(new_rate - rate) < tol:
+            return new_rate
+        rate = new_rate
+
+    # Bisección sobre un intervalo con cambio de signo
+    low, high = -0.9999, 10.0
+    npv_low = npv_and_slope(low)[0]
+    if np.sign(npv_low) == np.sign(npv_and_slope(high)[0]):
+        return None
+    for _ in range(200):
+        mid = (low + high) / 2
+        npv_mid = npv_and_slope(mid)[0]
+        if abs(high - low) < tol:
+            break
+        if np.sign(npv_mid) == np.sign(npv_low):
+            low, npv_low = mid, npv_mid
+        else:
+            high = mid
+    return (low + high) / 2
+
+
+def money_weighted(valuations: pd.DataFrame, years: int | None = None) -> float | None:
+    """
+    XIRR del periodo en % (anual): aportaciones como salidas, ventas y dividendos como entradas y el
+    valor final como último cobro. En un periodo parcial, el valor al inicio cuenta como aportación.
+    """
+    dates = valuations.index
+    base = _period_start(dates, years)
+    flows = (valuations["dividendos"] - valuations["flujo"]).to_numpy(copy=True)
+    if base > 0:
+        # El valor al cierre anterior al periodo entra como aportación inicial
+        flows = np.append(-valuations["valor"].iloc[base], flows[base + 1:])
+        dates = dates[base:]
+    flows[-1] += valuations["valor"].iloc[-1]
+    days = (dates - dates[0]).days.to_numpy()
+    rate = xirr(flows, days)
+    return None if rate is None else rate * 100
+
+
+# ─── Resumen ──────────────────────────────────────────────────
+@dataclass(frozen=True)
+class PortfolioReturns:
+    valuations: pd.DataFrame   # valoración diaria completa (ver VALUATION_COLUMNS)
+    table: pd.DataFrame        # periodo x [TWR (%), TWR anual (%), XIRR (%)]
+
+
+def compute_returns(valuations: pd.DataFrame) -> PortfolioReturns:
+    """TWR y XIRR de cada periodo de PERIODS que cabe en la historia de la cartera."""
+    rows = {}
+    span = valuations.index[-1] - valuations.index[0]
+    for label, years in PERIODS.items():
+        if years and span < pd.Timedelta(days=365.25 * years):
+            continue
+        period_twr, annual_twr = twr(valuations, years)
+        rows[label] = {
+            "TWR (%)": period_twr,
+            "TWR anual (%)": annual_twr,
+            "XIRR (%)": money_weighted(valuations, years),
+        }
+    table = pd.DataFrame.from_dict(rows, orient="index", columns=["TWR (%)", "TWR anual (%)", "XIRR (%)"])
+    return PortfolioReturns(valuations=valuations, table=table.astype(float))
@@ -0,0 +1,150 @@
+# src/analysis/statements.py
+"""
+Análisis fundamental de los tres estados financieros (balance, resultados y flujo de efectivo).
+
+Cada función recibe los estados del snapshot (años x partidas, numéricos) y devuelve las series
+que dibuja su bloque; None donde Yahoo no trae la partida necesaria.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .multiples import first_column
+
+TOTAL_ASSETS = "Total Assets"
+TOTAL_LIABILITIES = "Total Liabilities Net Minority Interest"
+TOTAL_EQUITY = "Total Equity Gross Minority Interest"
+
+
+def _clean(df: pd.DataFrame) -> pd.DataFrame:
+    return df.replace([np.inf, -np.inf], np.nan).dropna(how="all")
+
+
+def _dropna(serie: pd.Series | None) -> pd.Series | None:
+    """Serie numérica sin huecos; None si no hay ningún dato."""
+    if serie is None:
+        return None
+    serie = pd.to_numeric(serie, errors="coerce").dropna()
+    return serie if not serie.empty else None
+
+
+# ─── Balance ──────────────────────────────────────────────────
+@dataclass(frozen=True)
+class BalanceAnalysis:
+    assets: pd.DataFrame | None        # Total Assets y activos corrientes (con el nombre que use Yahoo)
+    liabilities: pd.DataFrame | None   # Total Liabilities y pasivos corrientes
+    debt: pd.DataFrame | None          # Total Debt y Net Debt
+    equity: pd.DataFrame | None        # Total Equity
+    overview: pd.DataFrame | None      # activos, pasivos y patrimonio totales
+
+
+def _total_and_current(
+    bs: pd.DataFrame, total_col: str, total_name: str, current_candidates: list[str]
+) -> pd.DataFrame | None:
+    current_col = next((c for c in current_candidates if c in bs.columns), None)
+    if total_col not in bs.columns or current_col is None:
+        return None
+    return _clean(pd.DataFrame({total_name: bs[total_col], current_col: bs[current_col]}))
+
+
+def compute_balance(balance_sheet: pd.DataFrame) -> BalanceAnalysis:
+    bs = balance_sheet
+    debt = None
+    if "Total Debt" in bs.columns and "Net Debt" in bs.columns:
+        debt = _clean(bs[["Total Debt", "Net Debt"]])
+    overview_cols = [TOTAL_ASSETS, TOTAL_LIABILITIES, TOTAL_EQUITY]
+    return BalanceAnalysis(
+        assets=_total_and_current(bs, TOTAL_ASSETS, "Total Assets", ["Current Assets", "Total Current Assets"]),
+        liabilities=_total_and_current(
+            bs, TOTAL_LIABILITIES, "Total Liabilities", ["Current Liabilities", "Total Current Liabilities"]
+        ),
+        debt=debt,
+        equity=bs[TOTAL_EQUITY].to_frame("Total Equity") if TOTAL_EQUITY in bs.columns else None,
+        overview=_clean(bs[overview_cols]) if set(overview_cols) <= set(bs.columns) else None,
+    )
+
+
+# ─── Estado de resultados ─────────────────────────────────────
+@dataclass(frozen=True)
+class IncomeAnalysis:
+    revenue: pd.DataFrame | None   # Total Revenue, Gross Profit, Operating Income y Net Income si existe
+    margins: pd.DataFrame | None   # márgenes bruto/operativo/neto en %; None sin "Total Revenue"
+    diluted_eps: pd.Series | None
+    shares: pd.Series | None       # acciones ordinarias en circulación (del balance)
+
+
+_NET_INCOME = ["Net Income", "Net Income from Continuing Operation Net Minority Interest"]
+
+
+def compute_income(income: pd.DataFrame, balance_sheet: pd.DataFrame) -> IncomeAnalysis:
+    revenue = None
+    base_cols = ["Total Revenue", "Gross Profit", "Operating Income"]
+    if set(base_cols) <= set(income.columns):
+        revenue = income[base_cols].copy()
+        net_income = first_column(income, _NET_INCOME)
+        if net_income is not None:
+            revenue["Net Income"] = net_income
+        revenue = revenue.dropna(how="all")  # evita barras huecas
+
+    margins = None
+    ingresos = income.get("Total Revenue")
+    if ingresos is not None:
+        margins = pd.DataFrame(
+            {
+                name: income[col] / ingresos * 100
+                for name, col in [
+                    ("Margen Bruto (%)", "Gross Profit"),
+                    ("Margen Operativo (%)", "Operating Income"),
+                    ("Margen Neto (%)", "Net Income"),
+                ]
+                if col in income.columns
+            },
+            index=income.index,
+        )
+        margins = margins.replace([np.inf, -np.inf], np.nan).round(1)
+
+    return IncomeAnalysis(
+        revenue=revenue,
+        margins=margins,
+        diluted_eps=_dropna(income.get("Diluted EPS")),
+        shares=_dropna(balance_sheet.get("Ordinary Shares Number")),
+    )
+
+
+# ─── Flujo de efectivo ────────────────────────────────────────
+@dataclass(frozen=True)
+class CashFlowAnalysis:
+    operating: pd.DataFrame | None       # Operating Cash Flow, CapEx (abs) y FCF (% del flujo operativo)
+    issuance: pd.Series | None           # emisión de deuda
+    issuance_trend: pd.Series | None     # recta de tendencia de la emisión (≥ 2 años)
+    repayment: pd.Series | None          # pago de deuda
+    repurchase: pd.Series | None         # recompra de acciones
+
+
+def compute_cashflow(cashflow: pd.DataFrame) -> CashFlowAnalysis:
+    cf = cashflow
+    operating = None
+    if {"Operating Cash Flow", "Capital Expenditure"} <= set(cf.columns):
+        op_cf = cf["Operating Cash Flow"].dropna()
+        capex = cf["Capital Expenditure"].dropna()
+        fcf = (op_cf + capex).dropna()
+        fcf_pct = (fcf / op_cf.replace(0, np.nan) * 100).replace([np.inf, -np.inf], np.nan)
+        operating = pd.DataFrame(
+            {"Operating Cash Flow": op_cf, "Capital Expenditure (abs)": -capex, "FCF (%)": fcf_pct}
+        )
+
+    issuance = _dropna(cf.get("Issuance Of Debt"))
+    issuance_trend = None
+    if issuance is not None and len(issuance) > 1:
+        years = issuance.index.astype(float)
+        slope, intercept = np.polyfit(years, issuance.values, 1)
+        issuance_trend = pd.Series(slope * years + intercept, index=issuance.index)
+
+    return CashFlowAnalysis(
+        operating=operating,
+        issuance=issuance,
+        issuance_trend=issuance_trend,
+        repayment=_dropna(cf.get("Repayment Of Debt")),
+        repurchase=_dropna(cf.get("Repurchase Of Capital Stock")),
+    )
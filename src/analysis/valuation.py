@@ -0,0 +1,118 @@
+# src/analysis/valuation.py
+"""Métricas de cabecera y precios objetivo de un ticker (las fórmulas de la página de análisis)."""
+from dataclasses import asdict, dataclass
+
+import pandas as pd
+
+from .dividend_analytics import DividendAnalytics
+
+
+def _num(value) -> float | None:
+    """Convierte a float; None si el dato falta o no es numérico."""
+    value = pd.to_numeric(value, errors="coerce")
+    return None if pd.isna(value) else float(value)
+
+
+@dataclass(frozen=True)
+class HeaderMetrics:
+    """Datos principales y valoración de un ticker; None donde Yahoo no da el dato."""
+
+    price: float | None
+    dividend: float | None
+    yield_actual: float | None       # %
+    pe_ratio: float | None
+    payout_ratio: float | None       # fracción (0.65 = 65 %)
+    eps_actual: float | None
+    roe_actual: float | None         # fracción
+    pb: float | None
+    book_per_share: float | None
+    G_percent: float | None          # crecimiento esperado = ROE x (1 - payout), en %
+    multiplier: int | None           # múltiplo PER según G
+    eps_5y: float | None
+    per_5y: float | None             # precio a PER 5 años
+    g_esperado_percent: float | None
+    fair_price: float | None         # valor libro x P/B
+    cagr_dividend: float | None
+    avg_yield: float | None
+    gw_undervalued: float | None     # precio infravalorado Geraldine Weiss
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def header_metrics(
+    info: dict, balance_sheet: pd.DataFrame, prices: pd.DataFrame, dividends: DividendAnalytics
+) -> HeaderMetrics:
+    """
+    Calcula las métricas de cabecera a partir del info de Yahoo, el balance anual,
+    el historial de precios y el análisis de dividendos.
+    """
+    # Datos financieros principales con fall-back al último cierre / último dividendo
+    price = _num(info.get("currentPrice"))
+    if price is None and not prices.empty:
+        price = _num(prices["Close"].iloc[-1])
+    dividend = _num(info.get("dividendRate"))
+    if dividend is None:
+        dividend = _num(info.get("lastDividendValue"))
+
+    payout_ratio = _num(info.get("payoutRatio"))
+    pe_ratio = _num(info.get("trailingPE"))
+    roe_actual = _num(info.get("returnOnEquity"))
+    # NOTA: usamos 'epsTrailingTwelveMonths' en vez de 'trailingEps', que suele estar vacío en algunos tickers
+    eps_actual = _num(info.get("epsTrailingTwelveMonths"))
+    pb = _num(info.get("priceToBook"))
+
+    yield_actual = dividend / price * 100 if dividend is not None and price else None
+
+    # ─── Book Value / Share ─────────────────────────────────────
+    equity = balance_sheet.get("Total Equity Gross Minority Interest", pd.Series(dtype=float)).dropna()
+    capital_total = _num(equity.iloc[-1]) if not equity.empty else None
+    ordinary_shares = _num(info.get("sharesOutstanding"))
+    preferred_shares = 0  # asumimos 0 si no hay dato
+    book_per_share = (
+        (capital_total - preferred_shares) / ordinary_shares
+        if capital_total is not None and ordinary_shares
+        else None
+    )
+
+    # ─── Crecimiento esperado y múltiplos ───────────────────────
+    G_percent = roe_actual * (1 - payout_ratio) * 100 if roe_actual is not None and payout_ratio is not None else None
+    if G_percent is not None:
+        multiplier = 10 if G_percent <= 10 else 15 if G_percent <= 20 else 20
+    else:
+        multiplier = None
+
+    eps_5y = eps_actual * ((1 + G_percent / 100) ** 5) if eps_actual is not None and G_percent is not None else None
+    per_5y = eps_5y * multiplier if eps_5y is not None and multiplier else None
+    g_esperado_percent = (
+        ((per_5y / price) ** (1 / 5) - 1) * 100 if per_5y is not None and per_5y > 0 and price else None
+    )
+    fair_price = pb * book_per_share if pb is not None and book_per_share is not None else None
+
+    return HeaderMetrics(
+        price=price,
+        dividend=dividend,
+        yield_actual=yield_actual,
+        pe_ratio=pe_ratio,
+        payout_ratio=payout_ratio,
+        eps_actual=eps_actual,
+        roe_actual=roe_actual,
+        pb=pb,
+        book_per_share=book_per_share,
+        G_percent=G_percent,
+        multiplier=multiplier,
+        eps_5y=eps_5y,
+        per_5y=per_5y,
+        g_esperado_percent=g_esperado_percent,
+        fair_price=fair_price,
+        cagr_dividend=dividends.cagr,
+        avg_yield=dividends.avg_yield,
+        gw_undervalued=dividends.gw.undervalued_price if dividends.gw is not None else None,
+    )
+
+
+def dividend_target_price(metrics: HeaderMetrics, desired_yield: float) -> float | None:
+    """Precio al que el dividendo del próximo año (actual x (1 + CAGR)) rinde `desired_yield` (%)."""
+    if metrics.dividend is None or metrics.cagr_dividend is None or not desired_yield:
+        return None
+    return metrics.dividend * (1 + metrics.cagr_dividend / 100) / (desired_yield / 100)
@@ -1,12 +1,9 @@
 # src/auth.py
 
 import streamlit as st
-from .db import init_user_table, get_user
-import hashlib
-
-def hash_password(password: str) -> str:
-    """Devuelve el hash SHA256 de la contraseña."""
-    return hashlib.sha256(password.encode()).hexdigest()
+from .credentials import issue_session_token, verify_password, verify_session_token
+from .credentials import hash_password  # noqa: F401  (se mantiene el nombre público)
+from .db import get_user, update_password_hash
 
 def login():
     """Formulario de inicio de sesión con correo y contraseña."""
@@ -20,11 +17,28 @@ def login():
             st.stop()
 
         usuario = get_user(email)
-        if usuario and usuario[1] == hash_password(password):
-            # Autenticado correctamente
+        ok, needs_rehash = verify_password(password, usuario[1] if usuario else None)
+        if ok:
+            # Los hashes antiguos (SHA-256 o scrypt con otro coste) se reemplazan en el mismo login
+            if needs_rehash:
+                update_password_hash(email, hash_password(password))
+            # Autenticado correctamente; los reruns sólo validan el token
             st.session_state["user"] = email
+            st.session_state["session_token"] = issue_session_token(email)
             st.success("Sesión iniciada correctamente.")
             st.experimental_rerun()
         else:
             st.error("Correo o contraseña incorrectos.")
             st.stop()
+
+def is_logged_in() -> bool:
+    """True si la sesión tiene un token válido (sin mostrar el formulario)."""
+    return verify_session_token(st.session_state.get("session_token"), st.session_state.get("user"))
+
+def require_login():
+    """Muestra el formulario de login y detiene el script si no hay una sesión válida."""
+    if not is_logged_in():
+        st.session_state.pop("user", None)
+        st.session_state.pop("session_token", None)
+        login()
+        st.stop()
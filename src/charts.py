@@ -0,0 +1,462 @@
+# src/charts.py
+"""
+Constructores de las figuras Plotly de la página de análisis.
+
+Cada función recibe sólo datos (series, DataFrames, números) y devuelve un `go.Figure`; no llama a
+Streamlit. Así `services.figure_cache` puede construir y serializar cada gráfico una sola vez por
+huella de sus datos.
+"""
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# Colores de las series en todos los gráficos de las secciones
+PRIMARY_ORANGE = "darkorange"
+PRIMARY_BLUE = "deepskyblue"
+PRIMARY_PINK = "hotpink"
+
+_MARGIN = dict(l=30, r=30, t=60, b=30)
+
+
+def _bar(serie: pd.Series, name: str, color: str, text) -> go.Bar:
+    return go.Bar(x=serie.index, y=serie.values, name=name, marker_color=color, text=text, textposition="outside")
+
+
+def _ratio_line(serie: pd.Series, name: str, text_format: str) -> go.Scatter:
+    """Línea sobre el eje derecho (y2) con el valor de cada año como etiqueta."""
+    return go.Scatter(
+        x=serie.index,
+        y=serie.values,
+        name=name,
+        mode="lines+markers+text",
+        yaxis="y2",
+        line=dict(color=PRIMARY_PINK),
+        text=[text_format.format(v) for v in serie],
+        textposition="top right",
+    )
+
+
+# ─── Cabecera ─────────────────────────────────────────────────
+def price_history(close: pd.Series, title: str) -> go.Figure:
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=close.index, y=close.values, mode="lines", name="Close", line=dict(color="darkorange")))
+    fig.update_layout(title=title, xaxis_title="Fecha", yaxis_title="USD", height=500)
+    return fig
+
+
+def drawdown(serie: pd.Series) -> go.Figure:
+    fig = go.Figure()
+    fig.add_trace(
+        go.Scatter(x=serie.index, y=serie.values, mode="lines", name="Drawdown (%)", line=dict(color="crimson"))
+    )
+    fig.update_layout(
+        yaxis_title="Drawdown (%)",
+        yaxis=dict(range=[serie.min() - 5, 5]),
+        height=450,
+        margin=_MARGIN,
+    )
+    return fig
+
+
+# ─── Dividendos ───────────────────────────────────────────────
+def annual_dividends(annual: pd.Series, title: str) -> go.Figure:
+    fig = go.Figure()
+    fig.add_trace(_bar(annual, "Dividendo Anual ($)", PRIMARY_ORANGE, [f"${v:.2f}" for v in annual.values]))
+    fig.update_layout(title=title, xaxis_title="Año", yaxis_title="Dividendo ($)", height=450, margin=_MARGIN)
+    return fig
+
+
+def dividend_sustainability(df_fcf: pd.DataFrame) -> go.Figure:
+    fig = go.Figure()
+    fig.add_trace(_bar(df_fcf["FCF"], "FCF", PRIMARY_ORANGE, df_fcf["FCF"].round(0)))
+    fig.add_trace(
+        _bar(df_fcf["Dividendos Pagados"], "Dividendos Pagados", PRIMARY_BLUE, df_fcf["Dividendos Pagados"].round(0))
+    )
+    fig.add_trace(_ratio_line(df_fcf["FCF Payout (%)"], "FCF Payout (%)", "{:.0f}%"))
+    fig.update_layout(
+        title="FCF vs Dividendos Pagados y FCF Payout Ratio",
+        xaxis_title="Año",
+        yaxis_title="Millones USD",
+        yaxis2=dict(title="FCF Payout (%)", overlaying="y", side="right"),
+        barmode="group",
+        height=500,
+        margin=_MARGIN,
+    )
+    return fig
+
+
+def dividend_yield(yield_series: pd.Series, avg: float, max_: float, min_: float) -> go.Figure:
+    fig = go.Figure()
+    fig.add_trace(
+        go.Scatter(
+            x=yield_series.index,
+            y=yield_series.values,
+            mode="lines",
+            name="Yield Diario",
+            line=dict(color=PRIMARY_PINK),
+        )
+    )
+    fig.add_hline(y=avg, line=dict(dash="dash"), annotation_text="Promedio")
+    fig.add_hline(y=max_, line=dict(dash="dot"), annotation_text="Máximo")
+    fig.add_hline(y=min_, line=dict(dash="dot"), annotation_text="Mínimo")
+    fig.update_layout(
+        title="Rentabilidad por Dividendo (filtrada)",
+        xaxis_title="Fecha",
+        yaxis_title="Yield (%)",
+        height=450,
+        margin=_MARGIN,
+    )
+    return fig
+
+
+def geraldine_weiss(
+    close: pd.Series,
+    band_x: np.ndarray,
+    band_over: np.ndarray,
+    band_under: np.ndarray,
+    current_price: float,
+    ticker: str,
+) -> go.Figure:
+    fig = go.Figure()
+    fig.add_trace(
+        go.Scatter(
+            x=close.index, y=close.values, mode="lines", name="Precio Histórico Diario", line=dict(color="hotpink")
+        )
+    )
+    fig.add_trace(
+        go.Scatter(
+            x=band_x,
+            y=band_over,
+            mode="lines",
+            name="Precio Sobrevalorado",
+            line=dict(color="darkorange", dash="dot"),
+        )
+    )
+    fig.add_trace(
+        go.Scatter(
+            x=band_x,
+            y=band_under,
+            mode="lines",
+            name="Precio Infravalorado",
+            line=dict(color="deepskyblue", dash="dot"),
+        )
+    )
+    fig.add_trace(
+        go.Scatter(
+            x=[close.index[-1]],
+            y=[current_price],
+            mode="markers+text",
+            name="Precio Actual",
+            marker=dict(color="hotpink", size=10),
+            text=[f"${current_price:.2f}"],
+            textposition="top center",
+        )
+    )
+    fig.update_layout(
+        title=f"Precio Histórico Diario, Bandas y Precio Actual - {ticker}",
+        xaxis_title="Fecha",
+        yaxis_title="Precio ($)",
+        height=500,
+        margin=dict(l=20, r=20, t=60, b=40),
+    )
+    return fig
+
+
+# ─── Múltiplos ────────────────────────────────────────────────
+def _bars_with_ratio(
+    df: pd.DataFrame, bars: list[str], ratio: str, text_round: int, title: str, yaxis: dict, height: int
+) -> go.Figure:
+    """Dos barras (naranja, azul) y un ratio en el eje derecho, con las columnas que existan en `df`."""
+    fig = go.Figure()
+    for col, color in zip(bars, [PRIMARY_ORANGE, PRIMARY_BLUE]):
+        if col in df.columns:
+            fig.add_trace(_bar(df[col], col, color, df[col].round(text_round)))
+    if ratio in df.columns:
+        fig.add_trace(_ratio_line(df[ratio], ratio, "{:.2f}"))
+    fig.update_layout(
+        title=title,
+        xaxis_title="Año",
+        yaxis=yaxis,
+        yaxis2=dict(title=ratio, overlaying="y", side="right"),
+        barmode="group",
+        height=height,
+        margin=_MARGIN,
+    )
+    return fig
+
+
+def debt_vs_fcf(df_deuda: pd.DataFrame) -> go.Figure:
+    return _bars_with_ratio(
+        df_deuda, ["FCF", "Deuda Neta"], "Deuda Neta/FCF", 0,
+        "Evolución de Deuda, FCF y Deuda Neta/FCF", dict(title="Millones USD"), 500,
+    )
+
+
+def per_history(df_per: pd.DataFrame) -> go.Figure:
+    return _bars_with_ratio(
+        df_per, ["EPS", "Precio"], "PER", 2, "Histórico del EPS, Precio y PER", dict(title="EPS / Precio"), 450
+    )
+
+
+def ev_ebitda(df_ev: pd.DataFrame) -> go.Figure:
+    return _bars_with_ratio(
+        df_ev, ["EBITDA", "EV"], "EV/EBITDA", 0,
+        "Evolución de EV, EBITDA y EV/EBITDA", dict(title="Valor (USD)"), 500,
+    )
+
+
+# ─── Estados financieros ──────────────────────────────────────
+def grouped_bars(df: pd.DataFrame, colors: list[str], title: str) -> go.Figure:
+    """Barras agrupadas, una por columna de `df`, con el valor redondeado como etiqueta."""
+    fig = go.Figure()
+    for col, color in zip(df.columns, colors):
+        if not df[col].dropna().empty:
+            fig.add_trace(_bar(df[col], col, color, df[col].round(0)))
+    fig.update_layout(
+        title=title, xaxis_title="Año", yaxis_title="Valor (USD)", barmode="group", height=450, margin=_MARGIN
+    )
+    return fig
+
+
+def balance_lines(df_balance: pd.DataFrame) -> go.Figure:
+    fig = go.Figure()
+    for col, name, color in zip(
+        df_balance.columns,
+        ["Total Assets", "Total Liabilities", "Total Equity"],
+        [PRIMARY_BLUE, PRIMARY_ORANGE, PRIMARY_PINK],
+    ):
+        fig.add_trace(
+            go.Scatter(x=df_balance.index, y=df_balance[col], mode="lines+markers", name=name, line=dict(color=color))
+        )
+    fig.update_layout(
+        title="Evolución del Balance: Activos, Pasivos y Capital",
+        xaxis_title="Año",
+        yaxis_title="Valor (USD)",
+        height=450,
+        margin=_MARGIN,
+    )
+    return fig
+
+
+def revenue(df_income: pd.DataFrame) -> go.Figure:
+    fig = go.Figure()
+    for col, color in zip(df_income.columns, [PRIMARY_BLUE, PRIMARY_ORANGE, PRIMARY_PINK, "gold"]):
+        serie = df_income[col].dropna()
+        if not serie.empty:
+            fig.add_trace(_bar(serie, col, color, [f"${v:,.0f}" for v in serie]))
+    fig.update_layout(
+        title="Evolución de los Ingresos",
+        xaxis_title="Año",
+        yaxis_title="Valor (USD)",
+        barmode="group",
+        height=450,
+        margin=_MARGIN,
+    )
+    return fig
+
+
+MARGIN_COLORS = {
+    "Margen Bruto (%)": PRIMARY_BLUE,
+    "Margen Operativo (%)": PRIMARY_ORANGE,
+    "Margen Neto (%)": PRIMARY_PINK,
+}
+
+
+def margins(df_margins: pd.DataFrame) -> go.Figure:
+    fig = go.Figure()
+    for nombre, serie in df_margins.items():
+        serie = serie.dropna()
+        if not serie.empty:
+            fig.add_trace(
+                go.Scatter(
+                    x=serie.index, y=serie.values, mode="lines+markers", name=nombre,
+                    line=dict(color=MARGIN_COLORS[nombre]),
+                )
+            )
+    fig.update_layout(
+        title="Evolución de Márgenes (% sobre ventas)",
+        xaxis_title="Año",
+        yaxis_title="% Margen",
+        height=450,
+        margin=_MARGIN,
+    )
+    return fig
+
+
+def diluted_eps(serie: pd.Series) -> go.Figure:
+    fig = go.Figure()
+    fig.add_trace(_bar(serie, "Diluted EPS", PRIMARY_ORANGE, [f"${v:.2f}" for v in serie]))
+    fig.update_layout(
+        title="Evolución del Diluted EPS",
+        xaxis_title="Año",
+        yaxis_title="Diluted EPS (USD)",
+        height=450,
+        margin=_MARGIN,
+    )
+    return fig
+
+
+def shares_outstanding(serie: pd.Series) -> go.Figure:
+    fig = go.Figure()
+    fig.add_trace(_bar(serie, "Acciones en Circulación", PRIMARY_BLUE, [f"{int(v):,}" for v in serie]))
+    fig.update_layout(
+        title="Evolución de Acciones en Circulación",
+        xaxis_title="Año",
+        yaxis_title="Acciones",
+        height=450,
+        margin=_MARGIN,
+    )
+    return fig
+
+
+def operating_cash_flow(operating: pd.DataFrame) -> go.Figure:
+    fig = go.Figure()
+    for name, color in [("Operating Cash Flow", PRIMARY_BLUE), ("Capital Expenditure (abs)", PRIMARY_ORANGE)]:
+        serie = operating[name].dropna()
+        if not serie.empty:
+            fig.add_trace(_bar(serie, name, color, [f"${v:,.0f}" for v in serie]))
+    fcf_pct = operating["FCF (%)"].dropna()
+    if not fcf_pct.empty:
+        fig.add_trace(_ratio_line(fcf_pct, "FCF (%)", "{:.1f}%"))
+    fig.update_layout(
+        title="Flujo de Caja: Operating CF, CaPex y FCF (%)",
+        xaxis_title="Año",
+        yaxis=dict(title="Valores (USD)"),
+        yaxis2=dict(title="FCF (%)", overlaying="y", side="right"),
+        barmode="group",
+        height=450,
+        margin=_MARGIN,
+    )
+    return fig
+
+
+def simple_bars(serie: pd.Series, title: str, color: str, trend: pd.Series | None = None) -> go.Figure:
+    fig = go.Figure()
+    fig.add_trace(_bar(serie, title, color, [f"${v:,.0f}" for v in serie]))
+    if trend is not None:
+        fig.add_trace(
+            go.Scatter(
+                x=trend.index, y=trend.values, mode="lines", name="Tendencia", line=dict(color="hotpink", dash="dash")
+            )
+        )
+    fig.update_layout(title=title, xaxis_title="Año", yaxis_title="Valor (USD)", height=450, margin=_MARGIN)
+    return fig
+
+
+# ─── Cartera ──────────────────────────────────────────────────
+def portfolio_value(value: pd.Series, invested: pd.Series) -> go.Figure:
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=value.index, y=value.values, mode="lines", name="Valor", line=dict(color=PRIMARY_BLUE)))
+    fig.add_trace(
+        go.Scatter(
+            x=invested.index, y=invested.values, mode="lines", name="Aportado neto",
+            line=dict(color=PRIMARY_ORANGE, dash="dash"),
+        )
+    )
+    fig.update_layout(title="Valor de la cartera", xaxis_title="Fecha", yaxis_title="Valor", height=450, margin=_MARGIN)
+    return fig
+
+
+def portfolio_weights(weights: pd.Series) -> go.Figure:
+    fig = go.Figure(go.Pie(labels=weights.index, values=weights.values, hole=0.45, textinfo="label+percent"))
+    fig.update_layout(title="Peso por posición", height=450, margin=_MARGIN, showlegend=False)
+    return fig
+
+
+# ─── ETFs ─────────────────────────────────────────────────────
+# Por encima de este número de ETFs el valor de cada celda sólo aparece al pasar el ratón
+HEATMAP_MAX_LABELS = 20
+
+
+def pair_heatmap(matrix: pd.DataFrame, title: str, colorscale: str, zmin: float, zmax: float, fmt: str) -> go.Figure:
+    """Matriz ETF x ETF (solapamiento, correlación); el tamaño crece con el número de ETFs."""
+    n = len(matrix)
+    fig = go.Figure(
+        go.Heatmap(
+            z=matrix.to_numpy(),
+            x=matrix.columns,
+            y=matrix.index,
+            colorscale=colorscale,
+            zmin=zmin,
+            zmax=zmax,
+            texttemplate=f"%{{z:{fmt}}}" if n <= HEATMAP_MAX_LABELS else None,
+            hovertemplate=f"%{{y}} / %{{x}}: %{{z:{fmt}}}<extra></extra>",
+        )
+    )
+    fig.update_layout(
+        title=title, height=max(450, 28 * n), margin=_MARGIN, yaxis=dict(autorange="reversed", scaleanchor="x")
+    )
+    return fig
+
+
+def sector_weights(sectors: pd.DataFrame) -> go.Figure:
+    """Barras horizontales apiladas con el peso (%) de cada sector en cada ETF."""
+    fig = go.Figure()
+    for sector in sectors.columns:
+        fig.add_trace(go.Bar(y=sectors.index, x=sectors[sector].values, name=sector, orientation="h"))
+    fig.update_layout(
+        title="Peso por sector (%)", barmode="stack", xaxis_title="%", height=max(400, 30 * len(sectors)),
+        margin=_MARGIN,
+    )
+    return fig
+
+
+# ─── Interés compuesto ────────────────────────────────────────
+def compound_growth(monthly: pd.DataFrame) -> go.Figure:
+    """Valor, aportado y (sin DRIP) dividendos acumulados en efectivo, con el eje en años."""
+    years = monthly.index / 12
+    fig = go.Figure()
+    fig.add_trace(
+        go.Scatter(x=years, y=monthly["Valor"], mode="lines", name="Valor", line=dict(color=PRIMARY_BLUE))
+    )
+    fig.add_trace(
+        go.Scatter(
+            x=years, y=monthly["Aportado"], mode="lines", name="Aportado", line=dict(color=PRIMARY_ORANGE, dash="dash")
+        )
+    )
+    if monthly["Efectivo"].iloc[-1] > 0:
+        fig.add_trace(
+            go.Scatter(
+                x=years, y=monthly["Efectivo"], mode="lines", name="Dividendos en efectivo",
+                line=dict(color=PRIMARY_PINK),
+            )
+        )
+    fig.update_layout(title="Evolución de la inversión", xaxis_title="Años", yaxis_title="Valor", height=450,
+                      margin=_MARGIN)
+    return fig
+
+
+def sweep_heatmap(table: pd.DataFrame, title: str) -> go.Figure:
+    """Barrido yield x crecimiento: filas = yield (%), columnas = crecimiento del dividendo (%)."""
+    fig = go.Figure(
+        go.Heatmap(
+            z=table.to_numpy(),
+            x=[f"{g:g}%" for g in table.columns],
+            y=[f"{y:g}%" for y in table.index],
+            colorscale="Viridis",
+            hovertemplate="Yield %{y} · crecimiento %{x}: %{z:,.0f}<extra></extra>",
+        )
+    )
+    fig.update_layout(
+        title=title, xaxis_title=table.columns.name, yaxis_title=table.index.name, height=500, margin=_MARGIN
+    )
+    return fig
+
+
+# ─── Monte Carlo ──────────────────────────────────────────────
+def fan_chart(bands: pd.DataFrame, title: str, x_title: str, y_title: str, x_scale: float = 1.0) -> go.Figure:
+    """Bandas de percentiles (columnas P5, P25, P50, P75, P95) con la mediana como línea."""
+    x = bands.index / x_scale
+    fig = go.Figure()
+    for low, high, opacity in (("P5", "P95", 0.18), ("P25", "P75", 0.35)):
+        fig.add_trace(go.Scatter(x=x, y=bands[high], mode="lines", line=dict(width=0), showlegend=False,
+                                 hoverinfo="skip"))
+        fig.add_trace(
+            go.Scatter(
+                x=x, y=bands[low], mode="lines", line=dict(width=0), fill="tonexty",
+                fillcolor=f"rgba(0, 191, 255, {opacity})", name=f"{low}–{high}",
+            )
+        )
+    fig.add_trace(go.Scatter(x=x, y=bands["P50"], mode="lines", name="Mediana", line=dict(color=PRIMARY_ORANGE)))
+    fig.update_layout(title=title, xaxis_title=x_title, yaxis_title=y_title, height=450, margin=_MARGIN)
+    return fig
@@ -0,0 +1,109 @@
+# src/compound_ui.py
+import numpy as np
+import streamlit as st
+
+from . import charts
+from .analysis.compound import DEFAULT_GROWTH, DEFAULT_YIELD, CompoundInputs, project, sweep
+from .analysis.pipeline import ticker_metrics
+from .auth import require_login
+from .charts import PRIMARY_ORANGE
+from .services.figure_cache import chart
+
+PERIODS = {"5 años": "5y", "10 años": "10y", "15 años": "15y", "20 años": "20y"}
+
+# Rejilla del barrido: yield (%) x crecimiento del dividendo (%) x horizonte (años)
+SWEEP_YIELDS = np.arange(1.0, 8.5, 0.5)
+SWEEP_GROWTHS = np.arange(0.0, 16.0, 1.0)
+SWEEP_HORIZONS = np.arange(5, 45, 5)
+
+
+def _seed(ticker: str, period: str) -> tuple[float, float, str]:
+    """(yield %, CAGR del dividendo %, nota) del ticker, con los mismos cálculos que la página de análisis."""
+    if not ticker:
+        return DEFAULT_YIELD, DEFAULT_GROWTH, "Valores por defecto."
+    try:
+        metrics = ticker_metrics(ticker, period)
+    except Exception as e:
+        return DEFAULT_YIELD, DEFAULT_GROWTH, f"No se pudieron obtener los datos de {ticker}: {e}"
+    dividend_yield = metrics.yield_actual if metrics.yield_actual is not None else DEFAULT_YIELD
+    growth = metrics.cagr_dividend if metrics.cagr_dividend is not None else DEFAULT_GROWTH
+    return round(dividend_yield, 2), round(growth, 2), f"Yield y CAGR del dividendo de {ticker}."
+
+
+def render_compound():
+    require_login()
+
+    st.markdown("## 📈 Calculadora de Interés Compuesto")
+    last_ticker, last_period = st.session_state.get("last_analysis", ("KO", "10y"))
+    col_ticker, col_period = st.columns([2, 1])
+    ticker = col_ticker.text_input("Ticker de referencia (opcional)", last_ticker, key="calc_ticker").strip().upper()
+    period_label = col_period.selectbox(
+        "⏳ Período del CAGR", list(PERIODS), index=list(PERIODS.values()).index(last_period), key="calc_period"
+    )
+    seed_yield, seed_growth, note = _seed(ticker, PERIODS[period_label])
+    st.caption(note)
+
+    # Las claves llevan el ticker: al cambiarlo, los campos vuelven a sus valores
+    suffix = f"{ticker}_{period_label}"
+    cols = st.columns(4)
+    initial = cols[0].number_input("Capital inicial", min_value=0.0, value=10_000.0, step=1_000.0)
+    monthly = cols[1].number_input("Aportación mensual", min_value=0.0, value=300.0, step=50.0)
+    contribution_growth = cols[2].number_input("Subida anual de la aportación (%)", value=0.0, step=0.5)
+    years = cols[3].number_input("Años", min_value=1, max_value=60, value=25, step=1)
+
+    cols = st.columns(4)
+    dividend_yield = cols[0].number_input(
+        "Yield inicial (%)", min_value=0.0, value=float(seed_yield), step=0.1, key=f"calc_yield_{suffix}"
+    )
+    dividend_growth = cols[1].number_input(
+        "Crecimiento del dividendo (%)", value=float(seed_growth), step=0.5, key=f"calc_growth_{suffix}"
+    )
+    price_growth = cols[2].number_input(
+        "Crecimiento del precio (%)", value=float(seed_growth), step=0.5, key=f"calc_price_{suffix}",
+        help="Por defecto igual al del dividendo: el yield sobre el precio se mantiene.",
+    )
+    drip = cols[3].checkbox("Reinvertir dividendos (DRIP)", value=True)
+
+    cols = st.columns(2)
+    dividend_tax = cols[0].number_input("Retención sobre dividendos (%)", min_value=0.0, max_value=100.0, value=19.0)
+    capital_gains_tax = cols[1].number_input(
+        "Impuesto sobre plusvalías al vender (%)", min_value=0.0, max_value=100.0, value=19.0
+    )
+
+    inputs = CompoundInputs(
+        initial=initial,
+        monthly=monthly,
+        contribution_growth=contribution_growth,
+        years=int(years),
+        dividend_yield=dividend_yield,
+        dividend_growth=dividend_growth,
+        price_growth=price_growth,
+        dividend_tax=dividend_tax,
+        capital_gains_tax=capital_gains_tax,
+        drip=drip,
+    )
+    result = project(inputs)
+
+    # ─── Resultado ─────────────────────────────────────────────
+    last = result.annual.iloc[-1]
+    cols = st.columns(4)
+    cols[0].metric("Valor final", f"{result.final_value:,.0f}")
+    cols[1].metric("Tras plusvalías", f"{result.net_value:,.0f}")
+    cols[2].metric("Aportado", f"{last['Aportado']:,.0f}")
+    cols[3].metric("Renta anual neta final", f"{result.annual_income:,.0f}")
+
+    chart(charts.compound_growth, result.monthly, key="compound_growth")
+    chart(charts.simple_bars, result.annual["Dividendos netos"], "Dividendos netos por año", PRIMARY_ORANGE,
+          key="compound_dividends")
+    with st.expander("Tabla anual"):
+        st.dataframe(result.annual.round(0), use_container_width=True)
+
+    # ─── Barrido de parámetros ─────────────────────────────────
+    st.subheader("Sensibilidad: yield x crecimiento del dividendo")
+    follow = st.checkbox("El precio crece al ritmo del dividendo", value=True, key="calc_sweep_follow")
+    col_metric, col_horizon = st.columns(2)
+    metric_label = col_metric.radio("Resultado", ["Renta anual neta", "Valor final"], horizontal=True)
+    horizon = col_horizon.select_slider("Horizonte (años)", SWEEP_HORIZONS.tolist(), value=25)
+    grid = sweep(inputs, SWEEP_YIELDS, SWEEP_GROWTHS, SWEEP_HORIZONS, price_follows_dividend=follow)
+    table = grid.table("income" if metric_label == "Renta anual neta" else "value", horizon)
+    chart(charts.sweep_heatmap, table.round(0), f"{metric_label} a {horizon} años", key="compound_sweep")
@@ -0,0 +1,106 @@
+# src/credentials.py
+"""
+Hash de contraseñas y tokens de sesión.
+
+- Contraseñas: scrypt (hashlib) con sal aleatoria y coste configurable por variables de entorno.
+  Formato guardado: "scrypt$N$r$p$sal$hash" (sal y hash en base64).
+- Los hashes SHA-256 sin sal de versiones anteriores se siguen aceptando y `verify_password`
+  avisa de que hay que reemplazarlos (ver `auth.login`).
+- Token de sesión firmado con HMAC: tras un login correcto, cada rerun de Streamlit sólo
+  comprueba la firma en vez de volver a pasar por scrypt, que es lento a propósito.
+Todas las comparaciones usan `hmac.compare_digest` (tiempo constante), y un correo desconocido, un
+hash SHA-256 antiguo o uno ilegible pagan el mismo scrypt que un usuario real (no se pueden enumerar
+cuentas por tiempo).
+"""
+import base64
+import binascii
+import hashlib
+import hmac
+import os
+import re
+import secrets
+import time
+
+SCRYPT_N = int(os.getenv("SCRYPT_N", str(2 ** 14)))
+SCRYPT_R = int(os.getenv("SCRYPT_R", "8"))
+SCRYPT_P = int(os.getenv("SCRYPT_P", "1"))
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+# Clave para firmar los tokens; sin variable de entorno se genera una por proceso
+# (las sesiones de Streamlit tampoco sobreviven a un reinicio)
+SESSION_SECRET = os.getenv("COKEAPP_SECRET_KEY", "").encode() or secrets.token_bytes(32)
+SESSION_TTL = 24 * 60 * 60
+
+_LEGACY_SHA256 = re.compile(r"[0-9a-f]{64}")
+# Sal para el scrypt de relleno cuando no hay hash válido que comprobar
+_DUMMY_SALT = secrets.token_bytes(SALT_BYTES)
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def _unb64(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(
+        password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r * p, dklen=KEY_BYTES
+    )
+
+
+def hash_password(password: str) -> str:
+    """Hash scrypt con sal nueva y el coste actual."""
+    salt = secrets.token_bytes(SALT_BYTES)
+    key = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64(salt)}${_b64(key)}"
+
+
+def verify_password(password: str, stored: str | None) -> tuple[bool, bool]:
+    """
+    Comprueba `password` contra el hash guardado.
+
+    Devuelve (válida, hay_que_rehashear): el segundo es True si la contraseña es válida pero
+    el hash es SHA-256 antiguo o scrypt con un coste distinto del actual.
+    """
+    if stored and _LEGACY_SHA256.fullmatch(stored):
+        legacy = hashlib.sha256(password.encode()).hexdigest()
+        ok = hmac.compare_digest(legacy, stored)
+        # Un SHA-256 tarda microsegundos: sin el scrypt de relleno se distinguirían estas cuentas por tiempo
+        _scrypt(password, _DUMMY_SALT, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+        return ok, ok
+    try:
+        scheme, n, r, p, salt, key = (stored or "").split("$")
+        n, r, p = int(n), int(r), int(p)
+        salt, key = _unb64(salt), _unb64(key)
+        if scheme != "scrypt":
+            raise ValueError(scheme)
+        ok = hmac.compare_digest(_scrypt(password, salt, n, r, p), key)
+    except (binascii.Error, ValueError):
+        # Sin usuario o con una fila corrupta: mismo coste que una contraseña real y se rechaza
+        _scrypt(password, _DUMMY_SALT, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+        return False, False
+    return ok, ok and (n, r, p) != (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+
+
+def _sign(payload: str) -> str:
+    return _b64(hmac.new(SESSION_SECRET, payload.encode(), hashlib.sha256).digest())
+
+
+def issue_session_token(email: str, ttl: int = SESSION_TTL) -> str:
+    """Token "email|expira|firma" para el usuario recién autenticado."""
+    payload = f"{email}|{int(time.time()) + ttl}"
+    return f"{payload}|{_sign(payload)}"
+
+
+def verify_session_token(token: str | None, email: str | None) -> bool:
+    """True si el token está firmado por este servidor, es de `email` y no ha caducado."""
+    if not token or not email:
+        return False
+    payload, _, signature = token.rpartition("|")
+    token_email, _, expires = payload.rpartition("|")
+    if not hmac.compare_digest(_sign(payload), signature):
+        return False
+    return hmac.compare_digest(token_email, email) and expires.isdigit() and int(expires) > time.time()
@@ -1,45 +1,156 @@
 # src/db.py
 
+import atexit
+import os
+import queue
 import sqlite3
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-import hashlib
+from typing import Iterator
+
+from .credentials import hash_password
+from .migrations import migrate
 
 # Establecer el path de la base de datos
 DB_PATH = Path(__file__).resolve().parent / "cokeapp.sqlite"
 
-def init_user_table():
-    """Crea la tabla de usuarios si no existe."""
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS usuarios (
-            email TEXT PRIMARY KEY,
-            password_hash TEXT NOT NULL,
-            fecha_registro TEXT DEFAULT CURRENT_TIMESTAMP
-        );
-    """)
-    conn.commit()
-    conn.close()
+# Conexiones abiertas como máximo por proceso (todas las sesiones de Streamlit comparten el pool)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+
+
+class ConnectionPool:
+    """
+    Pool thread-safe de conexiones SQLite.
+
+    Cada conexión se abre una vez en modo WAL (lectores concurrentes con un escritor) y conserva
+    su caché de sentencias preparadas, así el login y los accesos al almacén no pagan un connect por llamada.
+    """
+
+    def __init__(self, path: Path, size: int = DB_POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, cached_statements=256)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def acquire(self, timeout: float = 30) -> sqlite3.Connection:
+        """Toma una conexión libre, abre una nueva si no se llegó al tope o espera a que se libere una."""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                new = True
+            else:
+                new = False
+        if new:
+            try:
+                return self._open()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        return self._idle.get(timeout=timeout)
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """Devuelve la conexión al pool deshaciendo cualquier transacción a medias."""
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    def close_all(self) -> None:
+        """Cierra las conexiones libres; una prestada que se devuelva después se cierra al recolectar el pool."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._lock:
+            self._created = 0
+
+
+_pool: ConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Pool del proceso; la primera llamada lo crea y aplica las migraciones pendientes (ver migrations.py)."""
+    global _pool
+    if _pool is None or _pool.path != DB_PATH:
+        with _pool_lock:
+            if _pool is None or _pool.path != DB_PATH:
+                pool = ConnectionPool(DB_PATH)
+                conn = pool.acquire()
+                try:
+                    migrate(conn)
+                finally:
+                    pool.release(conn)
+                # Cambió DB_PATH: las conexiones a la base anterior ya no se usan
+                if _pool is not None:
+                    _pool.close_all()
+                _pool = pool
+    return _pool
+
+
+@atexit.register
+def close_pool() -> None:
+    """Cierra las conexiones del pool al salir del proceso; al cerrar la última, SQLite vuelca el WAL a la base."""
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close_all()
+
+
+@contextmanager
+def connection() -> Iterator[sqlite3.Connection]:
+    """Conexión prestada del pool para lecturas; se devuelve al salir del bloque."""
+    pool = get_pool()
+    conn = pool.acquire()
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
+
+
+@contextmanager
+def transaction() -> Iterator[sqlite3.Connection]:
+    """Conexión prestada del pool dentro de una transacción: commit al salir, rollback si hay error."""
+    with connection() as conn:
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
 
 def insert_user(email: str, password: str) -> bool:
-    """Inserta un usuario con hash de contraseña; retorna False si ya existe."""
-    password_hash = hashlib.sha256(password.encode()).hexdigest()
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
+    """Inserta un usuario con hash de contraseña (scrypt); retorna False si ya existe."""
+    password_hash = hash_password(password)
     try:
-        cur.execute("INSERT INTO usuarios (email, password_hash) VALUES (?, ?)", (email, password_hash))
-        conn.commit()
+        with transaction() as conn:
+            conn.execute("INSERT INTO usuarios (email, password_hash) VALUES (?, ?)", (email, password_hash))
         return True
     except sqlite3.IntegrityError:
         return False
-    finally:
-        conn.close()
+
 
 def get_user(email: str):
     """Obtiene la fila del usuario (email, password_hash)."""
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute("SELECT email, password_hash FROM usuarios WHERE email = ?", (email,))
-    row = cur.fetchone()
-    conn.close()
-    return row
+    with connection() as conn:
+        return conn.execute("SELECT email, password_hash FROM usuarios WHERE email = ?", (email,)).fetchone()
+
+
+def update_password_hash(email: str, password_hash: str) -> None:
+    """Reemplaza el hash guardado (migración de hashes antiguos al iniciar sesión)."""
+    with transaction() as conn:
+        conn.execute("UPDATE usuarios SET password_hash = ? WHERE email = ?", (password_hash, email))
@@ -0,0 +1,85 @@
+# src/etf_ui.py
+import pandas as pd
+import streamlit as st
+
+from . import charts
+from .analysis.etf import shared_holdings
+from .analysis.pipeline import etf_analysis
+from .auth import require_login
+from .services.figure_cache import chart
+from .tickers import parse_tickers
+
+MAX_ETFS = 60
+
+PERIODS = {"1 año": "1y", "3 años": "3y", "5 años": "5y", "10 años": "10y"}
+
+
+@st.experimental_fragment
+def _pair_detail(tickers: tuple[str, ...], period: str):
+    """Posiciones comunes de dos ETFs; elegir otro par sólo vuelve a ejecutar este bloque."""
+    analysis = etf_analysis(tickers, period)
+    etfs = list(analysis.weights.index)
+    if len(etfs) < 2:
+        return
+    st.subheader("Posiciones en común")
+    col_a, col_b = st.columns(2)
+    a = col_a.selectbox("ETF", etfs, index=0, key="etf_pair_a")
+    b = col_b.selectbox("Comparado con", [e for e in etfs if e != a], index=0, key="etf_pair_b")
+    shared = shared_holdings(analysis.weights, a, b, analysis.names)
+    facts = [f"{len(shared)} posiciones en común", f"solapamiento ponderado {analysis.overlap.loc[a, b]:.1f}%"]
+    corr = analysis.correlation
+    if a in corr.index and b in corr.index and pd.notna(corr.loc[a, b]):
+        facts.append(f"correlación {corr.loc[a, b]:.2f}")
+    st.caption(" · ".join(facts))
+    st.dataframe(shared.round(2), use_container_width=True)
+
+
+def render_etf():
+    require_login()
+
+    st.markdown("## 🧺 Analizar ETF's")
+    st.caption(
+        "Compara comisiones, sectores, posiciones en común y correlación de una lista de ETFs. "
+        "Yahoo sólo publica las posiciones principales de cada fondo."
+    )
+
+    text = st.text_area("ETFs (separados por coma, espacio o salto de línea)", "SPY, VOO, QQQ, VTI, SCHD, VIG")
+    period_label = st.selectbox("⏳ Período de la correlación", list(PERIODS), index=2, key="etf_period")
+    period = PERIODS[period_label]
+
+    tickers = parse_tickers(text)
+    if len(tickers) > MAX_ETFS:
+        st.warning(f"Se analizarán sólo los primeros {MAX_ETFS} ETFs.")
+        tickers = tickers[:MAX_ETFS]
+    if not tickers:
+        return
+
+    with st.spinner("Cargando datos de los fondos…"):
+        analysis = etf_analysis(tuple(tickers), period)
+    if analysis.failed:
+        st.warning("Sin datos de fondo para: " + ", ".join(analysis.failed))
+    if analysis.summary.empty:
+        return
+
+    # ─── Resumen y sectores ────────────────────────────────────
+    st.subheader("Resumen")
+    st.dataframe(analysis.summary.round(2), use_container_width=True)
+    if not analysis.sectors.empty:
+        chart(charts.sector_weights, analysis.sectors.round(2), key="etf_sectors")
+
+    # ─── Solapamiento y correlación ───────────────────────────
+    col_overlap, col_corr = st.columns(2)
+    with col_overlap:
+        chart(
+            charts.pair_heatmap, analysis.overlap.round(1), "Solapamiento ponderado (%)", "Oranges", 0, 100, ".0f",
+            key="etf_overlap",
+        )
+    with col_corr:
+        chart(
+            charts.pair_heatmap, analysis.correlation.round(3), f"Correlación diaria ({period_label})", "RdBu_r",
+            -1, 1, ".2f", key="etf_correlation",
+        )
+    with st.expander("Número de posiciones en común"):
+        st.dataframe(analysis.common, use_container_width=True)
+
+    _pair_detail(tuple(tickers), period)
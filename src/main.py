@@ -1,5 +1,14 @@
 # src/main.py
 from .ui import render
+from .auth import is_logged_in
+from .compound_ui import render_compound
+from .etf_ui import render_etf
+from .portfolio_ui import render_portfolio
+from .screener_ui import render_screener
+from .services.cache import HTTP_CACHE
+from .services.figure_cache import FIGURES
+from .services.scheduler import SCHEDULER
+from .services.swr import SWR
 import streamlit as st
 
 def main():
@@ -18,6 +27,8 @@ def main():
         # Botones para cada sección
         if st.button("Valoración y Análisis Financiero", key="btn_analisis"):
             section = "Valoración y Análisis Financiero"
+        if st.button("Screener de Acciones", key="btn_screener_menu"):
+            section = "Screener de Acciones"
         if st.button("Seguimiento de Cartera", key="btn_cartera"):
             section = "Seguimiento de Cartera"
         if st.button("Analizar ETF's", key="btn_etf"):
@@ -29,8 +40,28 @@ def main():
 
         st.session_state["selected_section"] = section
 
+        # Contadores de las cachés y del tráfico a Yahoo de este proceso (sólo con sesión iniciada)
+        if is_logged_in():
+            with st.expander("📊 Estado de cachés"):
+                st.caption("Caché HTTP (memoria + disco)")
+                st.json(HTTP_CACHE.stats(), expanded=False)
+                st.caption("Caché stale-while-revalidate")
+                st.json(SWR.stats(), expanded=False)
+                st.caption("Peticiones a Yahoo")
+                st.json(SCHEDULER.stats(), expanded=False)
+                st.caption("Figuras serializadas")
+                st.json(FIGURES.stats(), expanded=False)
+
     # Renderiza la sección seleccionada
     if section == "Valoración y Análisis Financiero":
         render()
+    elif section == "Screener de Acciones":
+        render_screener()
+    elif section == "Seguimiento de Cartera":
+        render_portfolio()
+    elif section == "Analizar ETF's":
+        render_etf()
+    elif section == "Calculadora de Interés Compuesto":
+        render_compound()
     else:
         st.info("Sección en construcción")
@@ -0,0 +1,245 @@
+# src/migrations.py
+"""
+Migraciones versionadas del esquema de `cokeapp.sqlite`.
+
+Cada migración tiene un número de versión y se aplica una sola vez; las aplicadas quedan en
+`schema_version`. `migrate()` es seguro en el arranque aunque varios procesos (web, prewarm)
+lo ejecuten a la vez: toma el bloqueo de escritura antes de mirar qué falta.
+Para cambiar el esquema se agrega una migración al final de MIGRATIONS; nunca se edita una ya publicada.
+"""
+import sqlite3
+import time
+from typing import Callable, Sequence
+
+Step = str | Callable[[sqlite3.Connection], None]
+
+# Esquema unificado de usuarios: el login (password_hash) y los datos de plan que cargaba create_cokeapp_db.py
+_USUARIOS = """
+    CREATE TABLE {name} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        email TEXT NOT NULL UNIQUE,
+        password_hash TEXT,
+        nombre TEXT,
+        tipo_plan TEXT NOT NULL DEFAULT 'free',
+        api_key TEXT,
+        fecha_expiracion TEXT,
+        fecha_registro TEXT DEFAULT CURRENT_TIMESTAMP
+    );
+"""
+_USUARIOS_COLUMNS = ("email", "password_hash", "nombre", "tipo_plan", "api_key", "fecha_expiracion", "fecha_registro")
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> list[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def _unify_usuarios(conn: sqlite3.Connection) -> None:
+    """
+    Crea `usuarios` con el esquema unificado.
+
+    Si ya existe con alguno de los dos esquemas antiguos (el de db.py, con email como clave y
+    password_hash, o el de create_cokeapp_db.py, con id y tipo_plan) se reconstruye conservando
+    las columnas que tenga.
+    """
+    existing = _columns(conn, "usuarios")
+    if not existing:
+        conn.execute(_USUARIOS.format(name="usuarios"))
+        return
+    if existing == ["id", *_USUARIOS_COLUMNS]:
+        return
+    conn.execute(_USUARIOS.format(name="usuarios_new"))
+    keep = [c for c in _USUARIOS_COLUMNS if c in existing]
+    conn.execute(f"INSERT INTO usuarios_new ({', '.join(keep)}) SELECT {', '.join(keep)} FROM usuarios")
+    conn.execute("DROP TABLE usuarios")
+    conn.execute("ALTER TABLE usuarios_new RENAME TO usuarios")
+
+
+MIGRATIONS: list[tuple[int, str, Sequence[Step]]] = [
+    (1, "usuarios unificados", [_unify_usuarios]),
+    (
+        2,
+        "almacén de precios y caché persistente",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS price_history (
+                ticker TEXT NOT NULL,
+                interval TEXT NOT NULL,
+                date TEXT NOT NULL,
+                open REAL, high REAL, low REAL, close REAL,
+                volume REAL, dividends REAL, stock_splits REAL,
+                PRIMARY KEY (ticker, interval, date)
+            ) WITHOUT ROWID;
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS price_history_meta (
+                ticker TEXT NOT NULL,
+                interval TEXT NOT NULL,
+                tz TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (ticker, interval)
+            );
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS swr_cache (
+                dataset TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value BLOB NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (dataset, key)
+            );
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_price_history_meta_updated ON price_history_meta (updated_at)",
+            "CREATE INDEX IF NOT EXISTS idx_swr_cache_fetched ON swr_cache (fetched_at)",
+        ],
+    ),
+    (
+        3,
+        "watchlists",
+        [
+            """
+            CREATE TABLE watchlists (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_email TEXT NOT NULL REFERENCES usuarios (email) ON DELETE CASCADE,
+                nombre TEXT NOT NULL,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE (user_email, nombre)
+            );
+            """,
+            """
+            CREATE TABLE watchlist_items (
+                watchlist_id INTEGER NOT NULL REFERENCES watchlists (id) ON DELETE CASCADE,
+                ticker TEXT NOT NULL,
+                added_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (watchlist_id, ticker)
+            ) WITHOUT ROWID;
+            """,
+            "CREATE INDEX idx_watchlist_items_ticker ON watchlist_items (ticker)",
+        ],
+    ),
+    (
+        4,
+        "carteras",
+        [
+            """
+            CREATE TABLE portfolios (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_email TEXT NOT NULL REFERENCES usuarios (email) ON DELETE CASCADE,
+                nombre TEXT NOT NULL,
+                moneda TEXT NOT NULL DEFAULT 'USD',
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE (user_email, nombre)
+            );
+            """,
+            """
+            CREATE TABLE portfolio_transactions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                portfolio_id INTEGER NOT NULL REFERENCES portfolios (id) ON DELETE CASCADE,
+                ticker TEXT NOT NULL,
+                fecha TEXT NOT NULL,
+                tipo TEXT NOT NULL CHECK (tipo IN ('compra', 'venta', 'dividendo')),
+                cantidad REAL NOT NULL,
+                precio REAL NOT NULL,
+                comision REAL NOT NULL DEFAULT 0
+            );
+            """,
+            "CREATE INDEX idx_portfolio_tx_portfolio_fecha ON portfolio_transactions (portfolio_id, fecha)",
+            "CREATE INDEX idx_portfolio_tx_ticker ON portfolio_transactions (ticker)",
+        ],
+    ),
+    (
+        5,
+        "resultados de tareas",
+        [
+            """
+            CREATE TABLE job_results (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job TEXT NOT NULL,
+                key TEXT NOT NULL,
+                status TEXT NOT NULL CHECK (status IN ('pendiente', 'ok', 'error')),
+                result BLOB,
+                error TEXT,
+                started_at REAL NOT NULL,
+                finished_at REAL
+            );
+            """,
+            "CREATE INDEX idx_job_results_job_key ON job_results (job, key, finished_at)",
+            "CREATE INDEX idx_job_results_status ON job_results (status)",
+        ],
+    ),
+    (
+        6,
+        "valoraciones diarias de carteras",
+        [
+            """
+            CREATE TABLE portfolio_valuations (
+                portfolio_id INTEGER NOT NULL REFERENCES portfolios (id) ON DELETE CASCADE,
+                fecha TEXT NOT NULL,
+                valor REAL NOT NULL,
+                aportado REAL NOT NULL,
+                flujo REAL NOT NULL,
+                dividendos REAL NOT NULL,
+                indice REAL NOT NULL,
+                PRIMARY KEY (portfolio_id, fecha)
+            ) WITHOUT ROWID;
+            """,
+            """
+            CREATE TABLE portfolio_valuation_meta (
+                portfolio_id INTEGER PRIMARY KEY REFERENCES portfolios (id) ON DELETE CASCADE,
+                market_key TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            """,
+        ],
+    ),
+]
+
+
+def current_version(conn: sqlite3.Connection) -> int:
+    """Última versión aplicada (0 en una base nueva)."""
+    if not _columns(conn, "schema_version"):
+        return 0
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection, migrations: list[tuple[int, str, Sequence[Step]]] = MIGRATIONS) -> list[int]:
+    """
+    Aplica en orden las migraciones pendientes, cada una en su propia transacción.
+
+    Devuelve las versiones aplicadas en esta llamada (vacía si el esquema ya estaba al día).
+    """
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at REAL NOT NULL
+        );
+    """)
+    conn.commit()
+
+    applied = []
+    for version, name, steps in sorted(migrations, key=lambda m: m[0]):
+        if version <= current_version(conn):
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Otro proceso pudo aplicarla mientras se esperaba el bloqueo
+            if version <= current_version(conn):
+                conn.rollback()
+                continue
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+            conn.execute(
+                "INSERT INTO schema_version (version, name, applied_at) VALUES (?, ?, ?)",
+                (version, name, time.time()),
+            )
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        applied.append(version)
+    return applied
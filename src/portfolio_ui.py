@@ -0,0 +1,142 @@
+# src/portfolio_ui.py
+import pandas as pd
+import streamlit as st
+
+from . import charts
+from .analysis.pipeline import portfolio_analysis, portfolio_returns
+from .analysis.portfolio import TRANSACTION_COLUMNS, TRANSACTION_TYPES
+from .auth import require_login
+from .charts import PRIMARY_ORANGE
+from .services.figure_cache import chart
+from .services.portfolio_store import (
+    add_transaction,
+    add_transactions,
+    create_portfolio,
+    delete_transaction,
+    list_portfolios,
+)
+
+CURRENCIES = ["USD", "EUR"]
+
+
+def _new_portfolio(user: str, expanded: bool) -> None:
+    with st.expander("➕ Nueva cartera", expanded=expanded):
+        nombre = st.text_input("Nombre de la cartera", key="portfolio_new_name")
+        moneda = st.selectbox("Moneda", CURRENCIES, key="portfolio_new_currency")
+        if st.button("Crear cartera", key="btn_portfolio_create") and nombre.strip():
+            if create_portfolio(user, nombre.strip(), moneda) is None:
+                st.warning("Ya tienes una cartera con ese nombre.")
+            else:
+                st.session_state["portfolio_selected"] = nombre.strip()
+                st.experimental_rerun()
+
+
+def _transaction_forms(portfolio_id: int) -> None:
+    """Alta de una transacción o importación de un CSV (carteras de decenas de posiciones)."""
+    with st.expander("📝 Añadir transacciones"):
+        with st.form("portfolio_tx_form", clear_on_submit=True):
+            cols = st.columns(6)
+            ticker = cols[0].text_input("Ticker")
+            fecha = cols[1].date_input("Fecha")
+            tipo = cols[2].selectbox("Tipo", TRANSACTION_TYPES)
+            cantidad = cols[3].number_input("Cantidad", min_value=0.0, step=1.0)
+            precio = cols[4].number_input("Precio", min_value=0.0, step=0.01)
+            comision = cols[5].number_input("Comisión", min_value=0.0, step=0.01)
+            st.caption("Dividendo: cantidad = acciones, precio = dividendo por acción, comisión = retención.")
+            if st.form_submit_button("Añadir"):
+                try:
+                    add_transaction(portfolio_id, ticker, fecha.isoformat(), tipo, cantidad, precio, comision)
+                    st.success(f"{tipo.capitalize()} de {ticker.upper()} añadida.")
+                except ValueError as e:
+                    st.error(str(e))
+
+        uploaded = st.file_uploader(
+            "…o importa un CSV con columnas ticker, fecha, tipo, cantidad, precio[, comision]",
+            type=["csv"],
+            key="portfolio_csv",
+        )
+        if uploaded is not None and st.button("Importar", key="btn_portfolio_import"):
+            try:
+                rows = pd.read_csv(uploaded)
+                rows.columns = [c.strip().lower() for c in rows.columns]
+                st.success(f"{add_transactions(portfolio_id, rows)} transacciones importadas.")
+            except (ValueError, pd.errors.ParserError) as e:
+                st.error(f"No se pudo importar el archivo: {e}")
+
+
+def render_portfolio():
+    require_login()
+    user = st.session_state["user"]
+
+    st.markdown("## 💼 Seguimiento de Cartera")
+    portfolios = list_portfolios(user)
+    _new_portfolio(user, expanded=not portfolios)
+    if not portfolios:
+        st.info("Crea tu primera cartera para empezar.")
+        return
+
+    by_name = {nombre: (portfolio_id, moneda) for portfolio_id, nombre, moneda in portfolios}
+    nombre = st.selectbox("Cartera", list(by_name), key="portfolio_selected")
+    portfolio_id, moneda = by_name[nombre]
+
+    _transaction_forms(portfolio_id)
+
+    # Toda la cartera sale de una descarga agrupada de precios y se actualiza de forma incremental
+    analysis = portfolio_analysis(portfolio_id)
+    if analysis is None:
+        st.info("La cartera no tiene transacciones todavía.")
+        return
+    if analysis.missing:
+        st.warning("Sin precios para: " + ", ".join(analysis.missing) + " (no se incluyen en el valor).")
+    if analysis.value.empty:
+        return
+
+    # ─── Resumen ───────────────────────────────────────────────
+    value, invested = analysis.value.iloc[-1], analysis.invested.iloc[-1]
+    dividends = analysis.dividends
+    last_year = dividends[dividends.index > dividends.index[-1] - pd.DateOffset(years=1)].sum()
+    cols = st.columns(6)
+    cols[0].metric("Valor", f"{value:,.2f} {moneda}")
+    cols[1].metric("Aportado neto", f"{invested:,.2f} {moneda}")
+    cols[2].metric("Plusvalía latente", f"{analysis.positions['Plusvalía'].sum():,.2f} {moneda}")
+    cols[3].metric("Rentabilidad", f"{(analysis.growth.iloc[-1] - 1) * 100:.2f}%")
+    cols[4].metric("Dividendos 12 m", f"{last_year:,.2f} {moneda}")
+    cols[5].metric("Máx. drawdown", f"{analysis.drawdown.min():.2f}%")
+
+    chart(charts.portfolio_value, analysis.value, analysis.invested, key="portfolio_value")
+    col_dd, col_weights = st.columns([2, 1])
+    with col_dd:
+        st.subheader("Drawdown de la cartera")
+        chart(charts.drawdown, analysis.drawdown, key="portfolio_drawdown")
+    with col_weights:
+        weights = analysis.positions["Valor"]
+        chart(charts.portfolio_weights, weights[weights > 0], key="portfolio_weights")
+
+    annual = dividends.groupby(dividends.index.year).sum()
+    annual = annual[annual > 0]
+    if not annual.empty:
+        chart(charts.simple_bars, annual, "Dividendos cobrados por año", PRIMARY_ORANGE, key="portfolio_dividends")
+
+    # ─── Rentabilidad ──────────────────────────────────────────
+    # Valoraciones diarias guardadas: en cada visita sólo se calculan las barras nuevas
+    returns = portfolio_returns(portfolio_id)
+    if returns is not None:
+        st.subheader("Rentabilidad")
+        st.caption(
+            "TWR: rentabilidad de la gestión, sin el efecto de cuándo se aportó el dinero. "
+            "XIRR: rentabilidad anual del dinero aportado, según sus fechas."
+        )
+        st.dataframe(returns.table.round(2), use_container_width=True)
+
+    # ─── Posiciones y transacciones ───────────────────────────
+    st.subheader("Posiciones")
+    st.dataframe(analysis.positions.round(2), use_container_width=True)
+
+    st.subheader("Transacciones")
+    ledger = analysis.ledger[TRANSACTION_COLUMNS].iloc[::-1].set_index("id")
+    st.dataframe(ledger, use_container_width=True)
+    col_id, col_btn = st.columns([3, 1])
+    to_delete = col_id.selectbox("Transacción a eliminar", ledger.index, key="portfolio_tx_delete")
+    if col_btn.button("Eliminar", key="btn_portfolio_tx_delete"):
+        delete_transaction(portfolio_id, int(to_delete))
+        st.experimental_rerun()
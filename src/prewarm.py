@@ -0,0 +1,88 @@
+# src/prewarm.py
+"""
+Pre-calentador de cachés para los tickers más consultados.
+
+Se ejecuta fuera de Streamlit (`python prewarm.py`), como proceso aparte del Procfile o desde cron,
+y llena las cachés persistentes que luego lee la app:
+- Historial diario, con los dividendos: almacén en disco (price_store), con descargas agrupadas.
+- Info y estados financieros: caché stale-while-revalidate (swr_cache).
+Todo pasa por el planificador de yf_client, así que respeta el límite de peticiones a Yahoo.
+"""
+import argparse
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from .services.price_store import STORE_PERIOD
+from .services.scheduler import SCHEDULER
+from .services.swr import SWR
+from .services.yf_client import history_batch, warm_ticker
+from .tickers import parse_tickers
+
+logger = logging.getLogger("prewarm")
+
+DEFAULT_TICKERS_FILE = Path(__file__).resolve().parent.parent / "prewarm_tickers.txt"
+PREWARM_MAX_WORKERS = 2
+# Este proceso comparte la cuota de Yahoo con la web: va a su propio ritmo, más bajo, y sin ráfagas
+PREWARM_RATE_PER_SEC = float(os.getenv("PREWARM_RATE_PER_SEC", "1"))
+PREWARM_BURST = int(os.getenv("PREWARM_BURST", "1"))
+
+
+def load_tickers(path: Path) -> list[str]:
+    """Lee la lista de tickers (separados por comas, espacios o saltos de línea; '#' comenta la línea)."""
+    lines = [line.split("#", 1)[0] for line in path.read_text(encoding="utf-8").splitlines()]
+    return parse_tickers("\n".join(lines))
+
+
+def prewarm(tickers: list[str], max_workers: int = PREWARM_MAX_WORKERS) -> dict[str, str]:
+    """
+    Calienta historial, info, dividendos y estados de `tickers`.
+
+    Devuelve ticker -> resumen ("ok: info, cashflow" / "al día" / "error: ...").
+    """
+    try:
+        history_batch(tickers, period=STORE_PERIOD)
+    except Exception as e:
+        logger.warning("Descarga agrupada de historiales fallida: %s", e)
+
+    results: dict[str, str] = {}
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prewarm") as pool:
+        futures = {pool.submit(warm_ticker, t): t for t in tickers}
+        for fut in as_completed(futures):
+            ticker = futures[fut]
+            try:
+                fetched = fut.result()
+                results[ticker] = f"ok: {', '.join(fetched)}" if fetched else "al día"
+            except Exception as e:
+                results[ticker] = f"error: {e}"
+            logger.info("%s %s", ticker, results[ticker])
+    return results
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Pre-calienta las cachés de Yahoo para una lista de tickers.")
+    parser.add_argument("tickers", nargs="*", help="Tickers; si se omiten se leen de --file")
+    parser.add_argument("--file", type=Path, default=Path(os.getenv("PREWARM_TICKERS_FILE", DEFAULT_TICKERS_FILE)))
+    parser.add_argument("--workers", type=int, default=PREWARM_MAX_WORKERS)
+    parser.add_argument(
+        "--every", type=float, default=0,
+        help="Minutos entre pasadas; 0 = una sola pasada (cron)",
+    )
+    args = parser.parse_args(argv)
+    SCHEDULER.set_rate(PREWARM_RATE_PER_SEC, PREWARM_BURST)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+
+    while True:
+        tickers = parse_tickers(" ".join(args.tickers)) if args.tickers else load_tickers(args.file)
+        started = time.monotonic()
+        results = prewarm(tickers, max_workers=args.workers)
+        errors = sum(r.startswith("error") for r in results.values())
+        logger.info(
+            "%d tickers en %.1f s (%d errores) | yahoo %s | swr %s",
+            len(tickers), time.monotonic() - started, errors, SCHEDULER.stats(), SWR.stats(),
+        )
+        if args.every <= 0:
+            break
+        time.sleep(args.every * 60)
@@ -0,0 +1,62 @@
+# src/screener_ui.py
+import pandas as pd
+import streamlit as st
+
+from .analysis.pipeline import run_screener
+from .auth import require_login
+from .tickers import MAX_TICKERS, parse_tickers
+
+# Columnas del screener: campo de HeaderMetrics -> encabezado de la tabla
+SCREENER_COLUMNS = {
+    "price": "Precio",
+    "yield_actual": "Yield (%)",
+    "pe_ratio": "PER",
+    "payout_ratio": "Pay-out (%)",
+    "cagr_dividend": "CAGR div (%)",
+    "G_percent": "G (%)",
+    "eps_5y": "EPS 5 años",
+    "per_5y": "Precio a PER 5 años",
+    "fair_price": "Precio Justo (libro)",
+    "gw_undervalued": "Infrav. G. Weiss",
+}
+
+
+def render_screener():
+    require_login()
+
+    st.markdown("## 🧮 Screener de Acciones")
+    st.caption("Pega una lista de tickers o sube un archivo (.txt / .csv) para comparar sus métricas principales.")
+
+    text = st.text_area("Tickers (separados por coma, espacio o salto de línea)", "KO, PEP, JNJ, PG, MSFT")
+    uploaded = st.file_uploader("…o sube un archivo", type=["txt", "csv"])
+    if uploaded is not None:
+        text = f"{text}\n{uploaded.getvalue().decode('utf-8', errors='ignore')}"
+
+    period_dict = {"5 años": "5y", "10 años": "10y", "15 años": "15y", "20 años": "20y"}
+    period_label = st.selectbox("⏳ Período", list(period_dict), key="screener_period")
+
+    tickers = parse_tickers(text)
+    if len(tickers) > MAX_TICKERS:
+        st.warning(f"Se analizarán sólo los primeros {MAX_TICKERS} tickers.")
+        tickers = tickers[:MAX_TICKERS]
+
+    if not st.button("Analizar", key="btn_screener") or not tickers:
+        return
+
+    progress = st.progress(0.0, text="Descargando datos…")
+
+    def on_progress(done: int, total: int, ticker: str):
+        progress.progress(done / total, text=f"{done}/{total} · {ticker}")
+
+    df = run_screener(tickers, period_dict[period_label], on_progress=on_progress)
+    progress.empty()
+
+    table = df.reindex(columns=list(SCREENER_COLUMNS)).astype(float)
+    table["payout_ratio"] *= 100
+    table = table.rename(columns=SCREENER_COLUMNS)
+    table.index.name = "Ticker"
+    st.dataframe(table.round(2), use_container_width=True)
+
+    failed = df["error"].dropna() if "error" in df else pd.Series(dtype=object)
+    if not failed.empty:
+        st.warning("Sin datos para: " + ", ".join(failed.index))
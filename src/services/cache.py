@@ -1,14 +1,18 @@
-from datetime import timedelta
 import streamlit as st
 import requests_cache
 
+from .http_cache import CACHEABLE_CODES, DEFAULT_TTL, TieredCache
+
+# Backend compartido por todo el proceso (LRU en memoria + SQLite acotado, ver http_cache)
+HTTP_CACHE = TieredCache("yf_cache")
+
 
 def install_cache():
-    """Configure requests_cache with sensible defaults."""
+    """Configure requests_cache with the tiered backend; TTLs per status code live in http_cache.STATUS_TTL."""
     requests_cache.install_cache(
-        "yf_cache",
-        expire_after=timedelta(hours=24),
-        allowable_codes=(200, 203, 300, 301, 404, 429),
+        backend=HTTP_CACHE,
+        expire_after=DEFAULT_TTL,
+        allowable_codes=CACHEABLE_CODES,
         allowable_methods=("GET", "POST"),
     )
 
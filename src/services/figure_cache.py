@@ -0,0 +1,167 @@
+# src/services/figure_cache.py
+"""
+Caché de figuras Plotly por huella de datos.
+
+Cada rerun de la página volvía a construir ~20 `go.Figure` (validación de Plotly, etiquetas por
+punto) y a serializarlas, aunque los datos no hubieran cambiado. `chart(builder, *args)` calcula una
+huella de los argumentos (hash vectorizado de pandas para series y DataFrames), construye y
+serializa la figura sólo la primera vez y, en los reruns, envía directamente el JSON guardado.
+
+Las figuras viven en un LRU en memoria compartido por todas las sesiones del proceso, con tope de bytes.
+"""
+import dataclasses
+import hashlib
+import json
+import os
+import threading
+from collections import Counter, OrderedDict
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+import streamlit as st
+
+FIGURE_CACHE_MAX_BYTES = int(os.getenv("FIGURE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+Builder = Callable[..., go.Figure]
+
+
+def _feed(h: "hashlib.blake2b", obj: Any) -> None:
+    """Agrega `obj` a la huella; los datos tabulares se hashean sin pasar por Python fila a fila."""
+    if isinstance(obj, (pd.DataFrame, pd.Series, pd.Index)):
+        h.update(type(obj).__name__.encode())
+        if isinstance(obj, pd.DataFrame):
+            h.update(repr(list(obj.columns)).encode())
+        elif isinstance(obj, pd.Series):
+            h.update(repr(obj.name).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=not isinstance(obj, pd.Index)).to_numpy().tobytes())
+    elif isinstance(obj, np.ndarray):
+        h.update(f"ndarray{obj.dtype}{obj.shape}".encode())
+        h.update(pd.util.hash_array(obj.ravel()).tobytes())
+    elif dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        h.update(type(obj).__qualname__.encode())
+        for field in dataclasses.fields(obj):
+            _feed(h, getattr(obj, field.name))
+    elif isinstance(obj, (list, tuple)):
+        h.update(f"{type(obj).__name__}{len(obj)}".encode())
+        for item in obj:
+            _feed(h, item)
+    elif isinstance(obj, dict):
+        h.update(f"dict{len(obj)}".encode())
+        for key in sorted(obj, key=repr):
+            _feed(h, key)
+            _feed(h, obj[key])
+    else:
+        h.update(f"{type(obj).__name__}:{obj!r}".encode())
+    h.update(b"|")
+
+
+def fingerprint(builder: Builder, *args, **kwargs) -> str:
+    """Huella de (constructor, argumentos): igual huella ⇒ misma figura."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{builder.__module__}.{builder.__qualname__}".encode())
+    _feed(h, args)
+    _feed(h, kwargs)
+    return h.hexdigest()
+
+
+class FigureCache:
+    """LRU thread-safe de figuras ya serializadas (el JSON que recibe el frontend), acotado en bytes."""
+
+    def __init__(self, max_bytes: int = FIGURE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._specs: OrderedDict[str, str] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._metrics: Counter = Counter()
+
+    def spec(self, builder: Builder, *args, **kwargs) -> tuple[str, str]:
+        """(huella, JSON) de la figura; sólo se llama a `builder` si esa huella no está en caché."""
+        key = fingerprint(builder, *args, **kwargs)
+        with self._lock:
+            spec = self._specs.get(key)
+            if spec is not None:
+                self._specs.move_to_end(key)
+                self._metrics["hits"] += 1
+                return key, spec
+            self._metrics["misses"] += 1
+
+        # Se construye fuera del lock: dos sesiones con la misma huella a la vez sólo repiten trabajo
+        spec = pio.to_json(builder(*args, **kwargs), validate=False)
+        size = len(spec)
+        with self._lock:
+            if key not in self._specs and size <= self.max_bytes:
+                self._specs[key] = spec
+                self._bytes += size
+                while self._bytes > self.max_bytes:
+                    _, evicted = self._specs.popitem(last=False)
+                    self._bytes -= len(evicted)
+                    self._metrics["evictions"] += 1
+        return key, spec
+
+    def clear(self) -> None:
+        with self._lock:
+            self._specs.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            stats = {k: self._metrics[k] for k in ("hits", "misses", "evictions")}
+            stats["entries"] = len(self._specs)
+            stats["bytes"] = self._bytes
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        return stats
+
+
+FIGURES = FigureCache()
+
+
+def _enqueue_spec(key: str, spec: str, element_key: str | None, use_container_width: bool) -> None:
+    """
+    Envía un JSON de Plotly ya serializado, igual que `st.plotly_chart` sin selección.
+
+    `st.plotly_chart` vuelve a copiar y serializar la figura en cada llamada; aquí se reutiliza el JSON.
+    Depende de internos de Streamlit (versión fijada en requirements.txt); si cambian, se recurre a
+    `st.plotly_chart`, que reconstruye la figura a partir del JSON.
+    """
+    try:
+        from streamlit.elements.form import current_form_id
+        from streamlit.proto.PlotlyChart_pb2 import PlotlyChart as PlotlyChartProto
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        from streamlit.runtime.state.common import compute_widget_id
+    except ImportError:
+        st.plotly_chart(pio.from_json(spec), use_container_width=use_container_width, key=element_key)
+        return
+
+    dg = st._main
+    proto = PlotlyChartProto()
+    proto.use_container_width = use_container_width
+    proto.theme = "streamlit"
+    proto.form_id = current_form_id(dg)
+    proto.spec = spec
+    proto.config = json.dumps({"showLink": False, "linkText": False})
+    ctx = get_script_run_ctx()
+    # La huella identifica la figura igual que el JSON completo, sin volver a hashear cientos de KB
+    proto.id = compute_widget_id(
+        "plotly_chart",
+        user_key=element_key,
+        key=element_key,
+        plotly_spec=key,
+        plotly_config=proto.config,
+        selection_mode=(),
+        is_selection_activated=False,
+        theme="streamlit",
+        form_id=proto.form_id,
+        use_container_width=use_container_width,
+        page=ctx.page_script_hash if ctx else None,
+    )
+    dg._enqueue("plotly_chart", proto)
+
+
+def chart(builder: Builder, *args, key: str | None = None, use_container_width: bool = True, **kwargs) -> None:
+    """Dibuja `builder(*args, **kwargs)` reutilizando la figura serializada si los datos no cambiaron."""
+    fingerprint_key, spec = FIGURES.spec(builder, *args, **kwargs)
+    _enqueue_spec(fingerprint_key, spec, key, use_container_width)
@@ -0,0 +1,268 @@
+# src/services/http_cache.py
+"""
+Backend de requests_cache en dos niveles: LRU en memoria delante de un SQLite acotado en tamaño.
+
+- Memoria: respuestas ya serializadas (no comprimidas), con tope de bytes; un hit no toca el disco.
+- Disco: SQLite en modo WAL (lectores concurrentes), valores comprimidos con zlib y tope de
+  tamaño total; al superarlo se borran primero las caducadas y después las menos usadas.
+- TTL por código de estado: un 429 o un 5xx dura segundos, un 404 una hora y el resto 24 h.
+"""
+import logging
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter, OrderedDict
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Iterator
+
+from requests_cache.backends import BaseCache, BaseStorage
+from requests_cache.policy import utcnow
+from requests_cache.serializers import pickle_serializer
+
+logger = logging.getLogger(__name__)
+
+# TTL por código de estado; el resto usa DEFAULT_TTL
+DEFAULT_TTL = timedelta(hours=24)
+STATUS_TTL = {
+    404: timedelta(hours=1),
+    429: timedelta(seconds=30),
+    500: timedelta(seconds=30),
+    502: timedelta(seconds=30),
+    503: timedelta(seconds=30),
+}
+CACHEABLE_CODES = (200, 203, 300, 301, *STATUS_TTL)
+
+MEMORY_MAX_BYTES = 64 * 1024 * 1024
+DISK_MAX_BYTES = 512 * 1024 * 1024
+
+
+class TieredStorage(BaseStorage):
+    """
+    Un `BaseStorage` (una tabla) con LRU en memoria y SQLite comprimido detrás.
+
+    Las conexiones son por hilo para que las lecturas no se serialicen detrás de un único lock.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        table: str,
+        memory_max_bytes: int = MEMORY_MAX_BYTES,
+        disk_max_bytes: int = DISK_MAX_BYTES,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.db_path = db_path
+        self.table = table
+        self.memory_max_bytes = memory_max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_bytes = 0
+        self._metrics: Counter = Counter()
+
+        conn = self._conn()
+        # Un archivo creado por el backend SQLite original de requests_cache tiene otro esquema: se descarta
+        columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+        if columns and "accessed_at" not in columns:
+            conn.execute(f"DROP TABLE {table}")
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                expires REAL,
+                accessed_at REAL NOT NULL
+            );
+        """)
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_accessed ON {table} (accessed_at)")
+        conn.commit()
+        self._disk_bytes = conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {table}").fetchone()[0]
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ─── Serialización ──────────────────────────────────────────
+    def _dumps(self, value: Any) -> bytes:
+        return self.serialize(value) if self.serializer else pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def _loads(self, key: str, raw: bytes) -> Any:
+        return self.deserialize(key, raw) if self.serializer else pickle.loads(raw)
+
+    # ─── Memoria ────────────────────────────────────────────────
+    def _remember(self, key: str, raw: bytes) -> None:
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_bytes -= len(old)
+            if len(raw) > self.memory_max_bytes:
+                return
+            self._memory[key] = raw
+            self._memory_bytes += len(raw)
+            while self._memory_bytes > self.memory_max_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+                self._metrics["memory_evictions"] += 1
+
+    def _forget(self, key: str) -> None:
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_bytes -= len(old)
+
+    # ─── MutableMapping ─────────────────────────────────────────
+    def __getitem__(self, key: str) -> Any:
+        with self._lock:
+            raw = self._memory.get(key)
+            if raw is not None:
+                self._memory.move_to_end(key)
+                self._metrics["memory_hits"] += 1
+        if raw is not None:
+            return self._loads(key, raw)
+
+        conn = self._conn()
+        row = conn.execute(f"SELECT value FROM {self.table} WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self._count("misses")
+            raise KeyError(key)
+        raw = zlib.decompress(row[0])
+        self._count("disk_hits")
+        self._remember(key, raw)
+        try:
+            conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+        except sqlite3.OperationalError:
+            pass  # otro proceso está escribiendo; el orden LRU puede esperar
+        return self._loads(key, raw)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        raw = self._dumps(value)
+        blob = zlib.compress(raw, 6)
+        expires = getattr(value, "expires", None)
+        conn = self._conn()
+        old = conn.execute(f"SELECT size FROM {self.table} WHERE key = ?", (key,)).fetchone()
+        conn.execute(
+            f"INSERT OR REPLACE INTO {self.table} VALUES (?, ?, ?, ?, ?)",
+            (key, blob, len(blob), expires.timestamp() if expires else None, time.time()),
+        )
+        conn.commit()
+        with self._lock:
+            self._disk_bytes += len(blob) - (old[0] if old else 0)
+            self._metrics["writes"] += 1
+        self._remember(key, raw)
+        if self._disk_bytes > self.disk_max_bytes:
+            self._evict()
+
+    def __delitem__(self, key: str) -> None:
+        self._forget(key)
+        conn = self._conn()
+        row = conn.execute(f"DELETE FROM {self.table} WHERE key = ? RETURNING size", (key,)).fetchone()
+        conn.commit()
+        if row is None:
+            raise KeyError(key)
+        with self._lock:
+            self._disk_bytes -= row[0]
+
+    def __iter__(self) -> Iterator[str]:
+        for (key,) in self._conn().execute(f"SELECT key FROM {self.table}").fetchall():
+            yield key
+
+    def __len__(self) -> int:
+        return self._conn().execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            self._disk_bytes = 0
+        conn = self._conn()
+        conn.execute(f"DELETE FROM {self.table}")
+        conn.commit()
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # ─── Desalojo ───────────────────────────────────────────────
+    def _evict(self) -> None:
+        """Baja el disco al 90 % del tope: primero lo caducado, después lo menos usado."""
+        target = int(self.disk_max_bytes * 0.9)
+        conn = self._conn()
+        # Otro proceso (p. ej. prewarm) puede escribir en el mismo archivo: se recalcula el total
+        total = conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.table}").fetchone()[0]
+        with self._lock:
+            self._disk_bytes = total
+        expired = conn.execute(
+            f"DELETE FROM {self.table} WHERE expires IS NOT NULL AND expires < ? RETURNING key, size",
+            (time.time(),),
+        ).fetchall()
+        freed = sum(size for _, size in expired)
+        removed = [key for key, _ in expired]
+        if self._disk_bytes - freed > target:
+            for key, size in conn.execute(
+                f"SELECT key, size FROM {self.table} ORDER BY accessed_at"
+            ).fetchall():
+                if self._disk_bytes - freed <= target:
+                    break
+                removed.append(key)
+                freed += size
+            conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", [(k,) for k in removed[len(expired):]])
+        conn.commit()
+        for key in removed:
+            self._forget(key)
+        with self._lock:
+            self._disk_bytes -= freed
+            self._metrics["disk_evictions"] += len(removed)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._metrics[name] += 1
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            stats = {
+                k: self._metrics[k]
+                for k in ("memory_hits", "disk_hits", "misses", "writes", "memory_evictions", "disk_evictions")
+            }
+            stats["memory_entries"] = len(self._memory)
+            stats["memory_bytes"] = self._memory_bytes
+            stats["disk_bytes"] = self._disk_bytes
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 3) if lookups else 0.0
+        return stats
+
+
+class TieredCache(BaseCache):
+    """Backend de requests_cache: respuestas y redirecciones en `TieredStorage`, con TTL por código."""
+
+    def __init__(self, cache_name: str = "yf_cache", **kwargs):
+        super().__init__(cache_name=cache_name, **kwargs)
+        self._db_path = Path(cache_name).with_suffix(".sqlite")
+        self.responses = TieredStorage(self._db_path, "responses", serializer=pickle_serializer)
+        self.redirects = TieredStorage(self._db_path, "redirects", memory_max_bytes=MEMORY_MAX_BYTES // 16)
+
+    @property
+    def db_path(self) -> Path:
+        return self._db_path
+
+    def save_response(self, response, cache_key=None, expires=None):
+        ttl = STATUS_TTL.get(response.status_code)
+        if ttl is not None:
+            expires = utcnow() + ttl
+        super().save_response(response, cache_key=cache_key, expires=expires)
+
+    def stats(self) -> dict[str, float]:
+        """Estadísticas del nivel de respuestas (hit rate, bytes en memoria y en disco)."""
+        return self.responses.stats()
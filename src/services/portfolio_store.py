@@ -0,0 +1,188 @@
+# src/services/portfolio_store.py
+"""
+Carteras y su libro de transacciones, por usuario (tablas `portfolios` y `portfolio_transactions`).
+
+Las posiciones no se guardan: se derivan del libro en `analysis.portfolio`, así una transacción
+borrada o corregida nunca deja posiciones desincronizadas. Las valoraciones diarias
+(`portfolio_valuations`, ver `analysis.returns`) sí se guardan y sólo crecen; al escribir en el libro
+se descartan las posteriores a la fecha afectada.
+"""
+import sqlite3
+import time
+
+import pandas as pd
+
+from ..analysis.portfolio import TRANSACTION_COLUMNS, TRANSACTION_TYPES
+from ..analysis.returns import VALUATION_COLUMNS
+from ..db import connection, transaction
+
+
+def list_portfolios(user_email: str) -> list[tuple[int, str, str]]:
+    """(id, nombre, moneda) de las carteras del usuario, por nombre."""
+    with connection() as conn:
+        return conn.execute(
+            "SELECT id, nombre, moneda FROM portfolios WHERE user_email = ? ORDER BY nombre", (user_email,)
+        ).fetchall()
+
+
+def create_portfolio(user_email: str, nombre: str, moneda: str = "USD") -> int | None:
+    """Crea una cartera y devuelve su id; None si el usuario ya tiene una con ese nombre."""
+    try:
+        with transaction() as conn:
+            cur = conn.execute(
+                "INSERT INTO portfolios (user_email, nombre, moneda) VALUES (?, ?, ?)", (user_email, nombre, moneda)
+            )
+            return cur.lastrowid
+    except sqlite3.IntegrityError:
+        return None
+
+
+def delete_portfolio(user_email: str, portfolio_id: int) -> None:
+    """Borra la cartera y sus transacciones (ON DELETE CASCADE)."""
+    with transaction() as conn:
+        conn.execute("DELETE FROM portfolios WHERE id = ? AND user_email = ?", (portfolio_id, user_email))
+
+
+def _validated(rows: pd.DataFrame) -> pd.DataFrame:
+    """Normaliza transacciones nuevas (ticker en mayúsculas, fecha ISO) y rechaza las inválidas con ValueError."""
+    missing = {"ticker", "fecha", "tipo", "cantidad", "precio"} - set(rows.columns)
+    if missing:
+        raise ValueError(f"Faltan columnas: {', '.join(sorted(missing))}")
+    rows = rows.copy()
+    rows["ticker"] = rows["ticker"].astype(str).str.strip().str.upper()
+    rows["tipo"] = rows["tipo"].astype(str).str.strip().str.lower()
+    rows["fecha"] = pd.to_datetime(rows["fecha"], errors="coerce").dt.strftime("%Y-%m-%d")
+    rows["comision"] = pd.to_numeric(rows["comision"], errors="coerce").fillna(0.0) if "comision" in rows else 0.0
+    for col in ("cantidad", "precio"):
+        rows[col] = pd.to_numeric(rows[col], errors="coerce")
+
+    invalid = (
+        (rows["ticker"] == "")
+        | rows["fecha"].isna()
+        | ~rows["tipo"].isin(TRANSACTION_TYPES)
+        | ~(rows["cantidad"] > 0)
+        | ~(rows["precio"] >= 0)
+        | (rows["comision"] < 0)
+    )
+    if invalid.any():
+        first = int(invalid.to_numpy().argmax()) + 1
+        raise ValueError(f"{int(invalid.sum())} transacción(es) inválida(s); la primera es la fila {first}")
+    return rows
+
+
+def _truncate_valuations(conn: sqlite3.Connection, portfolio_id: int, fecha: str) -> None:
+    """Descarta las valoraciones desde `fecha`: una transacción cambia la cartera a partir de su día."""
+    conn.execute("DELETE FROM portfolio_valuations WHERE portfolio_id = ? AND fecha >= ?", (portfolio_id, fecha))
+
+
+def add_transactions(portfolio_id: int, rows: pd.DataFrame) -> int:
+    """Inserta transacciones (columnas ticker, fecha, tipo, cantidad, precio[, comision]); devuelve cuántas."""
+    rows = _validated(rows)
+    if rows.empty:
+        return 0
+    with transaction() as conn:
+        _truncate_valuations(conn, portfolio_id, rows["fecha"].min())
+        conn.executemany(
+            """
+            INSERT INTO portfolio_transactions (portfolio_id, ticker, fecha, tipo, cantidad, precio, comision)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            zip(
+                [portfolio_id] * len(rows),
+                rows["ticker"],
+                rows["fecha"],
+                rows["tipo"],
+                rows["cantidad"].astype(float),
+                rows["precio"].astype(float),
+                rows["comision"].astype(float),
+            ),
+        )
+    return len(rows)
+
+
+def add_transaction(
+    portfolio_id: int, ticker: str, fecha: str, tipo: str, cantidad: float, precio: float, comision: float = 0.0
+) -> None:
+    add_transactions(portfolio_id, pd.DataFrame([{
+        "ticker": ticker, "fecha": fecha, "tipo": tipo, "cantidad": cantidad, "precio": precio, "comision": comision,
+    }]))
+
+
+def delete_transaction(portfolio_id: int, transaction_id: int) -> None:
+    with transaction() as conn:
+        row = conn.execute(
+            "SELECT fecha FROM portfolio_transactions WHERE id = ? AND portfolio_id = ?", (transaction_id, portfolio_id)
+        ).fetchone()
+        if row is None:
+            return
+        _truncate_valuations(conn, portfolio_id, row[0])
+        conn.execute("DELETE FROM portfolio_transactions WHERE id = ?", (transaction_id,))
+
+
+def read_transactions(portfolio_id: int) -> pd.DataFrame:
+    """Libro completo de la cartera, en orden de fecha."""
+    with connection() as conn:
+        df = pd.read_sql_query(
+            f"""
+            SELECT {', '.join(TRANSACTION_COLUMNS)} FROM portfolio_transactions
+            WHERE portfolio_id = ? ORDER BY fecha, id
+            """,
+            conn,
+            params=(portfolio_id,),
+        )
+    return df.astype({"cantidad": float, "precio": float, "comision": float})
+
+
+def read_valuations(portfolio_id: int, market_key: str) -> pd.DataFrame:
+    """
+    Valoraciones diarias guardadas, indexadas por fecha.
+
+    Vacío si se calcularon con otro mercado (`market_key` distinto, p. ej. apareció un split).
+    """
+    with connection() as conn:
+        meta = conn.execute(
+            "SELECT market_key FROM portfolio_valuation_meta WHERE portfolio_id = ?", (portfolio_id,)
+        ).fetchone()
+        if meta is None or meta[0] != market_key:
+            return pd.DataFrame(columns=VALUATION_COLUMNS, index=pd.DatetimeIndex([], name="Date"), dtype=float)
+        df = pd.read_sql_query(
+            f"""
+            SELECT fecha, {', '.join(VALUATION_COLUMNS)} FROM portfolio_valuations
+            WHERE portfolio_id = ? ORDER BY fecha
+            """,
+            conn,
+            params=(portfolio_id,),
+        )
+    df.index = pd.DatetimeIndex(pd.to_datetime(df.pop("fecha")), name="Date")
+    return df.astype(float)
+
+
+def save_valuations(portfolio_id: int, rows: pd.DataFrame, market_key: str, replace_all: bool = False) -> None:
+    """
+    Guarda filas nuevas de valoración (la primera reemplaza a la última guardada, que pudo ser parcial).
+
+    Con `replace_all` se borran antes todas las de la cartera (historia recalculada desde el principio).
+    """
+    if rows.empty:
+        return
+    with transaction() as conn:
+        if replace_all:
+            conn.execute("DELETE FROM portfolio_valuations WHERE portfolio_id = ?", (portfolio_id,))
+        conn.executemany(
+            f"""
+            INSERT OR REPLACE INTO portfolio_valuations (portfolio_id, fecha, {', '.join(VALUATION_COLUMNS)})
+            VALUES (?, ?, {', '.join('?' * len(VALUATION_COLUMNS))})
+            """,
+            zip(
+                [portfolio_id] * len(rows),
+                rows.index.strftime("%Y-%m-%d"),
+                *(rows[c].astype(float).tolist() for c in VALUATION_COLUMNS),
+            ),
+        )
+        conn.execute(
+            """
+            INSERT INTO portfolio_valuation_meta (portfolio_id, market_key, updated_at) VALUES (?, ?, ?)
+            ON CONFLICT (portfolio_id) DO UPDATE SET market_key = excluded.market_key, updated_at = excluded.updated_at
+            """,
+            (portfolio_id, market_key, time.time()),
+        )
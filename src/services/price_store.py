@@ -0,0 +1,146 @@
+# src/services/price_store.py
+"""
+Almacén persistente de historiales OHLCV por ticker e intervalo.
+
+Vive en la misma base SQLite de la app (`src/cokeapp.sqlite`) para que sobreviva a los
+reinicios del dyno. Siempre se guarda la ventana más larga (STORE_YEARS) y los períodos
+más cortos se recortan localmente.
+
+Las barras de Yahoo vienen ajustadas por splits y dividendos: cada split o dividendo nuevo cambia
+la escala de todo el historial anterior, así que entonces se reemplaza entero (ver `has_new_actions`).
+"""
+import re
+import time
+
+import pandas as pd
+
+from ..db import connection, transaction
+
+# Ventana que se descarga la primera vez (la mayor del selector de período)
+STORE_YEARS = 20
+STORE_PERIOD = f"{STORE_YEARS}y"
+# No se vuelve a completar un ticker si se actualizó hace menos de esto
+TOP_UP_EVERY = 15 * 60
+
+_COLUMNS = {
+    "Open": "open",
+    "High": "high",
+    "Low": "low",
+    "Close": "close",
+    "Volume": "volume",
+    "Dividends": "dividends",
+    "Stock Splits": "stock_splits",
+}
+
+
+def period_years(period: str) -> int | None:
+    """Convierte "5y", "10y"... a años; None si el período no se puede servir desde el almacén."""
+    match = re.fullmatch(r"(\d+)y", period or "")
+    if not match or int(match.group(1)) > STORE_YEARS:
+        return None
+    return int(match.group(1))
+
+
+def read_history(ticker: str, interval: str) -> pd.DataFrame:
+    """Devuelve todo lo guardado para (ticker, intervalo), con el índice en la zona horaria original."""
+    with connection() as conn:
+        meta = conn.execute(
+            "SELECT tz FROM price_history_meta WHERE ticker = ? AND interval = ?", (ticker, interval)
+        ).fetchone()
+        df = pd.read_sql_query(
+            "SELECT * FROM price_history WHERE ticker = ? AND interval = ? ORDER BY date",
+            conn,
+            params=(ticker, interval),
+        )
+    if df.empty:
+        return pd.DataFrame(columns=list(_COLUMNS))
+
+    df.index = pd.DatetimeIndex(pd.to_datetime(df.pop("date")), name="Date")
+    if meta and meta[0]:
+        df.index = df.index.tz_localize(meta[0])
+    df = df.drop(columns=["ticker", "interval"]).rename(columns={v: k for k, v in _COLUMNS.items()})
+    return df.astype(float)
+
+
+def write_history(ticker: str, interval: str, df: pd.DataFrame, replace: bool = False) -> None:
+    """
+    Inserta o reemplaza las barras de `df` y marca el ticker como actualizado.
+
+    Con `replace` borra antes todo lo guardado del (ticker, intervalo), en la misma transacción.
+    """
+    tz = str(df.index.tz) if getattr(df.index, "tz", None) is not None else None
+    with transaction() as conn:
+        if replace and not df.empty:
+            conn.execute("DELETE FROM price_history WHERE ticker = ? AND interval = ?", (ticker, interval))
+        if not df.empty:
+            local = df.index.tz_localize(None) if tz else df.index
+            data = df.reindex(columns=list(_COLUMNS)).astype(float)
+            rows = zip(
+                [ticker] * len(df),
+                [interval] * len(df),
+                local.strftime("%Y-%m-%d %H:%M:%S"),
+                *(data[c].tolist() for c in _COLUMNS),
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO price_history VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        conn.execute(
+            """
+            INSERT INTO price_history_meta (ticker, interval, tz, updated_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT (ticker, interval) DO UPDATE
+            SET tz = COALESCE(excluded.tz, price_history_meta.tz), updated_at = excluded.updated_at
+            """,
+            (ticker, interval, tz, time.time()),
+        )
+
+
+def _naive_dates(index: pd.Index) -> pd.DatetimeIndex:
+    index = pd.DatetimeIndex(index)
+    return index.tz_localize(None) if index.tz is not None else index
+
+
+def has_new_actions(stored: pd.DataFrame, fresh: pd.DataFrame) -> bool:
+    """
+    True si las barras nuevas traen un split o un dividendo que no estaba guardado.
+
+    Yahoo reajusta entonces todas las barras anteriores y las guardadas quedan en otra escala:
+    hay que volver a descargar la ventana completa y reemplazarlas (`write_history(..., replace=True)`).
+    """
+    columns = [c for c in ("Dividends", "Stock Splits") if c in fresh.columns]
+    if stored.empty or fresh.empty or not columns:
+        return False
+    events = fresh[columns].fillna(0.0).set_axis(_naive_dates(fresh.index))
+    known = stored.reindex(columns=columns).set_axis(_naive_dates(stored.index))
+    known = known[~known.index.duplicated(keep="last")].reindex(events.index).fillna(0.0)
+    return bool(((events != 0) & (events != known)).to_numpy().any())
+
+
+def stored_tickers(tickers: list[str], interval: str) -> set[str]:
+    """Los de `tickers` que ya tienen historial guardado para `interval` (una sola consulta)."""
+    if not tickers:
+        return set()
+    with connection() as conn:
+        rows = conn.execute(
+            f"SELECT ticker FROM price_history_meta WHERE interval = ? AND ticker IN ({', '.join('?' * len(tickers))})",
+            (interval, *tickers),
+        ).fetchall()
+    return {row[0] for row in rows}
+
+
+def needs_top_up(ticker: str, interval: str) -> bool:
+    """True si el ticker no se ha completado en los últimos TOP_UP_EVERY segundos."""
+    with connection() as conn:
+        row = conn.execute(
+            "SELECT updated_at FROM price_history_meta WHERE ticker = ? AND interval = ?", (ticker, interval)
+        ).fetchone()
+    return row is None or time.time() - row[0] > TOP_UP_EVERY
+
+
+def slice_period(df: pd.DataFrame, period: str) -> pd.DataFrame:
+    """Recorta un historial guardado al período pedido ("5y", "10y"...)."""
+    years = period_years(period)
+    if df.empty or years is None:
+        return df
+    cutoff = pd.Timestamp.now(tz=df.index.tz) - pd.DateOffset(years=years)
+    return df[df.index >= cutoff]
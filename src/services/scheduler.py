@@ -0,0 +1,181 @@
+# src/services/scheduler.py
+"""
+Planificador único para todo el tráfico saliente hacia Yahoo.
+
+Todas las sesiones de Streamlit comparten el proceso, así que aquí se reparte el presupuesto:
+- Token bucket: ritmo máximo de peticiones por segundo con ráfagas acotadas.
+- Límite de concurrencia por host.
+- Coalescencia: dos sesiones que piden lo mismo a la vez comparten una sola descarga.
+- Métricas de peticiones, esperas, reintentos y respuestas 429.
+Tras un 429 el bucket se congela unos segundos para todos, en vez de que cada hilo reintente por su cuenta.
+"""
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from typing import Any, Callable, TypeVar
+
+T = TypeVar("T")
+
+YAHOO_HOST = "finance.yahoo.com"
+
+
+def is_rate_limited(exc: BaseException) -> bool:
+    """True si la excepción corresponde a un 429 de Yahoo (HTTP o el error propio de yfinance)."""
+    status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status == 429 or type(exc).__name__ == "YFRateLimitError"
+
+
+class TokenBucket:
+    """Bucket de tokens thread-safe: `rate` tokens por segundo, hasta `capacity` acumulados."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, cost: int = 1) -> float:
+        """
+        Bloquea hasta obtener `cost` tokens; devuelve los segundos esperados.
+
+        Un coste mayor que `capacity` espera al bucket lleno y lo deja en negativo: las peticiones
+        siguientes esperan a que se recupere, así el ritmo medio se mantiene.
+        """
+        need = min(cost, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._paused_until and self._tokens >= need:
+                    self._tokens -= cost
+                    return waited
+                wait = max(self._paused_until - now, (need - self._tokens) / self.rate)
+            time.sleep(wait)
+            waited += wait
+
+    def configure(self, rate: float, capacity: int) -> None:
+        """Cambia el ritmo y la ráfaga a la vez; los tokens acumulados no pasan de la nueva capacidad."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+            self.capacity = capacity
+            self._tokens = min(self._tokens, capacity)
+
+    def pause(self, seconds: float) -> None:
+        """Congela el bucket (p. ej. tras un 429) y descarta los tokens acumulados."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+
+class RequestScheduler:
+    """Aplica el token bucket, los límites por host y la coalescencia a cada petición."""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        host_limits: dict[str, int] | None = None,
+        default_host_limit: int = 4,
+        cooldown_429: float = 30.0,
+    ):
+        self.bucket = TokenBucket(rate, burst)
+        self.cooldown_429 = cooldown_429
+        self._host_limits = host_limits or {}
+        self._default_host_limit = default_host_limit
+        self._host_slots: dict[str, threading.BoundedSemaphore] = {}
+        self._in_flight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._metrics: Counter = Counter()
+        self._wait_seconds = 0.0
+
+    def _slots(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if host not in self._host_slots:
+                limit = self._host_limits.get(host, self._default_host_limit)
+                self._host_slots[host] = threading.BoundedSemaphore(limit)
+            return self._host_slots[host]
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._metrics[name] += n
+
+    def throttle(self, fn: Callable[[], T], host: str = YAHOO_HOST, cost: int = 1) -> T:
+        """
+        Ejecuta una petición HTTP respetando el ritmo global y la concurrencia del host.
+
+        `cost` es el número de peticiones reales que hace `fn` una detrás de otra (p. ej. un
+        `yf.download` sin hilos pide un ticker cada vez): consume otros tantos tokens.
+        """
+        waited = self.bucket.acquire(cost)
+        with self._slots(host):
+            with self._lock:
+                self._metrics["requests"] += cost
+                self._wait_seconds += waited
+            try:
+                return fn()
+            except Exception as e:
+                if is_rate_limited(e):
+                    self._count("rate_limited")
+                    self.bucket.pause(self.cooldown_429)
+                else:
+                    self._count("errors")
+                raise
+
+    def coalesce(self, key: str | None, fn: Callable[[], T]) -> T:
+        """Si ya hay una llamada en curso con la misma clave, espera su resultado en vez de repetirla."""
+        if key is None:
+            return fn()
+        with self._lock:
+            pending = self._in_flight.get(key)
+            if pending is None:
+                pending = self._in_flight[key] = Future()
+                owner = True
+            else:
+                self._metrics["coalesced"] += 1
+                owner = False
+        if not owner:
+            return pending.result()
+        try:
+            result = fn()
+            pending.set_result(result)
+            return result
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def set_rate(self, rate: float, burst: int) -> None:
+        """Cambia el ritmo (peticiones/s) y la ráfaga máxima del token bucket (p. ej. el pre-calentador)."""
+        self.bucket.configure(rate, burst)
+
+    def record_retry(self, retry_state: Any = None) -> None:
+        """Hook `before_sleep` de tenacity: cuenta cada reintento."""
+        self._count("retries")
+
+    def stats(self) -> dict[str, float]:
+        """Contadores acumulados desde el arranque del proceso."""
+        with self._lock:
+            stats = {k: self._metrics[k] for k in ("requests", "coalesced", "retries", "rate_limited", "errors")}
+            stats["wait_seconds"] = round(self._wait_seconds, 2)
+            stats["in_flight"] = len(self._in_flight)
+        return stats
+
+
+# Planificador compartido por todo el proceso
+SCHEDULER = RequestScheduler(
+    rate=float(os.getenv("YF_RATE_PER_SEC", "4")),
+    burst=int(os.getenv("YF_BURST", "8")),
+    default_host_limit=int(os.getenv("YF_HOST_CONCURRENCY", "4")),
+)
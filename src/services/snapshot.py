@@ -0,0 +1,98 @@
+# src/services/snapshot.py
+from dataclasses import dataclass, replace
+
+import numpy as np
+import pandas as pd
+
+from .cache import cache_data
+from .swr import SWR
+from .yf_client import fetch_ticker_bundle, resample_history
+
+# El snapshot sólo se arma con lo que ya tiene la caché stale-while-revalidate, así que puede
+# caducar tan rápido como la cotización sin volver a dejar a nadie esperando a Yahoo.
+SNAPSHOT_TTL = SWR.policies["quote"].fresh
+
+
+def normalize_statement(raw: pd.DataFrame | None) -> pd.DataFrame:
+    """
+    Normaliza un estado financiero de yfinance.
+
+    - Traspone (filas = periodos, columnas = partidas).
+    - Convierte todo a numérico y elimina filas vacías.
+    - Indexa por año, ordenado ascendente; si hay dos cierres el mismo año se queda el más reciente.
+    """
+    if raw is None or raw.empty:
+        return pd.DataFrame()
+    df = (
+        raw.transpose()
+        .apply(pd.to_numeric, errors="coerce")
+        .replace([np.inf, -np.inf], np.nan)
+        .dropna(how="all")
+    )
+    df.index = pd.to_datetime(df.index, errors="coerce")
+    df = df[df.index.notna()].sort_index()
+    df.index = df.index.year
+    return df[~df.index.duplicated(keep="last")]
+
+
+@dataclass(frozen=True)
+class TickerSnapshot:
+    """Foto inmutable de todos los datos de Yahoo que usa la página de un ticker."""
+
+    ticker: str
+    period: str
+    interval: str
+    info: dict
+    prices: pd.DataFrame          # historial en la frecuencia elegida (remuestreado del diario)
+    daily_prices: pd.DataFrame    # historial diario (Geraldine Weiss, valoración)
+    dividends: pd.Series
+    balance_sheet: pd.DataFrame   # años x partidas, numérico
+    income: pd.DataFrame
+    cashflow: pd.DataFrame
+
+
+@cache_data(show_spinner=False, ttl=SNAPSHOT_TTL)
+def _load_daily_snapshot(ticker: str, period: str) -> TickerSnapshot:
+    """Descarga una sola vez todo lo de un ticker con precios diarios (ver `load_snapshot`)."""
+    bundle = fetch_ticker_bundle(ticker, period=period, interval="1d")
+
+    # Un info incompleto (sin currentPrice o dividendRate) no se vuelve a pedir: header_metrics
+    # recurre al último cierre y a lastDividendValue
+    info = bundle["info"]
+    dividends = bundle["dividends"]
+    dividends = dividends.astype(float) if dividends is not None else pd.Series(dtype=float)
+
+    return TickerSnapshot(
+        ticker=ticker,
+        period=period,
+        interval="1d",
+        info=dict(info),
+        prices=bundle["daily_prices"],
+        daily_prices=bundle["daily_prices"],
+        dividends=dividends,
+        balance_sheet=normalize_statement(bundle["balance_sheet"]),
+        income=normalize_statement(bundle["financials"]),
+        cashflow=normalize_statement(bundle["cashflow"]),
+    )
+
+
+@cache_data(show_spinner=False, ttl=SNAPSHOT_TTL)
+def load_snapshot(ticker: str, period: str, interval: str = "1d") -> TickerSnapshot:
+    """
+    Descarga una sola vez info, precios, dividendos y los tres estados financieros de un ticker.
+
+    Las peticiones salen en paralelo (ver `fetch_ticker_bundle`). Todo lo que devuelve ya viene
+    numérico, traspuesto e indexado por año, de modo que las secciones de la página sólo leen del snapshot.
+    Cambiar la frecuencia sólo remuestrea los precios diarios; no vuelve a descargar nada.
+    """
+    base = _load_daily_snapshot(ticker, period)
+    if interval == "1d":
+        return base
+    return replace(base, interval=interval, prices=resample_history(base.daily_prices, interval))
+
+
+def clear_snapshots() -> None:
+    """Vacía la caché de snapshots y fuerza a volver a pedir los datos a Yahoo (botón "Refrescar caché")."""
+    SWR.invalidate()
+    _load_daily_snapshot.clear()
+    load_snapshot.clear()
@@ -0,0 +1,216 @@
+# src/services/swr.py
+"""
+Caché stale-while-revalidate para los datos de Yahoo.
+
+Cada conjunto de datos tiene su política de frescura:
+- Dentro de `fresh`: se sirve el valor guardado (hit).
+- Entre `fresh` y `max_stale`: se sirve el valor guardado al instante (stale) y un hilo en
+  segundo plano lo vuelve a pedir.
+- Sin valor o más viejo que `max_stale`: se descarga en el momento (miss).
+
+Los valores viven en memoria y, si la política lo pide, también en la base SQLite de la app,
+así un reinicio del dyno no vuelve a dejar a los usuarios esperando una descarga en frío.
+La memoria es un LRU con tope de bytes: lo que sale de ella se vuelve a leer de SQLite (o, el
+historial, del almacén en disco) en la siguiente petición.
+"""
+import logging
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable
+
+import pandas as pd
+
+from ..db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+SWR_MAX_BYTES = int(os.getenv("SWR_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+@dataclass(frozen=True)
+class FreshnessPolicy:
+    fresh: float        # segundos en que el valor se considera al día
+    max_stale: float    # segundos en que aún se puede servir mientras se refresca
+    persist: bool = True
+
+
+# Cotización/info en minutos, estados financieros y carteras de fondos en días.
+# El historial (y los dividendos, que salen de sus barras) ya se persiste en price_store,
+# así que aquí sólo se guarda en memoria.
+POLICIES = {
+    "quote": FreshnessPolicy(fresh=5 * 60, max_stale=24 * 60 * 60),
+    "statements": FreshnessPolicy(fresh=3 * 24 * 60 * 60, max_stale=30 * 24 * 60 * 60),
+    "funds": FreshnessPolicy(fresh=24 * 60 * 60, max_stale=30 * 24 * 60 * 60),
+    "history": FreshnessPolicy(fresh=15 * 60, max_stale=7 * 24 * 60 * 60, persist=False),
+}
+
+
+class StaleWhileRevalidate:
+    """Caché en memoria (LRU acotado en bytes) + SQLite con refresco en segundo plano y contadores."""
+
+    def __init__(self, policies: dict[str, FreshnessPolicy], max_workers: int = 2, max_bytes: int = SWR_MAX_BYTES):
+        self.policies = policies
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple[str, str], tuple[Any, float]] = OrderedDict()
+        self._sizes: dict[tuple[str, str], int] = {}
+        self._bytes = 0
+        self._refreshing: set[tuple[str, str]] = set()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="swr")
+        self._metrics: Counter = Counter()
+
+    # ─── Almacenamiento ─────────────────────────────────────────
+    @staticmethod
+    def _size(value: Any, blob: bytes | None = None) -> int:
+        """Bytes aproximados de un valor: memoria de pandas, o el tamaño ya serializado si lo hay."""
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            return int(value.memory_usage(index=True, deep=False).sum())
+        if blob is not None:
+            return len(blob)
+        return sys.getsizeof(value)
+
+    def _put(self, dataset: str, key: str, entry: tuple[Any, float], size: int) -> None:
+        """Guarda en el LRU y expulsa lo menos usado hasta volver a `max_bytes` (con el lock tomado)."""
+        k = (dataset, key)
+        if k in self._entries:
+            self._bytes -= self._sizes[k]
+        self._entries[k] = entry
+        self._entries.move_to_end(k)
+        self._sizes[k] = size
+        self._bytes += size
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            evicted, _ = self._entries.popitem(last=False)
+            self._bytes -= self._sizes.pop(evicted)
+            self._metrics["evictions"] += 1
+
+    def _load(self, dataset: str, key: str) -> tuple[Any, float] | None:
+        """
+        Entrada en memoria; si falta o ya no está fresca se mira también la base, donde otro
+        proceso (p. ej. el pre-calentador) puede haber guardado una versión más reciente.
+        """
+        policy = self.policies[dataset]
+        with self._lock:
+            entry = self._entries.get((dataset, key))
+            if entry is not None:
+                self._entries.move_to_end((dataset, key))
+        if not policy.persist or (entry is not None and time.time() - entry[1] <= policy.fresh):
+            return entry
+        try:
+            with connection() as conn:
+                row = conn.execute(
+                    "SELECT value, fetched_at FROM swr_cache WHERE dataset = ? AND key = ?", (dataset, key)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("No se pudo leer swr_cache: %s", e)
+            return entry
+        if row is None or (entry is not None and row[1] <= entry[1]):
+            return entry
+        entry = (pickle.loads(row[0]), row[1])
+        with self._lock:
+            self._put(dataset, key, entry, self._size(entry[0], row[0]))
+        return entry
+
+    def _store(self, dataset: str, key: str, value: Any) -> None:
+        fetched_at = time.time()
+        persist = self.policies[dataset].persist
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL) if persist else None
+        with self._lock:
+            self._put(dataset, key, (value, fetched_at), self._size(value, blob))
+        if not persist:
+            return
+        try:
+            with transaction() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO swr_cache VALUES (?, ?, ?, ?)",
+                    (dataset, key, blob, fetched_at),
+                )
+        except sqlite3.Error as e:
+            logger.warning("No se pudo guardar en swr_cache: %s", e)
+
+    # ─── Lectura ────────────────────────────────────────────────
+    def _refresh(self, dataset: str, key: str, fetch: Callable[[], Any]) -> None:
+        try:
+            self._store(dataset, key, fetch())
+            self._count("refreshes")
+        except Exception as e:
+            self._count("refresh_errors")
+            logger.warning("Refresco en segundo plano fallido para %s/%s: %s", dataset, key, e)
+        finally:
+            with self._lock:
+                self._refreshing.discard((dataset, key))
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._metrics[name] += 1
+
+    def get(self, dataset: str, key: str, fetch: Callable[[], Any]) -> Any:
+        """Devuelve el valor de (dataset, key) según su política; `fetch()` lo descarga."""
+        policy = self.policies[dataset]
+        entry = self._load(dataset, key)
+        age = time.time() - entry[1] if entry is not None else None
+
+        if age is not None and age <= policy.fresh:
+            self._count("hits")
+            return entry[0]
+        if age is not None and age <= policy.max_stale:
+            self._count("stale")
+            with self._lock:
+                start = (dataset, key) not in self._refreshing
+                self._refreshing.add((dataset, key))
+            if start:
+                self._pool.submit(self._refresh, dataset, key, fetch)
+            return entry[0]
+
+        self._count("misses")
+        value = fetch()
+        self._store(dataset, key, value)
+        return value
+
+    def warm(self, dataset: str, key: str, fetch: Callable[[], Any]) -> bool:
+        """Descarga y guarda (dataset, key) si no está fresco; True si hubo descarga."""
+        entry = self._load(dataset, key)
+        if entry is not None and time.time() - entry[1] <= self.policies[dataset].fresh:
+            return False
+        self._store(dataset, key, fetch())
+        self._count("warmed")
+        return True
+
+    def invalidate(self, key_prefix: str | None = None) -> None:
+        """
+        Fuerza una descarga en la próxima lectura (botón "Refrescar caché").
+
+        Sin prefijo invalida todo; con prefijo, sólo las claves que empiezan por él (p. ej. "KO").
+        """
+        with self._lock:
+            for k in [k for k in self._entries if key_prefix is None or k[1].startswith(key_prefix)]:
+                del self._entries[k]
+                self._bytes -= self._sizes.pop(k)
+        try:
+            with transaction() as conn:
+                if key_prefix is None:
+                    conn.execute("DELETE FROM swr_cache")
+                else:
+                    conn.execute("DELETE FROM swr_cache WHERE key LIKE ? || '%'", (key_prefix,))
+        except sqlite3.Error as e:
+            logger.warning("No se pudo vaciar swr_cache: %s", e)
+
+    def stats(self) -> dict[str, int]:
+        """Contadores acumulados desde el arranque del proceso."""
+        with self._lock:
+            names = ("hits", "stale", "misses", "refreshes", "refresh_errors", "warmed", "evictions")
+            stats = {k: self._metrics[k] for k in names}
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._bytes
+            stats["refreshing"] = len(self._refreshing)
+        return stats
+
+
+# Caché compartida por todas las sesiones
+SWR = StaleWhileRevalidate(POLICIES)
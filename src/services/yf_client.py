@@ -1,11 +1,19 @@
 # src/services/yf_client.py
+import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
 import requests
 import yfinance as yf
 import tenacity
+from yfinance.exceptions import YFDataException
 import pandas as pd
 import streamlit as st
+from . import price_store
 from .cache import install_cache, cache_data
+from .scheduler import SCHEDULER
+from .swr import SWR
 
 # Configura caché HTTP (requests-cache) con expiración de 24 h
 install_cache()
@@ -13,6 +21,12 @@ install_cache()
 IS_CLOUD = os.getenv("STREAMLIT_CLOUD") == "1"
 YF_SESSION = None
 
+logger = logging.getLogger(__name__)
+
+# Pool acotado y compartido por todas las sesiones para las descargas en paralelo
+YF_MAX_WORKERS = int(os.getenv("YF_MAX_WORKERS", "8"))
+_YF_POOL = ThreadPoolExecutor(max_workers=YF_MAX_WORKERS, thread_name_prefix="yf")
+
 # Usa curl_cffi cuando está disponible (modo Chrome)
 if not IS_CLOUD:
     try:
@@ -28,30 +42,353 @@ if not IS_CLOUD:
 @tenacity.retry(
     stop=tenacity.stop_after_attempt(4),
     wait=tenacity.wait_exponential(multiplier=2, min=2, max=10),
+    before_sleep=SCHEDULER.record_retry,
     reraise=True,
 )
 def safe_history(ticker: str, *, period: str, interval: str) -> pd.DataFrame:
     """Invoca yfinance con reintentos y sesión personalizada."""
-    return yf.Ticker(ticker, session=YF_SESSION).history(period=period, interval=interval)
+    return SCHEDULER.throttle(
+        lambda: yf.Ticker(ticker, session=YF_SESSION).history(period=period, interval=interval)
+    )
+
+@tenacity.retry(
+    stop=tenacity.stop_after_attempt(4),
+    wait=tenacity.wait_exponential(multiplier=2, min=2, max=10),
+    before_sleep=SCHEDULER.record_retry,
+    reraise=True,
+)
+def _safe_call(fetch: Callable[[Any], Any], cost: int = 1) -> Any:
+    """Ejecuta una descarga de yfinance con la sesión personalizada y reintentos; cada intento pasa por el planificador."""
+    return SCHEDULER.throttle(lambda: fetch(YF_SESSION), cost=cost)
+
+def _call_resiliente(fetch: Callable[[Any], Any], key: str | None = None, cost: int = 1) -> Any:
+    """
+    Ejecuta cualquier descarga con reintentos y, si Yahoo devuelve 401, la repite sin la sesión especial.
+
+    Con `key`, las llamadas simultáneas con la misma clave (de cualquier sesión) comparten una sola descarga.
+    `cost` es el número de peticiones HTTP que hace `fetch` (ver `RequestScheduler.throttle`).
+    No usa `st.*` porque también se ejecuta fuera del hilo del script; el fallback se registra en el log.
+    """
+    def run() -> Any:
+        try:
+            return _safe_call(fetch, cost)
+        except requests.exceptions.HTTPError as e:
+            if getattr(e.response, "status_code", None) == 401:
+                logger.warning("Yahoo devolvió 401; reintento sin sesión especial")
+                return SCHEDULER.throttle(lambda: fetch(None), cost=cost)
+            raise
+
+    return SCHEDULER.coalesce(key, run)
+
+def _history_persistente(ticker: str, *, period: str, interval: str) -> pd.DataFrame:
+    """
+    Sirve el historial desde el almacén en disco y sólo pide a Yahoo las barras que faltan.
+
+    - Primera vez: descarga la ventana completa (price_store.STORE_PERIOD) y la guarda.
+    - Después: pide desde la última fecha guardada (incluida, para refrescar la barra en curso) y la añade.
+    - Si lo nuevo trae un split o un dividendo, Yahoo ha reajustado todo el historial anterior:
+      se vuelve a descargar la ventana completa y reemplaza lo guardado.
+    - Los períodos más cortos se recortan en local, sin volver a descargar.
+    """
+    if price_store.period_years(period) is None:
+        return _call_resiliente(
+            lambda s: yf.Ticker(ticker, session=s).history(period=period, interval=interval),
+            key=f"history:{ticker}:{interval}:{period}",
+        )
 
-@cache_data(show_spinner=False, ttl=60 * 60 * 24)
+    def full_window() -> pd.DataFrame:
+        return _call_resiliente(
+            lambda s: yf.Ticker(ticker, session=s).history(period=price_store.STORE_PERIOD, interval=interval),
+            key=f"history:{ticker}:{interval}:{price_store.STORE_PERIOD}",
+        )
+
+    stored = price_store.read_history(ticker, interval)
+    if stored.empty:
+        stored = full_window()
+        price_store.write_history(ticker, interval, stored)
+    elif price_store.needs_top_up(ticker, interval):
+        start = stored.index[-1].strftime("%Y-%m-%d")
+        fresh = _call_resiliente(
+            lambda s: yf.Ticker(ticker, session=s).history(start=start, interval=interval),
+            key=f"history:{ticker}:{interval}:{start}",
+        )
+        if price_store.has_new_actions(stored, fresh):
+            fresh = full_window()
+            price_store.write_history(ticker, interval, fresh, replace=True)
+        else:
+            price_store.write_history(ticker, interval, fresh)
+        if not fresh.empty:
+            stored = price_store.read_history(ticker, interval)
+    return price_store.slice_period(stored, period)
+
+def _history_swr(ticker: str, *, period: str, interval: str) -> pd.DataFrame:
+    """Historial del almacén en disco servido a través de la caché stale-while-revalidate."""
+    return SWR.get(
+        "history",
+        f"{ticker}:{period}:{interval}",
+        lambda: _history_persistente(ticker, period=period, interval=interval),
+    )
+
+@cache_data(show_spinner=False, ttl=SWR.policies["history"].fresh)
 def history_resiliente(ticker: str, *, period: str, interval: str) -> pd.DataFrame:
     """
     Obtiene el historial de precios de un ticker de forma tolerante a fallos y lo almacena en caché.
 
-    - Usa safe_history con reintentos exponenciales.
-    - Si Yahoo devuelve 401, vuelve a intentar sin la sesión especial.
-    - El decorador cache_data guarda los resultados durante 24 h para reducir llamadas.
+    - Usa reintentos exponenciales y, si Yahoo devuelve 401, reintenta sin la sesión especial.
+    - Persiste las barras en disco (ver price_store) y sólo descarga las nuevas tras un reinicio.
+    - Pasado el plazo de frescura sirve el último historial y lo completa en segundo plano (ver swr).
     """
+    return _history_swr(ticker, period=period, interval=interval)
+
+# Tickers por petición agrupada en history_batch
+BATCH_CHUNK_SIZE = 50
+
+def _download_chunk(tickers: list[str], interval: str, **when) -> dict[str, pd.DataFrame]:
+    """
+    Una descarga agrupada (yf.download) partida en un DataFrame por ticker.
+
+    yf.download pide cada ticker por separado: sin hilos van uno detrás de otro, ocupan un solo
+    hueco del host y el planificador cobra un token por ticker.
+    """
+    raw = _call_resiliente(
+        lambda s: yf.download(
+            tickers,
+            interval=interval,
+            group_by="ticker",
+            actions=True,
+            auto_adjust=True,
+            threads=False,
+            progress=False,
+            session=s,
+            **when,
+        ),
+        key=f"download:{','.join(tickers)}:{interval}:{sorted(when.items())}",
+        cost=len(tickers),
+    )
+    if raw is None or raw.empty:
+        return {}
+    if not isinstance(raw.columns, pd.MultiIndex):
+        raw = pd.concat({tickers[0]: raw}, axis=1)
+    frames = {}
+    for ticker in raw.columns.get_level_values(0).unique():
+        frame = raw[ticker].dropna(how="all")
+        if not frame.empty:
+            frame.index.name = "Date"
+            frames[ticker] = frame
+    return frames
+
+def history_batch(tickers: list[str], *, period: str, interval: str = "1d") -> dict[str, pd.DataFrame]:
+    """
+    Historial de muchos tickers con descargas agrupadas (vistas de screener y cartera).
+
+    - Los tickers ya completados hace poco se leen del almacén en disco sin tocar Yahoo.
+    - Los que nunca se descargaron se piden juntos con la ventana completa.
+    - Los que sólo necesitan completarse se piden juntos desde la fecha guardada más antigua del grupo;
+      los que traen un split o un dividendo nuevo se vuelven a pedir juntos con la ventana completa,
+      que reemplaza lo guardado (Yahoo reajusta todo el historial anterior).
+    Cada resultado se escribe en el mismo almacén que usa history_resiliente y se devuelve
+    recortado a `period`.
+    """
+    tickers = list(dict.fromkeys(tickers))
+    if price_store.period_years(period) is None:
+        frames = {}
+        for i in range(0, len(tickers), BATCH_CHUNK_SIZE):
+            frames.update(_download_chunk(tickers[i:i + BATCH_CHUNK_SIZE], interval, period=period))
+        return frames
+
+    stored = {t: price_store.read_history(t, interval) for t in tickers}
+    missing = [t for t in tickers if stored[t].empty]
+    stale = [t for t in tickers if not stored[t].empty and price_store.needs_top_up(t, interval)]
+
+    def fetch_group(group: list[str], when: Callable[[list[str]], dict], replace: bool = False) -> list[str]:
+        """Descarga `group` por lotes y lo guarda; devuelve los que traen splits o dividendos nuevos."""
+        readjusted = []
+        for i in range(0, len(group), BATCH_CHUNK_SIZE):
+            chunk = group[i:i + BATCH_CHUNK_SIZE]
+            fetched = _download_chunk(chunk, interval, **when(chunk))
+            for ticker in chunk:
+                fresh = fetched.get(ticker, pd.DataFrame())
+                if not replace and price_store.has_new_actions(stored[ticker], fresh):
+                    readjusted.append(ticker)
+                    continue
+                price_store.write_history(ticker, interval, fresh, replace=replace)
+                if ticker in fetched:
+                    stored[ticker] = price_store.read_history(ticker, interval)
+        return readjusted
+
+    def full_window(chunk: list[str]) -> dict:
+        return {"period": price_store.STORE_PERIOD}
+
+    def since_stored(chunk: list[str]) -> dict:
+        return {"start": min(stored[t].index[-1] for t in chunk).strftime("%Y-%m-%d")}
+
+    fetch_group(missing, full_window)
+    fetch_group(fetch_group(stale, since_stored), full_window, replace=True)
+
+    return {t: price_store.slice_period(df, period) for t, df in stored.items() if not df.empty}
+
+# Agregación OHLCV y etiquetas iguales a las barras semanales/mensuales de Yahoo
+_OHLCV_AGG = {
+    "Open": "first",
+    "High": "max",
+    "Low": "min",
+    "Close": "last",
+    "Volume": "sum",
+    "Dividends": "sum",
+    "Stock Splits": "sum",
+}
+_RESAMPLE_RULES = {"1wk": "W-MON", "1mo": "MS", "3mo": "QS"}
+
+def resample_history(daily: pd.DataFrame, interval: str) -> pd.DataFrame:
+    """Convierte barras diarias a semanales/mensuales en local; con "1d" devuelve el mismo DataFrame."""
+    if interval == "1d" or daily.empty:
+        return daily
+    rule = _RESAMPLE_RULES[interval]
+    agg = {col: how for col, how in _OHLCV_AGG.items() if col in daily.columns}
+    return daily.resample(rule, label="left", closed="left").agg(agg).dropna(subset=["Close"])
+
+def dividends_from_history(daily: pd.DataFrame) -> pd.Series:
+    """
+    Dividendo por acción en cada fecha ex, sacado de la columna "Dividends" de las barras diarias.
+
+    Es la misma serie que `Ticker.dividends` (que por dentro descarga el historial "max"),
+    limitada a las fechas del historial y sin ninguna petición extra. Si el historial empieza a
+    mitad de un año, ese año se descarta: sumaría sólo una parte de sus dividendos.
+    """
+    if daily.empty or "Dividends" not in daily:
+        return pd.Series(dtype=float, name="Dividends")
+    dividends = daily["Dividends"].fillna(0.0).astype(float)
+    first = daily.index[0]
+    if first.dayofyear > 7:
+        dividends = dividends[dividends.index.year > first.year]
+    return dividends[dividends > 0]
+
+def _bundle_tasks(ticker: str) -> dict[str, tuple[str, Callable[[], Any]]]:
+    """Descargas de un ticker (salvo el historial): nombre -> (política swr, función sin argumentos)."""
+    fetches: dict[str, tuple[str, Callable[[Any], Any]]] = {
+        "info": ("quote", lambda s: yf.Ticker(ticker, session=s).info or {}),
+        "balance_sheet": ("statements", lambda s: yf.Ticker(ticker, session=s).balance_sheet),
+        "financials": ("statements", lambda s: yf.Ticker(ticker, session=s).financials),
+        "cashflow": ("statements", lambda s: yf.Ticker(ticker, session=s).cashflow),
+    }
+    return {
+        name: (dataset, lambda fetch=fetch, key=f"{ticker}:{name}": _call_resiliente(fetch, key=key))
+        for name, (dataset, fetch) in fetches.items()
+    }
+
+def daily_history(ticker: str, period: str) -> tuple[pd.DataFrame, pd.Series]:
+    """
+    (barras diarias de `period`, dividendos) de un ticker desde el almacén en disco.
+
+    Se lee la ventana guardada entera (los dividendos cubren así años completos) y se recorta en local.
+    """
+    window = price_store.STORE_PERIOD if price_store.period_years(period) is not None else period
+    stored = _history_swr(ticker, period=window, interval="1d")
+    return price_store.slice_period(stored, period), dividends_from_history(stored)
+
+def fetch_datasets(ticker: str, names: tuple[str, ...]) -> dict[str, Any]:
+    """
+    Sólo las descargas `names` de un ticker ("info", "balance_sheet"...), una detrás de otra en el
+    hilo que llama; cada una pasa por la caché stale-while-revalidate igual que en `fetch_ticker_bundle`.
+    """
+    tasks = _bundle_tasks(ticker)
+    return {name: SWR.get(tasks[name][0], f"{ticker}:{name}", tasks[name][1]) for name in names}
+
+def fetch_ticker_bundle(ticker: str, *, period: str, interval: str) -> dict[str, Any]:
+    """
+    Descarga en paralelo todo lo que necesita la página de un ticker.
+
+    Cada petición conserva sus reintentos y el fallback por 401; el tiempo total pasa a ser
+    el de la petición más lenta en vez de la suma de todas. Dos sesiones que abren el mismo
+    ticker a la vez comparten las descargas en curso (ver scheduler).
+    Sólo se descarga el historial diario; `prices` es ese mismo historial remuestreado a `interval`
+    y `dividends` sale de su columna "Dividends" (ver `dividends_from_history`).
+    Todo pasa por la caché stale-while-revalidate con la política de cada conjunto de datos
+    (ver swr.POLICIES): un valor caducado se devuelve al instante y se refresca en segundo plano.
+    Devuelve un dict con: info, prices, daily_prices, dividends, balance_sheet, financials, cashflow.
+    """
+    futures = {
+        name: _YF_POOL.submit(SWR.get, dataset, f"{ticker}:{name}", fetch)
+        for name, (dataset, fetch) in _bundle_tasks(ticker).items()
+    }
+    # El historial pasa por el almacén en disco, que ya aplica reintentos por su cuenta
+    history = _YF_POOL.submit(daily_history, ticker, period)
+
+    results = {name: fut.result() for name, fut in futures.items()}
+    results["daily_prices"], results["dividends"] = history.result()
+    results["prices"] = resample_history(results["daily_prices"], interval)
+    return results
+
+def warm_ticker(ticker: str) -> list[str]:
+    """
+    Deja en la caché persistente (swr) el info y los estados de un ticker.
+
+    Sólo descarga lo que no está fresco; devuelve los nombres de lo que se descargó.
+    El historial (con los dividendos) se calienta aparte, en grupo, con `history_batch`.
+    """
+    return [
+        name
+        for name, (dataset, fetch) in _bundle_tasks(ticker).items()
+        if SWR.warm(dataset, f"{ticker}:{name}", fetch)
+    ]
+
+def _fund_payload(ticker: str, session: Any) -> dict[str, Any] | None:
+    """
+    Datos de fondo de un ETF en tipos simples (para guardarlos en la caché persistente):
+    holdings (símbolo -> peso), holding_names, sectors (sector -> peso), expense_ratio, category, family.
+    Los pesos van en tanto por uno. None si el ticker no es un fondo (respuesta válida, sin reintentos).
+    """
+    funds = yf.Ticker(ticker, session=session).funds_data
     try:
-        return safe_history(ticker, period=period, interval=interval)
-    except requests.exceptions.HTTPError as e:
-        if getattr(e.response, "status_code", None) == 401:
-            st.warning("⚠️ Yahoo devolvió 401; reintento sin sesión especial…")
-            return yf.Ticker(ticker).history(period=period, interval=interval)
-        raise
-
-@cache_data(show_spinner=False, ttl=60 * 60 * 24)
+        top = funds.top_holdings
+    except (KeyError, YFDataException):
+        return None
+    holdings = pd.Series(dtype=float)
+    names: dict[str, str] = {}
+    if top is not None and not top.empty:
+        holdings = pd.to_numeric(top["Holding Percent"], errors="coerce").dropna()
+        holdings = holdings.groupby(level=0).sum()
+        names = top["Name"].groupby(level=0).first().to_dict()
+    operations = funds.fund_operations
+    expense = None
+    if operations is not None and "Annual Report Expense Ratio" in operations.index and ticker in operations:
+        expense = pd.to_numeric(operations.loc["Annual Report Expense Ratio", ticker], errors="coerce")
+        expense = None if pd.isna(expense) else float(expense)
+    overview = funds.fund_overview or {}
+    return {
+        "holdings": holdings,
+        "holding_names": names,
+        "sectors": pd.Series(funds.sector_weightings or {}, dtype=float),
+        "expense_ratio": expense,
+        "category": overview.get("categoryName"),
+        "family": overview.get("family"),
+    }
+
+def fund_data(ticker: str) -> dict[str, Any] | None:
+    """
+    Posiciones, sectores y comisión de un ETF, servidos desde la caché persistente (política "funds").
+
+    Las carteras de los fondos cambian como mucho una vez al mes: tras un reinicio se leen de SQLite
+    sin volver a Yahoo, y pasado un día se refrescan en segundo plano.
+    """
+    return SWR.get(
+        "funds",
+        f"{ticker}:fund",
+        lambda: _call_resiliente(lambda s: _fund_payload(ticker, s), key=f"{ticker}:fund"),
+    )
+
+def fetch_funds(tickers: list[str]) -> dict[str, dict[str, Any] | None | Exception]:
+    """`fund_data` de muchos ETFs en paralelo; los que fallan quedan con su excepción."""
+    futures = {t: _YF_POOL.submit(fund_data, t) for t in dict.fromkeys(tickers)}
+    results: dict[str, dict[str, Any] | None | Exception] = {}
+    for ticker, fut in futures.items():
+        try:
+            results[ticker] = fut.result()
+        except Exception as e:
+            logger.warning("Sin datos de fondo para %s: %s", ticker, e)
+            results[ticker] = e
+    return results
+
 from urllib.parse import urlparse
 
 def get_logo_url(info: dict | None) -> str | None:
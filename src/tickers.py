@@ -0,0 +1,12 @@
+# src/tickers.py
+"""Listas de tickers escritas a mano (screener, ETFs, pre-calentador)."""
+import re
+
+# Máximo de tickers por análisis del screener
+MAX_TICKERS = 500
+
+
+def parse_tickers(text: str) -> list[str]:
+    """Separa por comas, espacios, punto y coma o saltos de línea; en mayúsculas y sin repetidos."""
+    tickers = [t.strip().upper() for t in re.split(r"[\s,;]+", text or "") if t.strip()]
+    return list(dict.fromkeys(tickers))
@@ -0,0 +1,42 @@
+# tests/test_credentials.py
+"""Cada rama de `verify_password` paga exactamente un scrypt: el tiempo no revela qué correos existen."""
+import hashlib
+
+import pytest
+
+from src import credentials
+from src.credentials import hash_password, verify_password
+
+
+@pytest.fixture
+def scrypt_calls(monkeypatch):
+    calls = []
+    real = credentials._scrypt
+
+    def counting(*args):
+        calls.append(args[2:])
+        return real(*args)
+
+    monkeypatch.setattr(credentials, "_scrypt", counting)
+    return calls
+
+
+def test_scrypt_hash(scrypt_calls):
+    stored = hash_password("secreto")
+    scrypt_calls.clear()
+    assert verify_password("secreto", stored) == (True, False)
+    assert verify_password("otra", stored) == (False, False)
+    assert len(scrypt_calls) == 2
+
+
+@pytest.mark.parametrize("stored", [None, "", "basura", "bcrypt$1$2$3$4$5", "scrypt$16384$8$1$!!!$x"])
+def test_unknown_user_or_corrupt_hash_pays_scrypt(scrypt_calls, stored):
+    assert verify_password("secreto", stored) == (False, False)
+    assert scrypt_calls == [(credentials.SCRYPT_N, credentials.SCRYPT_R, credentials.SCRYPT_P)]
+
+
+@pytest.mark.parametrize("password, expected", [("secreto", (True, True)), ("otra", (False, False))])
+def test_legacy_sha256_pays_scrypt(scrypt_calls, password, expected):
+    stored = hashlib.sha256(b"secreto").hexdigest()
+    assert verify_password(password, stored) == expected
+    assert scrypt_calls == [(credentials.SCRYPT_N, credentials.SCRYPT_R, credentials.SCRYPT_P)]